@@ -0,0 +1,117 @@
+"""
+Business-name catalog: index build time, lookup latency and fuzzy-match accuracy
+    python benchmarks/business_catalog.py [--entries 100000] [--queries 5000] [--catalog names.csv]
+Without --catalog, a synthetic catalog of `--entries` names is generated from the business
+keywords of the rule pack (e.g. 'Keyser Family Dental LLC'). Queries are catalog names
+with typos, dropped legal suffixes and changed case; a query counts as resolved correctly
+when it maps to its source entry's business type. Reports cold lookups (first sight of a
+name) and batch resolution of an upload's distinct names
+"""
+
+import argparse
+import csv
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.business_catalog import BusinessCatalog, normalize_name
+from src.models.rule_packs import get_rule_registry
+
+# Consonant-vowel(-consonant) syllables: enough distinct trigrams to resemble real surnames
+SYLLABLES = [c + v + e for c in 'bcdfghjklmnprstvwz' for v in 'aeiouy' for e in ['', 'n', 'r', 's', 'l']]
+EXTRAS = ['family', 'city', 'north', 'main street', 'united', 'premier', 'express', 'golden', 'royal', 'valley']
+SUFFIXES = ['', '', ' LLC', ' Inc', ' & Co', ' Ltd']
+
+
+def synthetic_catalog(business_keywords, count, seed=7):
+    """[(name, business_type)] with unique normalized names"""
+    rng = random.Random(seed)
+    types = sorted(business_keywords)
+    names = {}
+    seen = set()
+    while len(names) < count:
+        business_type = rng.choice(types)
+        surname = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        parts = [surname] + ([rng.choice(EXTRAS).title()] if rng.random() < 0.4 else [])
+        parts.append(rng.choice(business_keywords[business_type]).title())
+        name = ' '.join(parts)
+        if normalize_name(name) not in seen:
+            seen.add(normalize_name(name))
+            names[name + rng.choice(SUFFIXES)] = business_type
+    return list(names.items())
+
+
+def perturb(name, rng):
+    """A typo (substitution, deletion or transposition) plus a dropped suffix or case change"""
+    for suffix in (' LLC', ' Inc', ' & Co', ' Ltd'):
+        if name.endswith(suffix) and rng.random() < 0.5:
+            name = name[:-len(suffix)]
+    chars = list(name)
+    position = rng.randrange(1, len(chars) - 1)
+    edit = rng.choice(['substitute', 'delete', 'transpose'])
+    if edit == 'substitute':
+        chars[position] = rng.choice(string.ascii_lowercase)
+    elif edit == 'delete':
+        del chars[position]
+    else:
+        chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    name = ''.join(chars)
+    return name.upper() if rng.random() < 0.2 else name
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Business catalog build and lookup cost')
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--catalog', help='CSV with name,business_type columns instead of a synthetic catalog')
+    parser.add_argument('--min-similarity', type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    if args.catalog:
+        with open(args.catalog, encoding='utf-8', newline='') as f:
+            entries = [(row['name'], row['business_type']) for row in csv.DictReader(f)]
+    else:
+        entries = synthetic_catalog(get_rule_registry().current().business_keywords, args.entries)
+
+    started = time.perf_counter()
+    catalog = BusinessCatalog(entries, min_similarity=args.min_similarity)
+    print(f'indexed {len(catalog)} names, {catalog.describe()["trigrams"]} trigrams in {time.perf_counter() - started:.2f} s')
+
+    sample = rng.sample(entries, min(args.queries, len(entries)))
+    exact_queries = [name for name, _ in sample]
+    fuzzy_queries = [perturb(name, rng) for name, _ in sample]
+    unknown_queries = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 14))) + ' Holdings' for _ in sample]
+
+    for label, queries in (('exact', exact_queries), ('typo', fuzzy_queries), ('unknown', unknown_queries)):
+        catalog._cache.clear()
+        latencies = []
+        results = []
+        for query in queries:
+            started = time.perf_counter()
+            results.append(catalog.match(query))
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        if label == 'unknown':
+            quality = f'false matches {sum(r is not None for r in results) / len(results):.3f}'
+        else:
+            correct = sum(r is not None and r['business_type'] == t for r, (_, t) in zip(results, sample))
+            quality = f'correct type {correct / len(results):.3f}  unresolved {sum(r is None for r in results) / len(results):.3f}'
+        print(f'{label:<8} p50 {p50:.3f} ms  p99 {p99:.3f} ms  max {latencies[-1]:.3f} ms  {quality}')
+
+    # An upload: many rows, few distinct companies; resolved once per distinct name
+    upload = [rng.choice(fuzzy_queries[:200]) for _ in range(50000)]
+    catalog._cache.clear()
+    started = time.perf_counter()
+    resolved = catalog.match_many(upload)
+    print(f'batch    {len(upload)} rows, {len(resolved)} distinct names resolved in {(time.perf_counter() - started) * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
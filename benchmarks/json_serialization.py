@@ -0,0 +1,86 @@
+"""
+Before/after benchmark for response serialization on a 100k-row dashboard
+
+    python benchmarks/json_serialization.py [--rows 100000] [--repeat 5]
+
+"before" is the old upload path: recursive convert_numpy_types followed by Flask's default
+provider. "after" is FastJSONProvider encoding the raw result directly.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src.routes.dashboard import CSVDashboardAnalyzer
+from src.utils.serialization import ORJSON_AVAILABLE, FastJSONProvider
+
+
+def convert_numpy_types(obj):
+    """The recursive conversion upload_csv used to run before jsonify"""
+    if hasattr(obj, 'item'):
+        return obj.item()
+    elif isinstance(obj, dict):
+        return {k: convert_numpy_types(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_numpy_types(v) for v in obj]
+    else:
+        return obj
+
+
+def synthetic_csv(rows, seed=7):
+    rng = random.Random(seed)
+    words = ['service', 'price', 'staff', 'delivery', 'great', 'slow', 'friendly', 'fuel', 'technician', 'billing']
+    classes = ['legitimate_review', 'advertisement', 'rant_without_visit', 'No Written Review']
+    lines = ['review_id,author,company,review_text,rating,classification,model_used']
+    for i in range(rows):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(8, 60)))
+        lines.append(
+            f"r{i},author {rng.randint(0, rows // 3)},company {rng.randint(0, rows // 20)},"
+            f"\"{{'en': '{text}'}}\",{rng.randint(1, 5)}.0,{rng.choice(classes)},bench"
+        )
+    return '\n'.join(lines)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = CSVDashboardAnalyzer().analyze_csv_data(synthetic_csv(args.rows))
+    if not result['success']:
+        raise SystemExit(result['error'])
+    print(f'dashboard built for {args.rows} rows in {time.perf_counter() - start:.2f}s')
+
+    app = Flask('bench')
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+
+    before, before_size = best_of(args.repeat, lambda: default_provider.dumps(convert_numpy_types(result)))
+    after, after_size = best_of(args.repeat, lambda: fast_provider.dumps(result))
+
+    print(f'payload: {before_size / 1024:.0f} KiB (before), {after_size / 1024:.0f} KiB (after)')
+    print(f'before (convert_numpy_types + json): {before * 1000:.1f} ms')
+    print(f'after  (FastJSONProvider, orjson={ORJSON_AVAILABLE}): {after * 1000:.1f} ms')
+    print(f'speedup: {before / after:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Worst-case latency and equivalence fuzzing for the rule-pattern regex engines
+
+    python benchmarks/regex_safety.py [--sizes 1000 4000 16000 64000] [--fuzz 3000] [--max-ms-per-kb 10]
+
+For every pattern in the English and language rule packs, feeds long adversarial inputs
+(the opening phrase of a gapped pattern repeated without what must follow it, runs of
+email-like or digit characters) to each engine and reports the slowest pattern per size.
+The backtracking engine is only timed up to --backtracking-max-chars because it is
+quadratic or worse there. A differential fuzz then checks that the linear engine gives
+the same answers as `re` on random short reviews built from the patterns' own words.
+Exits non-zero if any engine mismatch is found or the worst full-review analysis cost
+exceeds --max-ms-per-kb at any size, i.e. if latency stops growing linearly with length.
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.pattern_engine import RE2_AVAILABLE, compile_pattern, split_gaps
+from src.routes.review import ReviewAnalyzer
+
+RULES_DIR = os.path.join(os.path.dirname(__file__), '..', 'rules')
+
+
+def load_patterns():
+    paths = [os.path.join(RULES_DIR, 'review_rules.json')] + sorted(glob.glob(os.path.join(RULES_DIR, 'languages', '*.json')))
+    patterns = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            rules = json.load(f)
+        for group, group_patterns in rules['patterns'].items():
+            patterns.extend((os.path.basename(path), group, pattern) for pattern in group_patterns)
+    return patterns
+
+
+def sample_phrase(piece):
+    """A short string the piece matches: its first alternative with escapes resolved"""
+    alternatives = re.search(r'\(([^|)]+)', piece)
+    phrase = alternatives.group(1) if alternatives else piece
+    phrase = re.sub(r'\\d[+*]?', '5', phrase)
+    return phrase.replace('\\b', '').replace('\\', '')
+
+
+def adversarial_inputs(patterns, size):
+    """name -> text of about `size` characters"""
+    inputs = {
+        'email_run': ('a.' * size)[:size - 1] + '@',
+        'digit_run': '1' * size,
+        'word_soup': ' '.join(random.Random(size).choice(['the', 'staff', 'was', 'great']) for _ in range(size // 5))
+    }
+    for _, _, pattern in patterns:
+        pieces = split_gaps(pattern)
+        if pieces:
+            phrase = sample_phrase(pieces[0]) + ' '
+            inputs.setdefault(f'repeat:{phrase.strip()}', (phrase * (size // len(phrase) + 1))[:size])
+    return inputs
+
+
+def time_search(matcher, text):
+    started = time.perf_counter()
+    matcher.search(text)
+    return (time.perf_counter() - started) * 1000
+
+
+def worst_case(patterns, engine, sizes, backtracking_max_chars):
+    compiled = [(pattern, compile_pattern(pattern, re.IGNORECASE, engine)[0]) for _, _, pattern in patterns]
+    for size in sizes:
+        if engine == 'backtracking' and size > backtracking_max_chars:
+            print(f'  {engine:<12} {size:>7} chars  skipped (above --backtracking-max-chars)')
+            continue
+        worst = (0.0, None, None)
+        for name, text in adversarial_inputs(patterns, size).items():
+            for pattern, matcher in compiled:
+                elapsed = time_search(matcher, text)
+                if elapsed > worst[0]:
+                    worst = (elapsed, name, pattern)
+        print(f'  {engine:<12} {size:>7} chars  worst {worst[0]:9.2f} ms  input {worst[1]!r}  pattern {worst[2][:60]}')
+
+
+def fuzz(patterns, iterations, seed):
+    """Compare linear and backtracking answers on random reviews; returns mismatches"""
+    rng = random.Random(seed)
+    vocabulary = sorted({word for _, _, pattern in patterns for word in re.findall(r"[a-zà-ÿ0-9'/$.@-]+", pattern.replace('\\b', ' ').replace('\\', ' ')) if len(word) > 1})
+    vocabulary += ['\n', '$5', 'x', 'and', 'then', 'we']
+    compiled = [
+        (pattern, re.compile(pattern, re.IGNORECASE), compile_pattern(pattern, re.IGNORECASE, 'linear')[0])
+        for _, _, pattern in patterns if split_gaps(pattern)
+    ]
+    mismatches = []
+    for _ in range(iterations):
+        text = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 25))).lower()
+        for pattern, reference, linear in compiled:
+            if bool(reference.search(text)) != bool(linear.search(text)):
+                mismatches.append((pattern, text))
+    return len(compiled), mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 4000, 16000, 64000])
+    parser.add_argument('--backtracking-max-chars', type=int, default=1000)
+    parser.add_argument('--fuzz', type=int, default=3000, help='Random reviews for the equivalence check')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--max-ms-per-kb', type=float, default=10.0, help='Allowed worst analysis time per KB of review')
+    parser.add_argument('--budget-ms', type=float, default=100.0, help='Per-review matching budget for the budgeted run')
+    args = parser.parse_args()
+
+    patterns = load_patterns()
+    gapped = sum(1 for _, _, pattern in patterns if split_gaps(pattern))
+    print(f'{len(patterns)} patterns ({gapped} with .* gaps), RE2 {"available" if RE2_AVAILABLE else "not installed"}')
+
+    print('\nWorst single-pattern search time on adversarial inputs:')
+    engines = ['backtracking', 'linear'] + (['re2'] if RE2_AVAILABLE else [])
+    for engine in engines:
+        worst_case(patterns, engine, args.sizes, args.backtracking_max_chars)
+
+    # Full analysis with the engine the service uses: first with every pattern evaluated,
+    # then with the matching budget the service applies
+    print('\nWorst full-review analysis time (default engine):')
+    unbudgeted = ReviewAnalyzer(match_budget_ms=0)
+    budgeted = ReviewAnalyzer(match_budget_ms=args.budget_ms)
+    worst_per_kb = 0.0
+    for size in args.sizes:
+        inputs = adversarial_inputs(patterns, size)
+        worst = max((time_review(unbudgeted, text)[0], name) for name, text in inputs.items())
+        worst_budgeted = max(time_review(budgeted, text) for text in inputs.values())
+        worst_per_kb = max(worst_per_kb, worst[0] / (size / 1000))
+        print(f'  {size:>7} chars  worst {worst[0]:9.2f} ms ({worst[0] / (size / 1000):.2f} ms/KB)  input {worst[1]!r}'
+              f'  |  {args.budget_ms:g} ms budget: {worst_budgeted[0]:9.2f} ms, {worst_budgeted[1]} patterns skipped')
+
+    checked, mismatches = fuzz(patterns, args.fuzz, args.seed)
+    print(f'\nEquivalence fuzz: {args.fuzz} random reviews x {checked} gapped patterns, {len(mismatches)} mismatches')
+    for pattern, text in mismatches[:10]:
+        print(f'  {pattern}\n    {text!r}')
+
+    summary = f'worst review {worst_per_kb:.2f} ms/KB, limit {args.max_ms_per_kb} ms/KB'
+    if mismatches or worst_per_kb > args.max_ms_per_kb:
+        print(f'\nFAILED ({summary})')
+        sys.exit(1)
+    print(f'\nOK ({summary})')
+
+
+def time_review(analyzer, text):
+    """(elapsed ms, patterns skipped by the budget)"""
+    started = time.perf_counter()
+    result = analyzer.analyze_review(text)
+    elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, result['analysis'].get('pattern_budget', {}).get('patterns_skipped', 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Distinctive terms per company and classification on a large synthetic upload
+
+    python benchmarks/term_stats.py [--reviews 1000000] [--companies 2000] [--method log_odds]
+
+Reviews are the texts of sample_classifications.csv with three words from a 200k-word
+vocabulary appended, spread over `--companies` companies. Reports the time and peak memory
+of distinctive_terms, then checks the hashed counts of each classification's top terms
+against a plain Python tokenizer on the first 20000 reviews (hash collisions would show
+up as counts that are too high), and that companies given as a categorical with more
+categories than are ranked give the same result as plain strings
+"""
+
+import argparse
+import csv
+import os
+import random
+import re
+import resource
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.languages import extract_language_texts
+from src.models.rule_packs import get_rule_registry
+from src.models.term_stats import METHODS, distinctive_terms
+from src.utils.startup import lazy_import
+
+pd = lazy_import('pandas')
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'sample_classifications.csv')
+
+# Same tokens as the hashed tokenizer: runs of letters and digits, separated by punctuation
+TOKEN = re.compile(r'[^\W_]+')
+
+
+def synthetic_reviews(count, companies, seed=7):
+    """(texts, companies, classifications) lists of `count` reviews"""
+    with open(SAMPLE, encoding='utf-8', newline='') as handle:
+        rows = list(csv.DictReader(handle))
+    base = [(next(iter(extract_language_texts(row['review_text']).values()), ''), row['classification']) for row in rows]
+    rng = random.Random(seed)
+    vocabulary = [f'zq{i}x' for i in range(200000)]
+    texts, names, labels = [], [], []
+    for i in range(count):
+        text, label = base[i % len(base)]
+        texts.append(f'{text} {" ".join(rng.choices(vocabulary, k=3))}')
+        names.append(f'Company {rng.randrange(companies)}')
+        labels.append(label)
+    return texts, names, labels
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distinctive term ranking on a large upload')
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--companies', type=int, default=2000)
+    parser.add_argument('--method', choices=METHODS, default='log_odds')
+    args = parser.parse_args()
+
+    stopwords = get_rule_registry().current().stopwords
+    texts, companies, classifications = synthetic_reviews(args.reviews, args.companies)
+    print(f'{len(texts)} reviews, {sum(map(len, texts)) / 1e6:.0f}M characters, peak {peak_mb():.0f} MB before ranking')
+
+    started = time.perf_counter()
+    terms = distinctive_terms(texts, {'companies': companies, 'classifications': classifications}, stopwords=stopwords, method=args.method)
+    elapsed = time.perf_counter() - started
+    print(f'{args.method}: {elapsed:.2f} s ({len(texts) / elapsed:,.0f} reviews/s), peak {peak_mb():.0f} MB')
+    print(f'{terms["tokens"]:,} tokens in {terms["distinct_columns"]:,} of {terms["hashed_columns"]:,} hashed columns')
+    for label, ranked in terms['classifications'].items():
+        print(f'  {label:<20} {", ".join(entry["term"] for entry in ranked[:8])}')
+
+    # Exact counts of the same terms with a Python tokenizer
+    check = min(len(texts), 20000)
+    sample = distinctive_terms(texts[:check], {'classifications': classifications[:check]}, stopwords=stopwords, method=args.method)
+    exact = {}
+    for text, label in zip(texts[:check], classifications[:check]):
+        exact.setdefault(label, Counter()).update(TOKEN.findall(text.lower()))
+    mismatches = [
+        (label, entry['term'], entry['count'], exact[label][entry['term']])
+        for label, ranked in sample['classifications'].items()
+        for entry in ranked
+        if entry['count'] != exact[label][entry['term']]
+    ]
+    print(f'count check on {check} reviews: {len(mismatches)} mismatches {mismatches[:5]}')
+
+    # Uploads load company as a categorical with more categories than are ranked; the
+    # result must match ranking the same companies given as plain strings
+    plain = distinctive_terms(texts[:check], {'companies': companies[:check]}, stopwords=stopwords, method=args.method)
+    categorical = distinctive_terms(texts[:check], {'companies': pd.Series(companies[:check], dtype='category')}, stopwords=stopwords, method=args.method)
+    print(f'categorical companies ({len(set(companies[:check]))} categories): '
+          f'{"same ranking" if plain["companies"] == categorical["companies"] else "RANKING DIFFERS"} as plain strings')
+
+
+if __name__ == '__main__':
+    main()
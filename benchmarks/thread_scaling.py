@@ -0,0 +1,91 @@
+"""
+Batch scoring throughput: threads sharing one analyzer vs the process pool
+    python benchmarks/thread_scaling.py [--records 20000] [--workers 1 2 4 8] [--batch-size 500]
+Scores the same records with score_reviews' batch function under a ThreadPoolExecutor
+(one shared ReviewAnalyzer) and a multiprocessing Pool (one analyzer per process) for
+each worker count, and reports reviews/sec and speedup over one worker. Threads only
+scale on a free-threaded build (python3.13t with PYTHON_GIL=0); with the GIL they show
+the cost of contention. Before timing, threaded results are checked to be identical to
+serial scoring, which catches shared mutable state in the analysis path. The per-review
+matching budget is off so that CPU contention can't make results differ
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ['REVIEW_MATCH_BUDGET_MS'] = '0'
+
+from score_reviews import _init_worker, _score_batch, batched, gil_enabled
+
+SAMPLE = os.path.join(os.path.dirname(__file__), '..', 'sample_classifications.csv')
+
+
+def load_records(path, count):
+    """`count` (offset, record) pairs cycled from the input file"""
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = [row for row in csv.DictReader(f) if row.get('review_text')]
+    return [(i, rows[i % len(rows)]) for i in range(count)]
+
+
+def run_threads(tasks, workers):
+    with ThreadPoolExecutor(workers) as executor:
+        return [row for rows in executor.map(_score_batch, tasks) for row in rows]
+
+
+def run_processes(pool, tasks):
+    return [row for rows in pool.map(_score_batch, tasks) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Thread vs process batch scoring throughput')
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--input', default=SAMPLE)
+    args = parser.parse_args()
+
+    records = load_records(args.input, args.records)
+    tasks = list(batched(records, args.batch_size))
+    _init_worker()
+    print(f'{len(records)} records, {len(tasks)} batches, {os.cpu_count()} CPUs, '
+          f'GIL {"enabled" if gil_enabled() else "disabled"} (Python {sys.version.split()[0]})')
+
+    # Shared-state check: the same batches scored concurrently must match serial scoring
+    check = tasks[:max(2, max(args.workers) * 2)]
+    serial = [row for task in check for row in _score_batch(task)]
+    threaded = run_threads(check, max(args.workers))
+    if serial != threaded:
+        mismatches = sum(a != b for a, b in zip(serial, threaded))
+        print(f'FAILED: {mismatches} threaded results differ from serial scoring')
+        sys.exit(1)
+    print(f'threaded results identical to serial on {len(serial)} records\n')
+
+    print(f'{"workers":>7}  {"threads rev/s":>13} {"speedup":>7}  {"processes rev/s":>15} {"speedup":>7}')
+    baseline = {}
+    for workers in args.workers:
+        started = time.perf_counter()
+        run_threads(tasks, workers)
+        thread_rate = len(records) / (time.perf_counter() - started)
+
+        # Pool start-up (importing the analyzer and compiling rules in every worker) is
+        # excluded: a warm-up map makes sure each worker has initialized
+        with Pool(workers, initializer=_init_worker) as pool:
+            pool.map(_score_batch, tasks[:workers], chunksize=1)
+            started = time.perf_counter()
+            run_processes(pool, tasks)
+            process_rate = len(records) / (time.perf_counter() - started)
+
+        baseline.setdefault('thread', thread_rate)
+        baseline.setdefault('process', process_rate)
+        print(f'{workers:>7}  {thread_rate:>13.0f} {thread_rate / baseline["thread"]:>6.2f}x'
+              f'  {process_rate:>15.0f} {process_rate / baseline["process"]:>6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Cost of the semantic topic check against the keyword check it extends
+
+    python benchmarks/topic_relevance.py [--reviews 20000] [--batch-size 1000]
+
+Times, per review: the keyword check, semantic scoring in batches (summed per-word
+projections), semantic scoring one review at a time, and full analyze_records with the
+keyword and semantic topic modes. Reviews are synthetic mixes of every business type's
+relevant topics, with a share written about another type's topics.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.models.business_context import BusinessContext
+from src.models.rule_packs import get_rule_registry
+from src.routes.review import ReviewAnalyzer
+
+FILLER = ['the', 'was', 'really', 'and', 'we', 'visited', 'staff', 'great', 'again', 'price', 'would', 'recommend']
+
+
+def synthetic_reviews(business_types, count, seed=7):
+    """(business_type, text, written_about_another_type)"""
+    rng = random.Random(seed)
+    names = sorted(business_types)
+    reviews = []
+    for _ in range(count):
+        business_type = rng.choice(names)
+        off_topic = rng.random() < 0.2
+        source = rng.choice([name for name in names if name != business_type]) if off_topic else business_type
+        words = [rng.choice(business_types[source]['relevant']) for _ in range(rng.randint(2, 6))]
+        words += [rng.choice(FILLER) for _ in range(rng.randint(8, 40))]
+        rng.shuffle(words)
+        reviews.append((business_type, ' '.join(words), off_topic))
+    return reviews
+
+
+def per_review_us(function, count):
+    started = time.perf_counter()
+    function()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Semantic vs keyword topic relevance cost')
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    rules = get_rule_registry().current()
+    reviews = synthetic_reviews(rules.business_types, args.reviews)
+    types = [business_type for business_type, _, _ in reviews]
+    texts = [text for _, text, _ in reviews]
+    keyword_context = BusinessContext(topic_mode='keywords')
+    semantic_context = BusinessContext(topic_mode='semantic')
+
+    started = time.perf_counter()
+    rules.topic_index()
+    print(f'topic index built in {(time.perf_counter() - started) * 1000:.1f} ms')
+    semantic_context.score_topics(types[:10], texts[:10], rules)  # warm the word feature cache
+
+    keyword_us = per_review_us(lambda: [keyword_context.check_topic_relevance(t, x, rules) for t, x in zip(types, texts)], len(reviews))
+    scores = []
+    batch_us = per_review_us(lambda: [
+        scores.extend(semantic_context.score_topics(types[i:i + args.batch_size], texts[i:i + args.batch_size], rules))
+        for i in range(0, len(reviews), args.batch_size)
+    ], len(reviews))
+    single_count = min(len(reviews), 2000)
+    single_us = per_review_us(lambda: [semantic_context.score_topics([t], [x], rules) for t, x in zip(types[:single_count], texts[:single_count])], single_count)
+
+    print(f'keyword check             {keyword_us:8.1f} us/review')
+    print(f'semantic, batches of {args.batch_size:<5}{batch_us:8.1f} us/review ({batch_us / keyword_us:.1f}x keyword)')
+    print(f'semantic, one at a time   {single_us:8.1f} us/review')
+
+    # Detection on the synthetic set: off-topic means written from another type's topic list
+    keyword_flags = [not keyword_context.check_topic_relevance(t, x, rules)[0] for t, x in zip(types, texts)]
+    semantic_flags = [score['off_topic'] for score in scores]
+    truth = [off_topic for _, _, off_topic in reviews]
+    for name, flags in (('keyword', keyword_flags), ('semantic', semantic_flags)):
+        caught = sum(f and t for f, t in zip(flags, truth))
+        false_alarms = sum(f and not t for f, t in zip(flags, truth))
+        print(f'{name:<9} recall {caught / max(1, sum(truth)):.3f}  false positive rate {false_alarms / max(1, truth.count(False)):.3f}')
+
+    # End to end: the topic check is a small part of a full analysis
+    places = {business_type: name for name, business_type in rules.business_aliases.items()}
+    records = [{'review_text': text, 'place_name': places.get(t, t.replace('_', ' '))} for t, text, _ in reviews[:5000]]
+    for mode in ('keywords', 'semantic'):
+        analyzer = ReviewAnalyzer()
+        analyzer.business_context = BusinessContext(analyzer.rule_registry, topic_mode=mode)
+        analyzer.analyze_records(records[:100])
+        print(f'analyze_records, {mode:<9}{per_review_us(lambda: analyzer.analyze_records(records), len(records)):8.1f} us/review')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Evaluation harness: scores a labeled review file with ReviewAnalyzer and reports quality
+(confusion matrix, per-class precision/recall) together with throughput and latency
+
+Examples:
+    python evaluate_reviews.py sample_classifications.csv --workers 4
+    python evaluate_reviews.py labeled.jsonl --label-column label --baseline evaluations/previous.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(__file__))
+
+import score_reviews
+from score_reviews import batched, detect_format, read_records
+from src.models.evaluation import (
+    LabelMapping, classification_metrics, compare_results, confusion_matrix, flagged_metrics, latency_summary
+)
+from src.models.rule_packs import get_rule_registry
+
+
+def _evaluate_batch(batch):
+    """Analyze one batch in a worker, timing every review individually"""
+    analyzer = score_reviews._worker_analyzer
+    rows = []
+    for record, label in batch:
+        started = time.perf_counter()
+        result = analyzer.analyze_record(record)
+        rows.append((label, result['status'], (time.perf_counter() - started) * 1000))
+    return rows
+
+
+def file_digest(path):
+    if path == '-':
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_mapping(path):
+    if not path:
+        return LabelMapping()
+    with open(path, encoding='utf-8') as f:
+        mapping = json.load(f)
+    return LabelMapping(mapping.get('statuses'), mapping.get('labels'))
+
+
+def run(args):
+    input_format = detect_format(args.input, args.format)
+    mapping = load_mapping(args.mapping)
+
+    labeled = (
+        (record, record.get(args.label_column))
+        for record in read_records(args.input, input_format)
+    )
+    if args.limit:
+        labeled = (item for _, item in zip(range(args.limit), labeled))
+    tasks = batched(labeled, args.batch_size)
+
+    started = time.perf_counter()
+    rows = []
+    if args.workers > 1:
+        with Pool(args.workers, initializer=score_reviews._init_worker) as pool:
+            for batch_rows in pool.imap(_evaluate_batch, tasks):
+                rows.extend(batch_rows)
+    else:
+        score_reviews._init_worker()
+        for task in tasks:
+            rows.extend(_evaluate_batch(task))
+    elapsed = time.perf_counter() - started
+
+    pairs = []
+    unlabeled = 0
+    for label, status, _ in rows:
+        true_class = mapping.true_class(label)
+        if true_class is None:
+            unlabeled += 1
+            continue
+        pairs.append((true_class, mapping.predicted_class(status)))
+
+    matrix = confusion_matrix(pairs)
+    metrics = classification_metrics(matrix)
+    flagged = flagged_metrics(pairs)
+    status_counts = {}
+    for _, status, _ in rows:
+        status_counts[status] = status_counts.get(status, 0) + 1
+
+    result = {
+        'evaluated_at': datetime.now().isoformat(),
+        'model_version': get_rule_registry().current().version,
+        'input': {
+            'path': args.input,
+            'sha256': file_digest(args.input),
+            'label_column': args.label_column,
+            'records': len(rows),
+            'unlabeled_records': unlabeled
+        },
+        'settings': {'workers': args.workers, 'batch_size': args.batch_size},
+        'quality': {
+            'accuracy': metrics['accuracy'],
+            'macro_precision': metrics['macro']['precision'],
+            'macro_recall': metrics['macro']['recall'],
+            'macro_f1': metrics['macro']['f1'],
+            'flagged_precision': flagged['precision'],
+            'flagged_recall': flagged['recall']
+        },
+        'per_class': metrics['per_class'],
+        'confusion_matrix': matrix,
+        'flagged': flagged,
+        'status_distribution': status_counts,
+        'throughput': {
+            'elapsed_seconds': round(elapsed, 3),
+            'reviews_per_second': round(len(rows) / elapsed, 1) if elapsed > 0 else None
+        },
+        # Per-review analyzer time inside the workers (excludes parsing and IPC)
+        'latency': latency_summary([latency for _, _, latency in rows])
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            result['comparison'] = compare_results(result, json.load(f))
+
+    # Kept next to this script, like cache/ and profiles/, so runs from anywhere land in one ignored directory
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'evaluations',
+        f'{datetime.now():%Y%m%d-%H%M%S}-rules-{result["model_version"]}.json'
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    print_report(result, output)
+    return result
+
+
+def print_report(result, output):
+    quality, latency, throughput = result['quality'], result['latency'], result['throughput']
+    print(f'Evaluated {result["input"]["records"]} reviews with rules {result["model_version"]}')
+    print(f'accuracy {quality["accuracy"]}  macro-F1 {quality["macro_f1"]}  '
+          f'flagged precision {quality["flagged_precision"]} recall {quality["flagged_recall"]}')
+    print(f'{throughput["reviews_per_second"]} reviews/sec  '
+          f'p50 {latency.get("p50_ms")} ms  p99 {latency.get("p99_ms")} ms')
+
+    classes = sorted(set(result['confusion_matrix']) | {p for row in result['confusion_matrix'].values() for p in row})
+    width = max([len(cls) for cls in classes] + [12])
+    print('\nconfusion matrix (rows = labels, columns = predictions)')
+    print(' ' * width + ''.join(f'{cls[:10]:>12}' for cls in classes))
+    for true in classes:
+        row = result['confusion_matrix'].get(true, {})
+        print(f'{true:<{width}}' + ''.join(f'{row.get(predicted, 0):>12}' for predicted in classes))
+
+    print(f'\n{"class":<{width}}{"precision":>12}{"recall":>12}{"f1":>12}{"support":>12}')
+    for cls, values in result['per_class'].items():
+        print(f'{cls:<{width}}' + ''.join(
+            f'{"-" if values[key] is None else values[key]:>12}' for key in ('precision', 'recall', 'f1', 'support')
+        ))
+
+    if 'comparison' in result:
+        print(f'\nchange vs baseline (rules {result["comparison"]["baseline_model_version"]}):')
+        for key, value in result['comparison'].items():
+            if key != 'baseline_model_version':
+                print(f'  {key}: {"n/a" if value is None else f"{value:+}"}')
+    print(f'\nsaved {output}')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Evaluate ReviewAnalyzer against a labeled review file')
+    parser.add_argument('input', help="Labeled CSV, JSONL or Parquet file, or '-' for stdin")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'parquet'], help='Input format (inferred from extension)')
+    parser.add_argument('--label-column', default='classification', help='Column holding the true label')
+    parser.add_argument('--mapping', help='JSON file with "statuses" and/or "labels" class overrides')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of analyzer processes')
+    parser.add_argument('--batch-size', type=int, default=200, help='Records per worker task')
+    parser.add_argument('--limit', type=int, help='Only evaluate the first N records')
+    parser.add_argument('-o', '--output', help='Where to save the results (default: evaluations/<time>-rules-<version>.json)')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    return parser
+
+
+if __name__ == '__main__':
+    run(build_parser().parse_args())
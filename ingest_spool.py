@@ -0,0 +1,361 @@
+"""
+Spool-directory ingestion daemon: scores scraper JSONL files as they arrive
+
+Examples:
+    python ingest_spool.py spool/
+    python ingest_spool.py spool/ --db database/reviews.db --batch-size 500 --max-wait 2
+    python ingest_spool.py spool/ --once
+
+Every `--poll-interval` seconds the spool directory is scanned for *.jsonl / *.ndjson files
+(names starting with '.' or ending in .tmp / .part are still being written and are
+skipped). New complete lines are read in micro-batches of up to `--batch-size` records,
+or whatever has arrived once the oldest pending record has waited `--max-wait` seconds.
+Each micro-batch is scored with ReviewAnalyzer.analyze_records and committed to the
+review store together with the new read position of every file it came from, so a
+restart resumes after the last committed batch and no record is stored twice. Files are
+expected to be append-only: a file that shrinks below its committed position is reported
+and left alone.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.models.languages import extract_language_texts
+from src.models.review_store import ReviewStore
+from src.routes.review import ReviewAnalyzer
+
+SPOOL_SUFFIXES = ('.jsonl', '.ndjson')
+PARTIAL_SUFFIXES = ('.tmp', '.part')
+
+
+class SpoolReader:
+    """
+    Reads complete JSONL lines past each file's position
+    Positions advance as lines are read; `committed` holds the positions as of the last
+    stored batch and is what a restart resumes from
+    """
+
+    def __init__(self, directory, committed, settle_seconds=5.0):
+        self.directory = directory
+        self.settle_seconds = settle_seconds
+        self.committed = {name: dict(state) for name, state in committed.items()}
+        self.positions = {name: dict(state) for name, state in committed.items()}
+        self.truncated = set()
+
+    def scan(self):
+        """(name, size, mtime) of the spool files, oldest first"""
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith('.') or name.endswith(PARTIAL_SUFFIXES) or not name.endswith(SPOOL_SUFFIXES):
+                    continue
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                files.append((name, stat.st_size, stat.st_mtime))
+        return sorted(files, key=lambda item: (item[2], item[0]))
+
+    def backlog(self, files=None):
+        """Unread bytes, files with unread bytes and the age of the oldest unread data"""
+        now = time.time()
+        unread_bytes, unread_files, oldest = 0, 0, None
+        for name, size, mtime in files if files is not None else self.scan():
+            position = self.positions.get(name, {}).get('byte_offset', 0)
+            if name in self.truncated or size <= position:
+                continue
+            unread_bytes += size - position
+            unread_files += 1
+            oldest = mtime if oldest is None else min(oldest, mtime)
+        return {
+            'unread_bytes': unread_bytes,
+            'unread_files': unread_files,
+            'oldest_unread_seconds': round(now - oldest, 3) if oldest is not None else 0.0
+        }
+
+    def read(self, limit):
+        """Up to `limit` new records as (name, line offset, record, file mtime) tuples"""
+        records = []
+        for name, size, mtime in self.scan():
+            if len(records) >= limit:
+                break
+            state = self.positions.setdefault(name, {'byte_offset': 0, 'records': 0, 'errors': 0})
+            if size < state['byte_offset']:
+                if name not in self.truncated:
+                    self.truncated.add(name)
+                    print(f'{name} shrank below its committed position {state["byte_offset"]}; skipping it', file=sys.stderr)
+                continue
+            if size == state['byte_offset']:
+                continue
+            # An unterminated last line is only taken once the file has stopped changing
+            settled = time.time() - mtime >= self.settle_seconds
+            with open(os.path.join(self.directory, name), 'rb') as handle:
+                handle.seek(state['byte_offset'])
+                while len(records) < limit:
+                    offset = handle.tell()
+                    line = handle.readline()
+                    if not line or (not line.endswith(b'\n') and not settled):
+                        break
+                    state['byte_offset'] = offset + len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        if not isinstance(record, dict):
+                            raise ValueError('not a JSON object')
+                    except ValueError as e:
+                        state['errors'] += 1
+                        print(f'{name}@{offset}: skipped malformed record ({e})', file=sys.stderr)
+                        continue
+                    state['records'] += 1
+                    records.append((name, offset, record, mtime))
+        return records
+
+    def changed(self):
+        """Positions that moved since the last commit"""
+        return {name: dict(state) for name, state in self.positions.items() if state != self.committed.get(name)}
+
+    def commit(self, positions):
+        for name, state in positions.items():
+            self.committed[name] = dict(state)
+
+
+class IngestMetrics:
+    """Throughput, end-to-end lag and batch latency over recent batches"""
+
+    def __init__(self, window_seconds=60.0, recent_batches=200):
+        self.window_seconds = window_seconds
+        self.started = time.time()
+        self.records = 0
+        self.errors = 0
+        self.batches = 0
+        self.last_lag_seconds = None
+        self.max_lag_seconds = None
+        self._recent = deque(maxlen=recent_batches)
+
+    def record_batch(self, records, errors, latency_seconds, lag_seconds):
+        self.records += records
+        self.errors += errors
+        self.batches += 1
+        self.last_lag_seconds = lag_seconds
+        self._recent.append((time.time(), records, latency_seconds))
+        if lag_seconds is not None:
+            self.max_lag_seconds = max(self.max_lag_seconds or 0.0, lag_seconds)
+
+    def snapshot(self, backlog=None):
+        now = time.time()
+        recent = [(at, records, latency) for at, records, latency in self._recent if now - at <= self.window_seconds]
+        latencies = sorted(latency for _, _, latency in self._recent)
+        elapsed = now - self.started
+
+        def percentile(share):
+            return round(latencies[min(len(latencies) - 1, int(share * len(latencies)))] * 1000, 1) if latencies else None
+
+        return {
+            'records': self.records,
+            'errors': self.errors,
+            'batches': self.batches,
+            'uptime_seconds': round(elapsed, 1),
+            'records_per_second': round(self.records / elapsed, 1) if elapsed > 0 else None,
+            'recent_records_per_second': round(sum(records for _, records, _ in recent) / min(self.window_seconds, elapsed), 1) if elapsed > 0 else None,
+            'batch_latency_ms': {'p50': percentile(0.5), 'p95': percentile(0.95), 'max': percentile(1.0)},
+            'lag_seconds': {'last': self.last_lag_seconds, 'max': self.max_lag_seconds},
+            'backlog': backlog
+        }
+
+
+def text_field(record, *keys):
+    """The first of `keys` present in the record as a string, or None; objects and lists raise ValueError"""
+    value = next((record[key] for key in keys if record.get(key) is not None), None)
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        raise ValueError(f'{keys[0]} is a JSON {type(value).__name__}, not a value')
+    return str(value)
+
+
+def record_fields(record):
+    """The identity fields of a record as strings or None; ValueError if one is a JSON object or list"""
+    return {
+        'review_id': text_field(record, 'review_id'),
+        'author': text_field(record, 'author'),
+        'company': text_field(record, 'company', 'place_name', 'business_name')
+    }
+
+
+def stored_row(analyzer, name, offset, record, fields, result):
+    """One scored_reviews row of the review store"""
+    text = record.get('review_text', record.get('text', ''))
+    variants = extract_language_texts(text)
+    rating = record.get('star_rating', record.get('rating'))
+    try:
+        rating = float(rating) if rating not in (None, '') else None
+    except (TypeError, ValueError):
+        rating = None
+    return {
+        'source': name,
+        'line_offset': offset,
+        **fields,
+        'rating': rating,
+        'review_text': next(iter(variants.values()), ''),
+        'status': result['status'],
+        'legitimate': result['legitimate'],
+        'confidence': result['confidence'],
+        'sentiment': result['analysis']['sentiment'],
+        'violation_types': [violation['type'] for violation in result['analysis']['policy_violations']],
+        'model_version': analyzer.model_version
+    }
+
+
+def score_batch(analyzer, batch):
+    """
+    Stored rows for a batch, and how many records were skipped
+    Records whose fields cannot be stored are skipped before scoring; if batch scoring
+    fails, records are scored one by one and failures skipped
+    """
+    storable = []
+    for name, offset, record, _ in batch:
+        try:
+            storable.append((name, offset, record, record_fields(record)))
+        except ValueError as e:
+            print(f'{name}@{offset}: skipped unstorable record ({e})', file=sys.stderr)
+
+    records = [record for _, _, record, _ in storable]
+    try:
+        results = analyzer.analyze_records(records)
+    except Exception as e:
+        print(f'batch scoring failed ({type(e).__name__}: {e}); scoring records one at a time', file=sys.stderr)
+        results = []
+        for name, offset, record, _ in storable:
+            try:
+                results.append(analyzer.analyze_record(record))
+            except Exception as record_error:
+                print(f'{name}@{offset}: scoring failed ({type(record_error).__name__}: {record_error})', file=sys.stderr)
+                results.append(None)
+
+    rows = []
+    for (name, offset, record, fields), result in zip(storable, results):
+        if result is None:
+            continue
+        try:
+            rows.append(stored_row(analyzer, name, offset, record, fields, result))
+        except (KeyError, TypeError, ValueError) as e:
+            print(f'{name}@{offset}: skipped unstorable result ({type(e).__name__}: {e})', file=sys.stderr)
+    return rows, len(batch) - len(rows)
+
+
+def acquire_lock(db_path):
+    """
+    Hold an exclusive lock next to the store so two daemons never ingest into it at once
+    Returns the function that releases it. Without flock (Windows) the lock is a file
+    created with O_EXCL, which a killed daemon leaves behind and has to be removed by hand
+    """
+    path = db_path + '.lock'
+    if fcntl is None:
+        try:
+            descriptor = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            raise SystemExit(f'Another ingestion daemon is using {db_path} (remove {path} if none is running)')
+        os.write(descriptor, str(os.getpid()).encode('ascii'))
+
+        def release():
+            os.close(descriptor)
+            os.remove(path)
+        return release
+
+    handle = open(path, 'w')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise SystemExit(f'Another ingestion daemon is using {db_path}')
+    return handle.close
+
+
+def run(args):
+    os.makedirs(args.spool, exist_ok=True)
+    store = ReviewStore(args.db)
+    release_lock = acquire_lock(args.db)
+    analyzer = ReviewAnalyzer()
+    reader = SpoolReader(args.spool, store.file_positions(), settle_seconds=args.settle)
+    metrics = IngestMetrics()
+
+    stopping = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.append(True))
+
+    pending = []
+    first_pending_at = None
+    last_report = time.monotonic()
+    try:
+        while True:
+            arrived = reader.read(args.batch_size - len(pending))
+            pending.extend(arrived)
+            changed = reader.changed()
+            if changed and first_pending_at is None:
+                first_pending_at = time.monotonic()
+
+            idle = not arrived
+            due = changed and (
+                len(pending) >= args.batch_size
+                or time.monotonic() - first_pending_at >= args.max_wait
+                or (idle and (args.once or stopping))
+            )
+            if due:
+                started = time.perf_counter()
+                rows, failed = score_batch(analyzer, pending)
+                committed_at = time.time()
+                # Lag: from the time the source file was last written to the commit of its records
+                lag = round(committed_at - min(mtime for _, _, _, mtime in pending), 3) if pending else None
+                skipped = sum(state['errors'] - reader.committed.get(name, {}).get('errors', 0) for name, state in changed.items())
+                rejected = store.append_batch(rows, changed)
+                metrics.record_batch(len(rows) - rejected, skipped + failed + rejected, time.perf_counter() - started, lag)
+                store.save_metrics(metrics.snapshot())
+                reader.commit(changed)
+                pending, first_pending_at = [], None
+
+            if time.monotonic() - last_report >= args.report_every:
+                snapshot = metrics.snapshot(reader.backlog())
+                store.save_metrics(snapshot)
+                print(json.dumps(snapshot), file=sys.stderr)
+                last_report = time.monotonic()
+
+            if idle and not changed and (args.once or stopping):
+                break
+            if idle and not due:
+                time.sleep(args.poll_interval)
+    finally:
+        snapshot = metrics.snapshot(reader.backlog())
+        store.save_metrics(snapshot)
+        release_lock()
+    print(json.dumps(snapshot), file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Score scraper JSONL files dropped into a spool directory')
+    parser.add_argument('spool', help='Directory the scrapers write JSONL files into')
+    parser.add_argument('--db', default=os.environ.get('REVIEW_INGEST_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'reviews.db')),
+                        help='Review store (SQLite) that results and read positions are committed to')
+    parser.add_argument('--batch-size', type=int, default=500, help='Records per micro-batch')
+    parser.add_argument('--max-wait', type=float, default=2.0, help='Seconds a pending record waits for its batch to fill')
+    parser.add_argument('--poll-interval', type=float, default=0.5, help='Seconds between directory scans when idle')
+    parser.add_argument('--settle', type=float, default=5.0, help='Seconds unchanged before an unterminated last line is read')
+    parser.add_argument('--report-every', type=float, default=30.0, help='Seconds between metrics reports on stderr')
+    parser.add_argument('--once', action='store_true', help='Ingest what is in the spool now, then exit')
+    return parser
+
+
+if __name__ == '__main__':
+    run(build_parser().parse_args())
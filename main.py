@@ -3,29 +3,46 @@ import sys
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 
-from flask import Flask, send_from_directory
-from flask_cors import CORS
-from src.models.user import db
-from src.routes.user import user_bp
-from src.routes.review import review_bp
-from src.routes.dashboard import dashboard_bp
+from src.utils.startup import startup_report
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+with startup_report.phase('imports'):
+    from flask import Flask, jsonify, send_from_directory
+    from flask_cors import CORS
+    from src.models.user import db
+    from src.routes.user import user_bp
+    from src.routes.review import review_bp
+    from src.routes.dashboard import dashboard_bp
+    from src.routes.admin import admin_bp
+    from src.utils.serialization import FastJSONProvider
 
-# Enable CORS for all routes
-CORS(app)
+with startup_report.phase('app_setup'):
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    # NumPy/pandas-aware JSON encoding for every jsonify() call
+    app.json = FastJSONProvider(app)
+    app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(review_bp, url_prefix='/api')
-app.register_blueprint(dashboard_bp, url_prefix='/api')
+    # Enable CORS for all routes
+    CORS(app)
+
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(review_bp, url_prefix='/api')
+    app.register_blueprint(dashboard_bp, url_prefix='/api')
+    # Admin endpoints, and the request hooks that capture on-demand profiles
+    app.register_blueprint(admin_bp, url_prefix='/api')
 
 # uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
+# Tables are created lazily by the user blueprint on its first request
+with startup_report.phase('db_init'):
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+startup_report.mark_ready()
+
+@app.route('/api/startup-report', methods=['GET'])
+def startup_report_view():
+    """Report cold-start timings and which heavy modules have been loaded so far"""
+    return jsonify(startup_report.to_dict())
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
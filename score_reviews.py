@@ -0,0 +1,269 @@
+"""
+Offline bulk scorer: streams reviews from CSV, JSONL or Parquet through ReviewAnalyzer
+
+Examples:
+    python score_reviews.py reviews.csv -o scored.jsonl --workers 4
+    cat reviews.jsonl | python score_reviews.py - --format jsonl -o scored.jsonl
+    python score_reviews.py reviews.parquet -o scored_parquet --output-format parquet --resume
+    python score_reviews.py reviews.csv -o scored.jsonl --workers 8 --executor thread
+"""
+
+import argparse
+import csv
+import glob
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.routes.review import ReviewAnalyzer
+
+_worker_analyzer = None
+
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = ReviewAnalyzer()
+
+
+def gil_enabled():
+    """False on a free-threaded build running without the GIL, where threads scale across cores"""
+    return getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+def score_record(offset, record, result=None):
+    """Score one input record into a flat output row (`result` if it was already analyzed)"""
+    if result is None:
+        result = _worker_analyzer.analyze_record(record)
+    violations = result['analysis']['policy_violations']
+    return {
+        'offset': offset,
+        'review_id': record.get('review_id'),
+        'status': result['status'],
+        'legitimate': result['legitimate'],
+        'confidence': result['confidence'],
+        'sentiment': result['analysis']['sentiment'],
+        'violation_types': [v['type'] for v in violations],
+        'violation_count': len(violations)
+    }
+
+
+def _score_batch(batch):
+    results = _worker_analyzer.analyze_records(record for _, record in batch)
+    return [score_record(offset, record, result) for (offset, record), result in zip(batch, results)]
+
+
+def detect_format(path, explicit_format):
+    if explicit_format:
+        return explicit_format
+    if path == '-':
+        raise SystemExit('--format is required when reading from stdin')
+    extension = os.path.splitext(path)[1].lower()
+    formats = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+    if extension not in formats:
+        raise SystemExit(f'Cannot infer input format from {path!r}; use --format')
+    return formats[extension]
+
+
+def read_records(path, input_format):
+    """Yield input records one at a time without loading the whole file"""
+    if input_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit('Parquet input requires pyarrow (pip install pyarrow)')
+        source = sys.stdin.buffer if path == '-' else path
+        for record_batch in pq.ParquetFile(source).iter_batches(batch_size=10000):
+            yield from record_batch.to_pylist()
+        return
+
+    stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8') if path == '-' else open(path, encoding='utf-8', newline='')
+    try:
+        if input_format == 'csv':
+            yield from csv.DictReader(stream)
+        else:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+    finally:
+        if path != '-':
+            stream.close()
+
+
+class Checkpoint:
+    """Tracks how many input records have been durably written, updated atomically"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {'records_done': 0, 'output_bytes': 0, 'parts_written': 0}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.state.update(json.load(f))
+        return self.state
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class JsonlWriter:
+    def __init__(self, path, checkpoint, resume):
+        self.checkpoint = checkpoint
+        output_bytes = checkpoint.state['output_bytes'] if resume else 0
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < output_bytes:
+            raise SystemExit(f'Cannot resume: {path} has {size} bytes but the checkpoint recorded {output_bytes}; '
+                             'restore the output or run without --resume')
+        self.file = open(path, 'r+b' if resume and os.path.exists(path) else 'wb')
+        # Drop anything written after the last checkpoint so a crash never duplicates rows
+        self.file.seek(output_bytes)
+        self.file.truncate()
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(row).encode('utf-8') + b'\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.checkpoint.state['output_bytes'] = self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Writes one part file per batch into an output directory"""
+
+    def __init__(self, path, checkpoint, resume):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit('Parquet output requires pyarrow (pip install pyarrow)')
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.checkpoint = checkpoint
+        os.makedirs(path, exist_ok=True)
+        if not resume:
+            checkpoint.state['parts_written'] = 0
+        parts_written = checkpoint.state['parts_written']
+        missing = [part for part in range(parts_written) if not os.path.exists(self._part_path(part))]
+        if missing:
+            raise SystemExit(f'Cannot resume: {self._part_path(missing[0])} recorded by the checkpoint is missing; '
+                             'restore the output or run without --resume')
+        # Parts past the checkpoint are from an interrupted or earlier run and would mix into the dataset
+        for part_path in glob.glob(os.path.join(path, 'part-*.parquet')):
+            name = os.path.basename(part_path)[len('part-'):-len('.parquet')]
+            if not name.isdigit() or int(name) >= parts_written:
+                os.remove(part_path)
+
+    def _part_path(self, part):
+        return os.path.join(self.path, f'part-{part:05d}.parquet')
+
+    def write(self, rows):
+        part = self.checkpoint.state['parts_written']
+        self.pq.write_table(self.pa.Table.from_pylist(rows), self._part_path(part))
+        self.checkpoint.state['parts_written'] = part + 1
+
+    def close(self):
+        pass
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run(args):
+    input_format = detect_format(args.input, args.format)
+    checkpoint = Checkpoint(args.checkpoint or args.output + '.checkpoint')
+    if args.resume:
+        checkpoint.load()
+    skip = checkpoint.state['records_done']
+
+    writer_class = ParquetWriter if args.output_format == 'parquet' else JsonlWriter
+    writer = writer_class(args.output, checkpoint, args.resume)
+
+    records = itertools.islice(enumerate(read_records(args.input, input_format)), skip, None)
+    # Each pool task is a small batch; a group of tasks is scored, written and
+    # checkpointed together, which also bounds how much input is held in memory
+    tasks = batched(records, args.batch_size)
+    started = time.perf_counter()
+    scored = 0
+
+    # Process workers each build their own analyzer; thread workers share one, which is
+    # safe because rule packs are immutable and scoring keeps no per-call shared state
+    pool = None
+    if args.workers > 1 and args.executor == 'process':
+        pool = Pool(args.workers, initializer=_init_worker)
+    else:
+        _init_worker()
+        if args.workers > 1:
+            pool = ThreadPoolExecutor(args.workers)
+    try:
+        for group in batched(tasks, args.checkpoint_every):
+            results = list(pool.map(_score_batch, group)) if pool else [_score_batch(task) for task in group]
+            rows = [row for batch_rows in results for row in batch_rows]
+            writer.write(rows)
+            scored += len(rows)
+            checkpoint.state['records_done'] = rows[-1]['offset'] + 1
+            checkpoint.save()
+            if args.progress:
+                elapsed = time.perf_counter() - started
+                print(f'scored {checkpoint.state["records_done"]} records '
+                      f'({scored / elapsed:.0f} reviews/sec)', file=sys.stderr)
+    finally:
+        if isinstance(pool, ThreadPoolExecutor):
+            pool.shutdown()
+        elif pool:
+            pool.close()
+            pool.join()
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'records_scored': scored,
+        'records_skipped_on_resume': skip,
+        'elapsed_seconds': round(elapsed, 3),
+        'reviews_per_second': round(scored / elapsed, 1) if elapsed > 0 else None,
+        'executor': args.executor,
+        'workers': args.workers,
+        'gil_enabled': gil_enabled()
+    }), file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Score reviews offline with the same analyzer as the API')
+    parser.add_argument('input', help="Input file path, or '-' for stdin")
+    parser.add_argument('-o', '--output', required=True, help='Output JSONL file or Parquet directory')
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'parquet'], help='Input format (inferred from extension)')
+    parser.add_argument('--output-format', choices=['jsonl', 'parquet'], default='jsonl')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of scoring processes or threads')
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help='Worker processes, or threads sharing one analyzer (scales on free-threaded Python)')
+    parser.add_argument('--batch-size', type=int, default=500, help='Records per worker task')
+    parser.add_argument('--checkpoint-every', type=int, default=20, help='Worker tasks per durable write and checkpoint')
+    parser.add_argument('--checkpoint', help='Checkpoint file (default: <output>.checkpoint)')
+    parser.add_argument('--resume', action='store_true', help='Continue from the last checkpointed offset')
+    parser.add_argument('--progress', action='store_true', help='Print throughput after every checkpoint')
+    return parser
+
+
+if __name__ == '__main__':
+    run(build_parser().parse_args())
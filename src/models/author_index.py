@@ -0,0 +1,272 @@
+"""
+Author-level behavioral aggregation index
+Accumulates per-author sufficient statistics across uploads so prolific, high-risk authors
+can be ranked without re-reading earlier files. Legitimacy scores come from an upload's
+`legitimacy_score` column or from the analyzer's per-review confidence, fed in by the
+paths that score reviews
+"""
+
+import hashlib
+import math
+import threading
+
+from src.utils.frames import as_text_index, fill_missing
+from src.utils.startup import lazy_import
+
+pd = lazy_import('pandas')
+
+# Classifications that do not count towards an author's violation rate
+CLEAN_CLASSIFICATIONS = {'legitimate_review', 'legitimate', 'authentic', 'no written review'}
+
+_STAT_COLUMNS = [
+    'review_count', 'rating_count', 'rating_sum', 'rating_sumsq', 'extreme_ratings',
+    'violation_count', 'score_count', 'score_sum', 'score_sumsq'
+]
+
+
+class AuthorIndex:
+    """Incrementally merged per-author statistics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = None              # DataFrame indexed by author, _STAT_COLUMNS
+        self._author_companies = None   # DataFrame of distinct (author, company) pairs
+        self._violation_mix = None      # Series indexed by (author, classification)
+        self._ingested = set()
+        self._scored = set()
+
+    @staticmethod
+    def fingerprint(content):
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return hashlib.sha1(content).hexdigest()
+
+    def ingest(self, df, fingerprint=None, score_column='legitimacy_score'):
+        """
+        Merge one processed upload into the index in a single grouped pass
+        Reviews without an author are left out rather than pooled under one name, and
+        uploads with an already-seen fingerprint are skipped so repeats don't double count
+        Returns: True if the upload was merged
+        """
+        if 'author' not in df.columns:
+            return False
+        df = df[_known_authors(df['author'])]
+        if df.empty:
+            return False
+
+        with self._lock:
+            if fingerprint is not None and fingerprint in self._ingested:
+                return False
+
+        # Categorical columns are grouped on their integer codes; only the per-author
+        # result index is converted to strings
+        frame = pd.DataFrame({'author': df['author']})
+        frame['rating'] = pd.to_numeric(df['rating'], errors='coerce') if 'rating' in df.columns else float('nan')
+        frame['rating_sq'] = frame['rating'] ** 2
+        frame['extreme'] = frame['rating'].isin([1.0, 5.0])
+        if 'classification' in df.columns:
+            classification = fill_missing(df['classification'], 'unknown')
+            frame['classification'] = classification
+            if isinstance(classification.dtype, pd.CategoricalDtype):
+                # Decide once per category instead of once per row
+                clean_codes = [i for i, name in enumerate(classification.cat.categories) if str(name).lower() in CLEAN_CLASSIFICATIONS]
+                frame['violation'] = ~classification.cat.codes.isin(clean_codes)
+            else:
+                frame['violation'] = ~classification.astype(str).str.lower().isin(CLEAN_CLASSIFICATIONS)
+        else:
+            frame['violation'] = False
+        if score_column in df.columns:
+            frame['score'] = pd.to_numeric(df[score_column], errors='coerce')
+        else:
+            frame['score'] = float('nan')
+        frame['score_sq'] = frame['score'] ** 2
+
+        grouped = frame.groupby('author', sort=False, observed=True)
+        stats = grouped.agg(
+            review_count=('author', 'size'),
+            rating_count=('rating', 'count'),
+            rating_sum=('rating', 'sum'),
+            rating_sumsq=('rating_sq', 'sum'),
+            extreme_ratings=('extreme', 'sum'),
+            violation_count=('violation', 'sum'),
+            score_count=('score', 'count'),
+            score_sum=('score', 'sum'),
+            score_sumsq=('score_sq', 'sum')
+        ).astype('float64')
+        stats.index = as_text_index(stats.index)
+
+        companies = None
+        if 'company' in df.columns:
+            companies = pd.DataFrame({
+                'author': frame['author'],
+                'company': fill_missing(df['company'], 'Unknown Company')
+            }).drop_duplicates().astype(str)
+
+        violation_mix = None
+        if 'classification' in frame.columns:
+            violation_mix = grouped['classification'].value_counts()
+            violation_mix = violation_mix[violation_mix > 0]
+            violation_mix.index = pd.MultiIndex.from_arrays(
+                [as_text_index(violation_mix.index.get_level_values(level)) for level in (0, 1)],
+                names=['author', 'classification']
+            )
+
+        with self._lock:
+            if fingerprint is not None:
+                if fingerprint in self._ingested:
+                    return False
+                self._ingested.add(fingerprint)
+
+            self._stats = stats if self._stats is None else self._stats.add(stats, fill_value=0)
+            if companies is not None:
+                merged = companies if self._author_companies is None else pd.concat([self._author_companies, companies])
+                self._author_companies = merged.drop_duplicates(ignore_index=True)
+            if violation_mix is not None:
+                self._violation_mix = (
+                    violation_mix if self._violation_mix is None
+                    else self._violation_mix.add(violation_mix, fill_value=0)
+                )
+        return True
+
+    def ingest_scores(self, authors, scores, fingerprint=None):
+        """
+        Merge per-review legitimacy scores from a scoring path (e.g. CSV analysis)
+        Only the score statistics change, so an upload that is also ingested by the
+        dashboard is not counted twice; scores with an already-seen fingerprint are skipped
+        Returns: True if the scores were merged
+        """
+        frame = pd.DataFrame({
+            'author': pd.Series(authors).reset_index(drop=True),
+            'score': pd.to_numeric(pd.Series(scores).reset_index(drop=True), errors='coerce')
+        })
+        frame = frame[_known_authors(frame['author']) & frame['score'].notna()]
+        if frame.empty:
+            return False
+
+        frame['score_sq'] = frame['score'] ** 2
+        stats = frame.groupby('author', sort=False, observed=True).agg(
+            score_count=('score', 'count'),
+            score_sum=('score', 'sum'),
+            score_sumsq=('score_sq', 'sum')
+        ).astype('float64').reindex(columns=_STAT_COLUMNS, fill_value=0.0)
+        stats.index = as_text_index(stats.index)
+
+        with self._lock:
+            if fingerprint is not None:
+                if fingerprint in self._scored:
+                    return False
+                self._scored.add(fingerprint)
+            self._stats = stats if self._stats is None else self._stats.add(stats, fill_value=0)
+        return True
+
+    def has_scores(self, fingerprint):
+        with self._lock:
+            return fingerprint in self._scored
+
+    def __len__(self):
+        """Authors with indexed reviews (authors known only from scores are not counted)"""
+        return 0 if self._stats is None else int((self._stats['review_count'] > 0).sum())
+
+    @property
+    def uploads_indexed(self):
+        return len(self._ingested)
+
+    def _profiles(self, authors=None):
+        """Derive per-author profile columns from the accumulated sums"""
+        stats = self._stats
+        if authors is not None:
+            stats = stats[stats.index.isin(authors)]
+        profiles = pd.DataFrame(index=stats.index)
+        profiles['review_count'] = stats['review_count'].astype('int64')
+
+        rating_count = stats['rating_count'].where(stats['rating_count'] > 0)
+        profiles['rating_mean'] = stats['rating_sum'] / rating_count
+        profiles['rating_variance'] = (stats['rating_sumsq'] / rating_count - profiles['rating_mean'] ** 2).clip(lower=0)
+        review_count = stats['review_count'].where(stats['review_count'] > 0)
+        profiles['extreme_rating_share'] = stats['extreme_ratings'] / review_count
+        profiles['violation_rate'] = stats['violation_count'] / review_count
+
+        score_count = stats['score_count'].where(stats['score_count'] > 0)
+        profiles['legitimacy_mean'] = stats['score_sum'] / score_count
+        profiles['legitimacy_variance'] = (stats['score_sumsq'] / score_count - profiles['legitimacy_mean'] ** 2).clip(lower=0)
+
+        if self._author_companies is not None:
+            spread = self._author_companies.groupby('author').size()
+            profiles['company_count'] = spread.reindex(profiles.index, fill_value=0).astype('int64')
+        else:
+            profiles['company_count'] = 0
+
+        # Weighted blend of the behaviors that concentrate fraud: violations, extreme
+        # ratings, reviewing many unrelated companies, volume and low legitimacy
+        # (authors without scores get no legitimacy penalty)
+        profiles['risk_score'] = (
+            0.35 * profiles['violation_rate']
+            + 0.25 * profiles['extreme_rating_share']
+            + 0.2 * ((profiles['company_count'] - 1).clip(lower=0) / 5).clip(upper=1)
+            + 0.1 * (profiles['review_count'].map(math.log1p) / math.log1p(50)).clip(upper=1)
+            + 0.1 * (1 - profiles['legitimacy_mean'].fillna(1))
+        )
+        return profiles
+
+    def top_risk_authors(self, authors=None, limit=10, min_reviews=1):
+        """Return the highest-risk authors, optionally restricted to a set of authors"""
+        with self._lock:
+            if self._stats is None:
+                return []
+            profiles = self._profiles(authors)
+            violation_mix = self._violation_mix
+
+        profiles = profiles[profiles['review_count'] >= min_reviews]
+        top = profiles.sort_values(['risk_score', 'review_count'], ascending=False).head(limit)
+
+        results = []
+        for author, row in top.iterrows():
+            mix = {}
+            if violation_mix is not None and author in violation_mix.index.get_level_values(0):
+                mix = {str(k): int(v) for k, v in violation_mix.loc[author].items()}
+            results.append({
+                'author': author,
+                'review_count': int(row['review_count']),
+                'company_count': int(row['company_count']),
+                'rating_mean': _rounded(row['rating_mean']),
+                'rating_variance': _rounded(row['rating_variance']),
+                'extreme_rating_share': _rounded(row['extreme_rating_share']),
+                'violation_rate': _rounded(row['violation_rate']),
+                'violation_mix': mix,
+                'legitimacy_mean': _rounded(row['legitimacy_mean']),
+                'legitimacy_variance': _rounded(row['legitimacy_variance']),
+                'risk_score': _rounded(row['risk_score'])
+            })
+        return results
+
+
+_author_index = None
+_author_index_lock = threading.Lock()
+
+
+def get_author_index():
+    """Index shared by the dashboard and the scoring paths of this process"""
+    global _author_index
+    if _author_index is None:
+        with _author_index_lock:
+            if _author_index is None:
+                _author_index = AuthorIndex()
+    return _author_index
+
+
+def _known_authors(authors):
+    """Mask of the rows whose author is present and not blank"""
+    known = authors.notna()
+    if isinstance(authors.dtype, pd.CategoricalDtype):
+        blank = [code for code, name in enumerate(authors.cat.categories) if not str(name).strip()]
+        if blank:
+            known &= ~authors.cat.codes.isin(blank)
+    else:
+        known &= authors.astype(str).str.strip().ne('')
+    return known
+
+
+def _rounded(value, digits=3):
+    if value is None or pd.isna(value):
+        return None
+    return round(float(value), digits)
@@ -0,0 +1,177 @@
+"""
+Business-name catalog with approximate matching
+Maps business names to business types for names the alias table doesn't know. Names are
+normalized and indexed by character trigrams in compressed posting lists; a lookup counts
+the trigrams each catalog name shares with the query and returns the most similar name
+(Jaccard similarity, as in pg_trgm) if it clears the threshold
+"""
+
+import csv
+import hashlib
+import io
+import re
+import threading
+import unicodedata
+
+from src.utils.startup import lazy_import
+
+np = lazy_import('numpy')
+
+# Legal forms and articles that don't tell businesses apart
+_IGNORED_WORDS = frozenset({'the', 'inc', 'llc', 'ltd', 'co', 'corp', 'corporation', 'company', 'incorporated', 'plc', 'gmbh'})
+_NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_name(name):
+    """Lower-cased ASCII words without punctuation, legal suffixes or articles"""
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = text.replace('&', ' and ').replace("'", '')
+    words = [word for word in _NON_ALPHANUMERIC.sub(' ', text).split() if word not in _IGNORED_WORDS]
+    return ' '.join(words)
+
+
+def name_trigrams(normalized):
+    """Set of trigrams of each word padded with two leading blanks and one trailing blank"""
+    trigrams = set()
+    for word in normalized.split():
+        padded = f'  {word} '
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class BusinessCatalog:
+    """
+    Read-only name -> business type index, built once per catalog file version
+    Exact normalized names are a dict lookup; anything else is scored against the
+    catalog names sharing at least one of its trigrams. Results (including misses) are
+    memoized because uploads repeat the same few company names many times
+    """
+
+    def __init__(self, entries, min_similarity=0.5, max_cached_names=100000, version=None):
+        self.version = version
+        self.min_similarity = min_similarity
+        self.max_cached_names = max_cached_names
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+        self.names = []
+        self.types = []
+        self._type_codes = {}
+        type_codes = []
+        self._exact = {}
+        trigram_ids = {}
+        entry_ids, trigram_refs, sizes = [], [], []
+        for name, business_type in entries:
+            normalized = normalize_name(name)
+            if not normalized or not business_type or normalized in self._exact:
+                continue  # first entry wins for duplicate names
+            entry = len(self.names)
+            self.names.append(name)
+            self._exact[normalized] = entry
+            code = self._type_codes.setdefault(business_type, len(self.types))
+            if code == len(self.types):
+                self.types.append(business_type)
+            type_codes.append(code)
+            trigrams = name_trigrams(normalized)
+            sizes.append(len(trigrams))
+            for trigram in trigrams:
+                trigram_refs.append(trigram_ids.setdefault(trigram, len(trigram_ids)))
+            entry_ids.extend([entry] * len(trigrams))
+
+        # Posting lists in CSR form: entries containing trigram t are
+        # postings[offsets[t]:offsets[t + 1]]
+        self._trigram_ids = trigram_ids
+        self._entry_types = np.asarray(type_codes, dtype=np.int32)
+        self._sizes = np.asarray(sizes, dtype=np.int32)
+        trigram_refs = np.asarray(trigram_refs, dtype=np.int64)
+        order = np.argsort(trigram_refs, kind='stable')
+        self._postings = np.asarray(entry_ids, dtype=np.int32)[order]
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(trigram_refs, minlength=len(trigram_ids))))).astype(np.int64)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        Catalog from a CSV file with `name` and `business_type` columns
+        Its version is a hash of the file, so cached results can be keyed by catalog content
+        """
+        with open(path, 'rb') as f:
+            content = f.read()
+        reader = csv.DictReader(io.StringIO(content.decode('utf-8-sig'), newline=''))
+        missing = {'name', 'business_type'} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f'Business catalog {path} is missing columns: {", ".join(sorted(missing))}')
+        version = hashlib.sha256(content).hexdigest()[:12]
+        return cls(((row['name'], (row['business_type'] or '').strip()) for row in reader), version=version, **kwargs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, name):
+        """
+        Most similar catalog entry for a business name
+        Returns: {'name', 'business_type', 'similarity'} or None below the threshold
+        """
+        if not isinstance(name, str) or not name.strip():
+            return None
+        cached = self._cache.get(name, False)
+        if cached is not False:
+            return cached
+
+        result = self._match(normalize_name(name))
+        with self._cache_lock:
+            if len(self._cache) >= self.max_cached_names:
+                self._cache.clear()
+            self._cache[name] = result
+        return result
+
+    def match_many(self, names):
+        """Every distinct name matched once: {name: match result}"""
+        return {name: self.match(name) for name in dict.fromkeys(names) if isinstance(name, str)}
+
+    def _match(self, normalized):
+        if not normalized:
+            return None
+        entry = self._exact.get(normalized)
+        if entry is not None:
+            return self._result(entry, 1.0)
+
+        trigrams = name_trigrams(normalized)
+        query_size = len(trigrams)
+        ids = [self._trigram_ids[t] for t in trigrams if t in self._trigram_ids]
+        # Jaccard >= threshold needs at least threshold * |query| shared trigrams
+        min_shared = max(1, int(np.ceil(self.min_similarity * query_size - 1e-9)))
+        if len(ids) < min_shared:
+            return None
+
+        # Shared-trigram count of every catalog name in one pass over the query's posting lists
+        counts = np.bincount(np.concatenate([self._posting(t) for t in ids]), minlength=len(self.names))
+        candidates = np.flatnonzero(counts >= min_shared)
+        if not len(candidates):
+            return None
+        shared = counts[candidates]
+        sizes = self._sizes[candidates]
+        similarity = shared / (query_size + sizes - shared)
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.min_similarity:
+            return None
+        return self._result(int(candidates[best]), float(similarity[best]))
+
+    def _posting(self, trigram_id):
+        """Catalog entries containing a trigram, in ascending entry order"""
+        return self._postings[self._offsets[trigram_id]:self._offsets[trigram_id + 1]]
+
+    def _result(self, entry, similarity):
+        return {
+            'name': self.names[entry],
+            'business_type': self.types[self._entry_types[entry]],
+            'similarity': round(similarity, 4)
+        }
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'entries': len(self.names),
+            'business_types': len(self.types),
+            'trigrams': len(self._trigram_ids),
+            'min_similarity': self.min_similarity
+        }
@@ -1,194 +1,121 @@
 """
 Business Type Context Dataset for Review Legitimacy Detection
 Provides context-aware topic detection based on business type
+The topic tables, aliases and name keywords live in rules/business_context.json; other
+business names are looked up in the rules/business_catalog.csv name catalog
 """
 
+import os
+
+from src.models.languages import DEFAULT_LANGUAGE
+from src.models.rule_packs import get_rule_registry
+
+# 'keywords' matches the irrelevant-topic lists literally; 'semantic' compares the review's
+# embedding with topic centroids; 'both' flags a review if either check does
+TOPIC_MODES = ('keywords', 'semantic', 'both')
+
+
 class BusinessContext:
-    def __init__(self):
-        # Comprehensive business type mapping with relevant and irrelevant topics
-        self.business_types = {
-            # Food & Dining
-            'restaurant': {
-                'relevant': ['food', 'meal', 'dish', 'cuisine', 'menu', 'chef', 'dining', 'taste', 'flavor', 'service', 'waiter', 'waitress', 'table', 'reservation', 'atmosphere', 'ambiance', 'price', 'portion', 'appetizer', 'entree', 'dessert', 'wine', 'beer', 'cocktail', 'drink', 'beverage'],
-                'irrelevant': ['book', 'clothing', 'electronics', 'car', 'phone', 'computer', 'software', 'medicine', 'haircut', 'massage', 'gym', 'workout', 'hotel', 'room']
-            },
-            'fast_food': {
-                'relevant': ['burger', 'fries', 'chicken', 'sandwich', 'combo', 'meal', 'drive-thru', 'quick', 'fast', 'takeout', 'delivery', 'sauce', 'soda', 'shake', 'nuggets', 'wrap', 'salad'],
-                'irrelevant': ['alcohol', 'wine', 'beer', 'cocktail', 'book', 'clothing', 'electronics', 'car', 'phone', 'computer', 'medicine', 'haircut', 'massage', 'gym', 'hotel']
-            },
-            'coffee_shop': {
-                'relevant': ['coffee', 'espresso', 'latte', 'cappuccino', 'americano', 'mocha', 'frappuccino', 'tea', 'pastry', 'muffin', 'croissant', 'wifi', 'study', 'laptop', 'barista', 'beans', 'roast', 'milk', 'sugar', 'cream'],
-                'irrelevant': ['alcohol', 'wine', 'beer', 'cocktail', 'burger', 'pizza', 'steak', 'book', 'clothing', 'electronics', 'car', 'medicine', 'haircut', 'massage', 'gym']
-            },
-            'bar': {
-                'relevant': ['beer', 'wine', 'cocktail', 'whiskey', 'vodka', 'rum', 'gin', 'tequila', 'alcohol', 'drink', 'bartender', 'happy hour', 'draft', 'bottle', 'shot', 'mixer', 'appetizer', 'snack', 'music', 'atmosphere', 'nightlife'],
-                'irrelevant': ['book', 'clothing', 'electronics', 'car', 'phone', 'computer', 'medicine', 'haircut', 'massage', 'gym', 'hotel', 'room', 'coffee', 'tea']
-            },
-            'pizza': {
-                'relevant': ['pizza', 'slice', 'topping', 'cheese', 'pepperoni', 'sausage', 'mushroom', 'crust', 'dough', 'sauce', 'delivery', 'takeout', 'oven', 'italian', 'calzone', 'breadsticks'],
-                'irrelevant': ['book', 'clothing', 'electronics', 'car', 'phone', 'computer', 'medicine', 'haircut', 'massage', 'gym', 'hotel', 'sushi', 'chinese']
-            },
-            
-            # Retail & Shopping
-            'bookstore': {
-                'relevant': ['book', 'novel', 'author', 'reading', 'literature', 'fiction', 'non-fiction', 'textbook', 'magazine', 'newspaper', 'bookmark', 'chapter', 'story', 'library', 'study', 'education', 'knowledge'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'wine', 'beer', 'clothing', 'electronics', 'car', 'medicine', 'haircut', 'massage', 'gym']
-            },
-            'clothing_store': {
-                'relevant': ['shirt', 'pants', 'dress', 'shoes', 'jacket', 'sweater', 'jeans', 'skirt', 'blouse', 'suit', 'tie', 'belt', 'hat', 'fashion', 'style', 'size', 'fit', 'fabric', 'color', 'brand', 'designer'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'electronics', 'car', 'medicine', 'haircut', 'massage', 'gym', 'hotel']
-            },
-            'electronics_store': {
-                'relevant': ['phone', 'computer', 'laptop', 'tablet', 'tv', 'camera', 'headphones', 'speaker', 'charger', 'cable', 'battery', 'screen', 'keyboard', 'mouse', 'software', 'app', 'technology', 'digital', 'wireless'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'car', 'medicine', 'haircut', 'massage', 'gym', 'hotel']
-            },
-            'grocery_store': {
-                'relevant': ['groceries', 'produce', 'vegetables', 'fruits', 'meat', 'dairy', 'bread', 'milk', 'eggs', 'cheese', 'frozen', 'canned', 'organic', 'fresh', 'checkout', 'cashier', 'cart', 'aisle', 'shopping'],
-                'irrelevant': ['clothing', 'electronics', 'car', 'phone', 'computer', 'medicine', 'haircut', 'massage', 'gym', 'hotel', 'book', 'alcohol', 'bar']
-            },
-            'pharmacy': {
-                'relevant': ['medicine', 'prescription', 'medication', 'pills', 'pharmacy', 'pharmacist', 'health', 'drug', 'vitamin', 'supplement', 'treatment', 'doctor', 'illness', 'pain', 'relief', 'dosage'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'electronics', 'car', 'haircut', 'massage', 'gym', 'hotel']
-            },
-            
-            # Services
-            'hair_salon': {
-                'relevant': ['haircut', 'hairstyle', 'hair', 'stylist', 'shampoo', 'conditioner', 'color', 'dye', 'highlights', 'perm', 'blow-dry', 'trim', 'layers', 'bangs', 'salon', 'beauty', 'appointment'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'electronics', 'car', 'medicine', 'gym', 'hotel']
-            },
-            'spa': {
-                'relevant': ['massage', 'facial', 'spa', 'relaxation', 'therapy', 'treatment', 'wellness', 'skin', 'body', 'aromatherapy', 'hot stone', 'deep tissue', 'swedish', 'manicure', 'pedicure', 'sauna'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'electronics', 'car', 'medicine', 'gym', 'hotel']
-            },
-            'gym': {
-                'relevant': ['workout', 'exercise', 'fitness', 'gym', 'weights', 'cardio', 'treadmill', 'trainer', 'muscle', 'strength', 'endurance', 'yoga', 'pilates', 'membership', 'equipment', 'locker', 'shower'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'electronics', 'car', 'medicine', 'haircut', 'massage', 'hotel']
-            },
-            'bank': {
-                'relevant': ['account', 'deposit', 'withdrawal', 'loan', 'credit', 'debit', 'atm', 'teller', 'banking', 'finance', 'money', 'cash', 'check', 'savings', 'checking', 'interest', 'fee'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'electronics', 'car', 'medicine', 'haircut', 'massage', 'gym', 'hotel']
-            },
-            
-            # Automotive
-            'car_dealership': {
-                'relevant': ['car', 'vehicle', 'auto', 'truck', 'suv', 'sedan', 'coupe', 'engine', 'transmission', 'dealer', 'salesperson', 'financing', 'lease', 'warranty', 'test drive', 'mileage', 'fuel'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'electronics', 'medicine', 'haircut', 'massage', 'gym', 'hotel']
-            },
-            'gas_station': {
-                'relevant': ['gas', 'fuel', 'gasoline', 'diesel', 'pump', 'station', 'convenience', 'snacks', 'drinks', 'lottery', 'cigarettes', 'car wash', 'oil', 'windshield', 'receipt'],
-                'irrelevant': ['restaurant', 'dining', 'book', 'clothing', 'electronics', 'medicine', 'haircut', 'massage', 'gym', 'hotel', 'alcohol', 'bar']
-            },
-            
-            # Hospitality
-            'hotel': {
-                'relevant': ['room', 'bed', 'bathroom', 'shower', 'towel', 'pillow', 'blanket', 'tv', 'wifi', 'breakfast', 'lobby', 'front desk', 'check-in', 'check-out', 'housekeeping', 'concierge', 'pool', 'gym'],
-                'irrelevant': ['car', 'phone', 'computer', 'book', 'clothing', 'medicine', 'haircut', 'massage', 'grocery', 'pharmacy']
-            },
-            'movie_theater': {
-                'relevant': ['movie', 'film', 'cinema', 'theater', 'screen', 'seat', 'ticket', 'popcorn', 'candy', 'soda', 'preview', 'trailer', 'actor', 'director', 'plot', 'sound', 'picture'],
-                'irrelevant': ['car', 'phone', 'computer', 'book', 'clothing', 'medicine', 'haircut', 'massage', 'grocery', 'pharmacy', 'alcohol', 'bar']
-            },
-            
-            # Healthcare
-            'hospital': {
-                'relevant': ['doctor', 'nurse', 'patient', 'treatment', 'surgery', 'emergency', 'room', 'bed', 'medical', 'health', 'care', 'medicine', 'prescription', 'diagnosis', 'therapy', 'recovery'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'electronics', 'car', 'haircut', 'gym', 'hotel']
-            },
-            'dental_office': {
-                'relevant': ['teeth', 'tooth', 'dental', 'dentist', 'cleaning', 'filling', 'cavity', 'crown', 'root canal', 'braces', 'orthodontist', 'hygienist', 'floss', 'brush', 'mouth', 'gums'],
-                'irrelevant': ['food', 'meal', 'burger', 'pizza', 'coffee', 'alcohol', 'book', 'clothing', 'electronics', 'car', 'haircut', 'massage', 'gym', 'hotel']
-            }
-        }
+    def __init__(self, registry=None, topic_mode=None):
+        # Tables come from the active rule pack so edits to the data file apply without a restart
+        self.registry = registry or get_rule_registry()
         
-        # Business type aliases for flexible matching
-        self.business_aliases = {
-            'mcdonalds': 'fast_food',
-            'burger king': 'fast_food',
-            'kfc': 'fast_food',
-            'subway': 'fast_food',
-            'taco bell': 'fast_food',
-            'wendys': 'fast_food',
-            'starbucks': 'coffee_shop',
-            'dunkin': 'coffee_shop',
-            'barnes noble': 'bookstore',
-            'borders': 'bookstore',
-            'walmart': 'grocery_store',
-            'target': 'grocery_store',
-            'cvs': 'pharmacy',
-            'walgreens': 'pharmacy',
-            'best buy': 'electronics_store',
-            'apple store': 'electronics_store',
-            'macys': 'clothing_store',
-            'gap': 'clothing_store',
-            'zara': 'clothing_store',
-            'h&m': 'clothing_store',
-            'planet fitness': 'gym',
-            'la fitness': 'gym',
-            'marriott': 'hotel',
-            'hilton': 'hotel',
-            'holiday inn': 'hotel',
-            'amc': 'movie_theater',
-            'regal': 'movie_theater'
-        }
+        self.topic_mode = topic_mode or os.environ.get('REVIEW_TOPIC_MODE', 'keywords')
+        if self.topic_mode not in TOPIC_MODES:
+            raise ValueError(f'Unknown topic mode {self.topic_mode!r}, expected one of {", ".join(TOPIC_MODES)}')
+    
+    @property
+    def business_types(self):
+        return self.registry.current().business_types
     
-    def get_business_type(self, business_name):
+    @property
+    def business_aliases(self):
+        return self.registry.current().business_aliases
+    
+    def get_business_type(self, business_name, rules=None):
         """
         Determine business type from business name
         """
         if not business_name:
             return None
-            
+        
+        rules = rules or self.registry.current()
         business_name_lower = business_name.lower().strip()
         
         # Check direct aliases first
-        if business_name_lower in self.business_aliases:
-            return self.business_aliases[business_name_lower]
+        if business_name_lower in rules.business_aliases:
+            return rules.business_aliases[business_name_lower]
+        
+        # Then the name catalog, exact or closest name above its similarity threshold
+        catalog = self.registry.catalog()
+        match = catalog.match(business_name) if catalog is not None else None
+        if match:
+            return match['business_type']
         
         # Check for partial matches in aliases
-        for alias, business_type in self.business_aliases.items():
+        for alias, business_type in rules.business_aliases.items():
             if alias in business_name_lower or business_name_lower in alias:
                 return business_type
         
         # Check for keywords in business name
-        business_keywords = {
-            'restaurant': ['restaurant', 'bistro', 'cafe', 'diner', 'eatery', 'grill', 'kitchen'],
-            'fast_food': ['fast food', 'quick service', 'drive thru', 'takeaway'],
-            'coffee_shop': ['coffee', 'espresso', 'brew', 'roastery'],
-            'bar': ['bar', 'pub', 'tavern', 'lounge', 'brewery', 'nightclub'],
-            'pizza': ['pizza', 'pizzeria'],
-            'bookstore': ['bookstore', 'books', 'library'],
-            'clothing_store': ['clothing', 'apparel', 'fashion', 'boutique'],
-            'electronics_store': ['electronics', 'tech', 'computer', 'phone'],
-            'grocery_store': ['grocery', 'supermarket', 'market', 'food store'],
-            'pharmacy': ['pharmacy', 'drugstore', 'medical'],
-            'hair_salon': ['salon', 'hair', 'barber'],
-            'spa': ['spa', 'wellness', 'massage'],
-            'gym': ['gym', 'fitness', 'health club'],
-            'bank': ['bank', 'credit union', 'financial'],
-            'car_dealership': ['dealership', 'auto', 'car sales'],
-            'gas_station': ['gas', 'fuel', 'petrol', 'shell', 'exxon', 'bp'],
-            'hotel': ['hotel', 'inn', 'resort', 'motel'],
-            'movie_theater': ['theater', 'cinema', 'movies'],
-            'hospital': ['hospital', 'medical center', 'clinic'],
-            'dental_office': ['dental', 'dentist', 'orthodontist']
-        }
-        
-        for business_type, keywords in business_keywords.items():
+        for business_type, keywords in rules.business_keywords.items():
             for keyword in keywords:
                 if keyword in business_name_lower:
                     return business_type
         
         return None
     
-    def check_topic_relevance(self, business_type, review_text):
+    def tables_version(self):
+        """Versions of the business tables and name catalog, for keying cached results"""
+        catalog = self.registry.catalog()
+        return {
+            'business_context': self.registry.current().business_context_version,
+            'catalog': catalog.version if catalog is not None else None
+        }
+    
+    def resolve_business_types(self, business_names, rules=None):
+        """
+        Business type of every distinct name in a batch, each name resolved once
+        Returns: {business_name: business_type or None}
+        """
+        rules = rules or self.registry.current()
+        return {
+            name: self.get_business_type(name, rules)
+            for name in dict.fromkeys(business_names) if isinstance(name, str)
+        }
+    
+    def uses_semantic(self, rules):
+        """Semantic checks apply to reviews analyzed with English rules: the topic lists are English"""
+        return self.topic_mode != 'keywords' and rules.language == DEFAULT_LANGUAGE
+    
+    def score_topics(self, business_types, review_texts, rules=None):
+        """
+        Semantic relevance of each review to its business type, scored as one batch
+        Returns: list of TopicIndex.score results (None where the business type is unknown)
+        """
+        rules = rules or self.registry.current()
+        return rules.topic_index().score(business_types, review_texts)
+    
+    def check_topic_relevance(self, business_type, review_text, rules=None, semantic=None):
         """
         Check if review content is relevant to the business type
+        `semantic` is this review's score_topics result, if it was already computed in a batch
         Returns: (is_relevant, irrelevant_topics_found)
         """
-        if not business_type or business_type not in self.business_types:
+        rules = rules or self.registry.current()
+        if not business_type or business_type not in rules.business_types:
             return True, []  # If we can't determine business type, assume relevant
         
-        business_data = self.business_types[business_type]
+        if self.uses_semantic(rules):
+            if semantic is None:
+                semantic = self.score_topics([business_type], [review_text], rules)[0]
+            if semantic['off_topic']:
+                # Explain with the closest irrelevant topics, or the business type it resembles
+                return False, semantic['nearest_irrelevant_topics'] or [semantic['closest_type'].replace('_', ' ')]
+            if self.topic_mode == 'semantic':
+                return True, []
+        
+        business_data = rules.business_types[business_type]
         review_lower = review_text.lower()
         
         irrelevant_topics = []
@@ -215,16 +142,16 @@ class BusinessContext:
         
         return True, []
     
-    def get_business_context_info(self, business_type):
+    def get_business_context_info(self, business_type, rules=None):
         """
         Get information about what topics are relevant/irrelevant for a business type
         """
-        if not business_type or business_type not in self.business_types:
+        rules = rules or self.registry.current()
+        if not business_type or business_type not in rules.business_types:
             return None
         
         return {
             'business_type': business_type,
-            'relevant_topics': self.business_types[business_type]['relevant'][:10],  # First 10 for brevity
-            'irrelevant_topics': self.business_types[business_type]['irrelevant'][:10]
+            'relevant_topics': list(rules.business_types[business_type]['relevant'][:10]),  # First 10 for brevity
+            'irrelevant_topics': list(rules.business_types[business_type]['irrelevant'][:10])
         }
-
@@ -0,0 +1,269 @@
+"""
+Approximate dashboards from a uniform sample of an upload
+One pass over the CSV draws a reservoir sample and counts the rows; the dashboard sections
+are computed on the sample, counts are scaled up to the upload and every estimate carries a
+95% error bar (Wilson intervals for shares, standard errors for means, both with the
+finite population correction). Sections that can't be estimated from a sample (near
+duplicates, author risk, trends, distinctive terms) are left to the exact dashboard
+"""
+
+import csv
+import io
+import math
+import random
+from collections import deque, namedtuple
+from itertools import islice
+
+Z_95 = 1.959963984540054
+
+CsvSample = namedtuple('CsvSample', ['text', 'rows', 'rows_interval'])
+
+# Computed only on the full upload: clusters, author history, bursts and the rarer
+# distinctive terms don't survive sampling
+EXACT_ONLY_SECTIONS = ('near_duplicates', 'authors', 'trends', 'terms')
+
+
+def reservoir_sample(iterable, size, rng):
+    """
+    Uniform sample of `size` (position, item) pairs in one pass, and the number of items
+    Algorithm L: the gaps between picks are skipped inside islice, so drawing the sample
+    costs little more than iterating
+    """
+    numbered = enumerate(iterable)
+    reservoir = list(islice(numbered, size))
+    if len(reservoir) < size:
+        return reservoir, len(reservoir)
+
+    seen = size
+    log_weight = math.log(rng.random() or 1e-300) / size
+    while True:
+        skip = int(math.log(rng.random() or 1e-300) / math.log(-math.expm1(log_weight)))
+        # Consume the gap and the next pick, keeping only the last item consumed
+        tail = deque(islice(numbered, skip + 1), maxlen=1)
+        if not tail:
+            return reservoir, seen
+        position = tail[0][0]
+        if position < seen + skip:
+            return reservoir, position + 1
+        reservoir[rng.randrange(size)] = tail[0]
+        seen = position + 1
+        log_weight += math.log(rng.random() or 1e-300) / size
+
+
+def _offset_sample(csv_content, header, size, rng, window=65536, pilot=2000):
+    """
+    `size` distinct (position, row) pairs drawn at random character offsets, the row count
+    estimated from the drawn lines and its 95% interval; the work doesn't grow with the upload
+    An offset lands on a line in proportion to the line's length, so each drawn line is kept
+    with probability shortest/length (the shortest line among the first `pilot` draws), which
+    makes the kept lines uniform. A line that isn't the start of a record (the rest of a
+    quoted field spanning lines) doesn't parse to the header's field count and is skipped
+    """
+    header_length = csv_content.find('\n') + 1
+    body_length = len(csv_content) - header_length
+    if body_length <= 0:
+        return [], 0, None
+
+    picked = {}
+    inverse_lengths = []
+    kept_lines = 0
+    shortest = None
+    for draw in range(size * 100):
+        if len(picked) >= size:
+            break
+        offset = header_length + rng.randrange(body_length)
+        start = csv_content.rfind('\n', header_length - 1, offset) + 1
+        end = csv_content.find('\n', offset) + 1 or len(csv_content)
+        inverse_lengths.append(1.0 / (end - start))
+        if draw < pilot:
+            shortest = min(shortest or end - start, end - start)
+            continue
+        if start in picked or rng.random() * (end - start) > shortest:
+            continue
+
+        kept_lines += 1
+        row = next(csv.reader(io.StringIO(csv_content[start:start + window], newline='')), None)
+        if row and len(row) == len(header):
+            picked[start] = row
+
+    if not picked:
+        return [], 0, None
+    # Lines = body length x mean inverse length of the drawn lines; rows = lines x share of
+    # kept lines that start a record. Both factors' relative errors go into the interval
+    count = len(inverse_lengths)
+    mean_inverse = sum(inverse_lengths) / count
+    variance = sum((value - mean_inverse) ** 2 for value in inverse_lengths) / max(1, count - 1)
+    record_share = len(picked) / kept_lines
+    rows = body_length * mean_inverse * record_share
+    relative_variance = variance / (count * mean_inverse ** 2) + (1 - record_share) / (record_share * kept_lines)
+    half_width = Z_95 * rows * math.sqrt(relative_variance)
+    return sorted(picked.items()), int(round(rows)), (int(rows - half_width), int(math.ceil(rows + half_width)))
+
+
+def sample_csv(csv_content, size, seed=0, scan_limit=None):
+    """
+    A uniform sample of `size` data rows as a CsvSample: CSV text in upload order, the
+    upload's row count and, when the count is estimated, its 95% interval
+    Uploads up to `scan_limit` characters are read once to draw a reservoir sample and count
+    the rows exactly (blank lines are skipped, as read_csv does); larger ones are sampled at
+    random offsets and their row count is estimated
+    """
+    reader = csv.reader(io.StringIO(csv_content[:csv_content.find('\n') + 1], newline=''))
+    header = next(reader, None)
+    if header is None:
+        return CsvSample('', 0, None)
+
+    rng = random.Random(seed)
+    if scan_limit is None or len(csv_content) <= scan_limit:
+        reader = csv.reader(io.StringIO(csv_content, newline=''))
+        next(reader)
+        sample, rows = reservoir_sample(filter(None, reader), size, rng)
+        rows_interval = None
+    else:
+        sample, rows, rows_interval = _offset_sample(csv_content, header, size, rng)
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    writer.writerows(row for _, row in sorted(sample, key=lambda pair: pair[0]))
+    return CsvSample(output.getvalue(), rows, rows_interval)
+
+
+class SampleEstimator:
+    """Scales sample figures to a population of `population` rows and puts error bars on them"""
+
+    def __init__(self, sample_size, population):
+        self.sample_size = sample_size
+        self.population = population
+        self.scale = population / sample_size if sample_size else 0.0
+        self.fpc = math.sqrt((population - sample_size) / (population - 1)) if population > 1 else 0.0
+
+    def count(self, sample_count):
+        return int(round(sample_count * self.scale))
+
+    def _share_interval(self, sample_count):
+        """Wilson 95% interval for the population share of a sample count"""
+        n = self.sample_size
+        p = sample_count / n
+        denominator = 1 + Z_95 ** 2 / n
+        center = (p + Z_95 ** 2 / (2 * n)) / denominator
+        half_width = Z_95 * math.sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n * n)) / denominator
+        # The finite population correction narrows the interval around the sample share
+        low, high = max(0.0, center - half_width), min(1.0, center + half_width)
+        return p - (p - low) * self.fpc, p + (high - p) * self.fpc
+
+    def count_bar(self, sample_count):
+        low, high = self._share_interval(sample_count)
+        return {'low': int(math.floor(low * self.population)), 'high': int(math.ceil(high * self.population))}
+
+    def percentage_bar(self, sample_count):
+        low, high = self._share_interval(sample_count)
+        return {'low': round(low * 100, 1), 'high': round(high * 100, 1)}
+
+    def mean_bar(self, mean, std, count, digits=2):
+        """Normal 95% interval for a mean from its sample std and count; None below two values"""
+        if count < 2 or std != std:
+            return None
+        stderr = std / math.sqrt(count) * self.fpc
+        return {
+            'stderr': round(stderr, 3),
+            'low': round(mean - Z_95 * stderr, digits),
+            'high': round(mean + Z_95 * stderr, digits)
+        }
+
+    def counts(self, sample_counts):
+        """Scaled counts of a {key: sample count} mapping and their error bars"""
+        return (
+            {key: self.count(value) for key, value in sample_counts.items()},
+            {key: self.count_bar(value) for key, value in sample_counts.items()}
+        )
+
+
+def estimate_dashboard(analyzer, sample, population):
+    """
+    Dashboard sections of a CSVDashboardAnalyzer computed on a processed sample frame and
+    scaled to `population` rows, and error bars mirroring the dashboard's structure
+    """
+    estimator = SampleEstimator(len(sample), population)
+    dashboard = {}
+    error_bars = {}
+
+    if 'company' in sample.columns:
+        companies = analyzer.analyze_companies(sample)
+        bars = {}
+        companies['distribution'], bars['distribution'] = estimator.counts(companies['distribution'])
+        companies['top_companies'], bars['top_companies'] = estimator.counts(companies['top_companies'])
+        companies['business_type_distribution'], bars['business_type_distribution'] = estimator.counts(companies['business_type_distribution'])
+        if 'average_ratings' in companies:
+            spread = sample.groupby('company', observed=True)['rating'].agg(['mean', 'std', 'count'])
+            bars['average_ratings'] = {}
+            for company, stats in companies['average_ratings'].items():
+                row = spread.loc[company]
+                bars['average_ratings'][company] = {'mean': estimator.mean_bar(float(row['mean']), float(row['std']), int(row['count'])), 'count': estimator.count_bar(stats['count'])}
+                stats['count'] = estimator.count(stats['count'])
+        dashboard['companies'] = companies
+        error_bars['companies'] = bars
+
+    if 'rating' in sample.columns:
+        ratings = analyzer.analyze_ratings(sample)
+        if ratings:
+            valid = sample['rating'].dropna()
+            bars = {'statistics': {'mean': estimator.mean_bar(float(valid.mean()), float(valid.std()), len(valid))}}
+            ratings['distribution'], bars['distribution'] = estimator.counts(ratings['distribution'])
+            ratings['categories'], bars['categories'] = estimator.counts(ratings['categories'])
+            error_bars['ratings'] = bars
+        dashboard['ratings'] = ratings
+
+    if 'classification' in sample.columns:
+        classifications = analyzer.analyze_classifications(sample)
+        sample_counts = classifications['distribution']
+        bars = {'percentages': {label: estimator.percentage_bar(count) for label, count in sample_counts.items()}}
+        classifications['distribution'], bars['distribution'] = estimator.counts(sample_counts)
+        if 'by_rating' in classifications:
+            spread = sample.groupby('classification', observed=True)['rating'].agg(['mean', 'std', 'count'])
+            bars['by_rating'] = {}
+            for label, stats in classifications['by_rating'].items():
+                row = spread.loc[label]
+                bars['by_rating'][label] = {'mean': estimator.mean_bar(float(row['mean']), float(row['std']), int(row['count']))}
+                stats['count'] = estimator.count(stats['count'])
+        dashboard['classifications'] = classifications
+        error_bars['classifications'] = bars
+
+    if 'cleaned_review_text' in sample.columns:
+        reviews = analyzer.analyze_reviews(sample)
+        texts = sample['cleaned_review_text'].dropna()
+        lengths = texts.str.len()
+        words = texts.str.split().str.len()
+        error_bars['reviews'] = {
+            'text_statistics': {'avg_length': estimator.mean_bar(float(lengths.mean()), float(lengths.std()), len(lengths), digits=0)},
+            'word_statistics': {'avg_words': estimator.mean_bar(float(words.mean()), float(words.std()), len(words), digits=0)}
+        }
+        dashboard['reviews'] = reviews
+
+        if 'review_languages' in sample.columns:
+            languages = analyzer.analyze_languages(sample)
+            bars = {'languages': {}}
+            for code, entry in languages['languages'].items():
+                bars['languages'][code] = {'reviews': estimator.count_bar(entry['reviews']), 'percentage': estimator.percentage_bar(entry['reviews'])}
+                entry['reviews'] = estimator.count(entry['reviews'])
+                entry['primary_reviews'] = estimator.count(entry['primary_reviews'])
+                entry['classifications'] = {label: estimator.count(count) for label, count in entry['classifications'].items()}
+            bars['multilingual_reviews'] = estimator.count_bar(languages['multilingual_reviews'])
+            languages['multilingual_reviews'] = estimator.count(languages['multilingual_reviews'])
+            languages['reviews_without_text'] = estimator.count(languages['reviews_without_text'])
+            dashboard['languages'] = languages
+            error_bars['languages'] = bars
+
+    dashboard['sample_reviews'] = analyzer.get_sample_reviews(sample)
+
+    overall = analyzer.get_overall_stats(sample)
+    overall['total_reviews'] = population
+    overall['data_quality'] = {key: estimator.count(value) for key, value in overall['data_quality'].items()}
+    dashboard['overall_stats'] = overall
+    # Distinct companies and authors can't be scaled: the sample's counts are lower bounds
+    error_bars['overall_stats'] = {
+        'total_companies': {'low': int(overall['total_companies']), 'high': None},
+        'total_authors': {'low': int(overall['total_authors']), 'high': None}
+    }
+
+    return dashboard, error_bars
@@ -0,0 +1,217 @@
+"""
+In-memory store of processed upload datasets for paginated review browsing
+Each dataset keeps columnar arrays plus per-company and per-classification row indexes,
+so moderators can page through every review and drill into one company without
+re-parsing the uploaded CSV
+"""
+
+import threading
+import uuid
+from collections import Counter, OrderedDict
+
+from src.models.author_index import CLEAN_CLASSIFICATIONS
+from src.utils.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+_BROWSE_COLUMNS = ['review_id', 'author', 'company', 'rating', 'classification']
+
+
+class IndexedDataset:
+    """Columnar copy of one processed dataframe with lookup indexes"""
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.columns = {}
+        for column in _BROWSE_COLUMNS:
+            if column in df.columns:
+                self.columns[column] = df[column].to_numpy()
+
+        text_column = 'cleaned_review_text' if 'cleaned_review_text' in df.columns else 'review_text'
+        self.texts = df[text_column].fillna('').astype(str).to_numpy() if text_column in df.columns else None
+        self.ratings = df['rating'].to_numpy(dtype='float64', na_value=np.nan) if 'rating' in df.columns else None
+
+        # Row positions per value, in ascending order, so filters never scan the frame
+        self.indexes = {}
+        for column in ('company', 'classification'):
+            if column in df.columns:
+                self.indexes[column] = {
+                    str(value): np.asarray(positions, dtype=np.int64)
+                    for value, positions in df.groupby(column, sort=False, observed=True).indices.items()
+                }
+
+        self._lowered_texts = None
+        self._filter_cache = OrderedDict()
+        self._company_profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lowered(self):
+        if self._lowered_texts is None:
+            self._lowered_texts = pd.Series(self.texts, dtype=object).str.lower()
+        return self._lowered_texts
+
+    def matching_positions(self, company=None, classification=None, min_rating=None, max_rating=None, query=None):
+        """Sorted row positions matching all filters (cached per filter combination)"""
+        key = (company, classification, min_rating, max_rating, query)
+        with self._lock:
+            if key in self._filter_cache:
+                self._filter_cache.move_to_end(key)
+                return self._filter_cache[key]
+
+        positions = None
+        for column, value in (('company', company), ('classification', classification)):
+            if value is None:
+                continue
+            matched = self.indexes.get(column, {}).get(value, np.empty(0, dtype=np.int64))
+            positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+
+        mask = None
+        if (min_rating is not None or max_rating is not None) and self.ratings is not None:
+            mask = np.ones(self.size, dtype=bool)
+            if min_rating is not None:
+                mask &= self.ratings >= min_rating
+            if max_rating is not None:
+                mask &= self.ratings <= max_rating
+        if query and self.texts is not None:
+            contains = self._lowered().str.contains(query.lower(), regex=False).to_numpy(dtype=bool)
+            mask = contains if mask is None else mask & contains
+
+        if mask is not None:
+            positions = np.nonzero(mask)[0] if positions is None else positions[mask[positions]]
+        if positions is None:
+            positions = np.arange(self.size, dtype=np.int64)
+
+        with self._lock:
+            self._filter_cache[key] = positions
+            if len(self._filter_cache) > 32:
+                self._filter_cache.popitem(last=False)
+        return positions
+
+    def page(self, cursor=None, limit=50, **filters):
+        """
+        Return one page of reviews after `cursor` (the last row position already seen)
+        Returns: (rows, next_cursor, total_matches)
+        """
+        positions = self.matching_positions(**filters)
+        start = 0 if cursor is None else int(np.searchsorted(positions, cursor, side='right'))
+        selected = positions[start:start + limit]
+
+        rows = [self._row(position) for position in selected]
+
+        next_cursor = int(selected[-1]) if start + limit < len(positions) and len(selected) else None
+        return rows, next_cursor, len(positions)
+
+    def _row(self, position):
+        row = {'position': int(position)}
+        for column, values in self.columns.items():
+            value = values[position]
+            if hasattr(value, 'item'):  # numpy scalar
+                value = value.item()
+            row[column] = None if value is None or (isinstance(value, float) and np.isnan(value)) else value
+        if self.texts is not None:
+            row['text'] = self.texts[position]
+        return row
+
+    def company_profile(self, company, flagged_limit=20):
+        """
+        Drilldown for one company computed from its partition of row positions only,
+        so the cost is proportional to that company's reviews (cached per company)
+        Returns: None if the company is not in this dataset
+        """
+        positions = self.indexes.get('company', {}).get(company)
+        if positions is None:
+            return None
+
+        key = (company, flagged_limit)
+        with self._lock:
+            if key in self._company_profiles:
+                self._company_profiles.move_to_end(key)
+                return self._company_profiles[key]
+
+        profile = {'company': company, 'total_reviews': int(len(positions))}
+
+        if self.ratings is not None:
+            ratings = self.ratings[positions]
+            ratings = ratings[~np.isnan(ratings)]
+            if len(ratings):
+                values, counts = np.unique(ratings, return_counts=True)
+                profile['ratings'] = {
+                    'statistics': {
+                        'mean': round(float(ratings.mean()), 2),
+                        'median': round(float(np.median(ratings)), 2),
+                        'std': round(float(ratings.std(ddof=1)), 2) if len(ratings) > 1 else None,
+                        'min': float(ratings.min()),
+                        'max': float(ratings.max())
+                    },
+                    'histogram': {float(value): int(count) for value, count in zip(values, counts)}
+                }
+
+        flagged = positions
+        if 'classification' in self.columns:
+            labels = self.columns['classification'][positions]
+            mix = Counter(str(label) for label in labels if label is not None and label == label)
+            profile['classifications'] = {
+                'distribution': dict(mix.most_common()),
+                'percentages': {label: round(count / len(positions) * 100, 1) for label, count in mix.most_common()}
+            }
+            flagged = positions[[
+                label is not None and label == label and str(label).lower() not in CLEAN_CLASSIFICATIONS
+                for label in labels
+            ]]
+            profile['flagged_count'] = int(len(flagged))
+            profile['flagged_reviews'] = [self._row(position) for position in flagged[:flagged_limit]]
+
+        if self.texts is not None:
+            texts = self.texts[positions]
+            lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+            words = np.fromiter((len(text.split()) for text in texts), dtype=np.int64, count=len(texts))
+            profile['text_statistics'] = {
+                'avg_length': round(float(lengths.mean()), 0),
+                'median_length': round(float(np.median(lengths)), 0),
+                'min_length': int(lengths.min()),
+                'max_length': int(lengths.max())
+            }
+            profile['word_statistics'] = {
+                'avg_words': round(float(words.mean()), 0),
+                'median_words': round(float(np.median(words)), 0),
+                'min_words': int(words.min()),
+                'max_words': int(words.max())
+            }
+
+        with self._lock:
+            self._company_profiles[key] = profile
+            if len(self._company_profiles) > 64:
+                self._company_profiles.popitem(last=False)
+        return profile
+
+
+class DatasetStore:
+    """Bounded LRU registry of indexed datasets keyed by an opaque dataset id"""
+
+    def __init__(self, max_datasets=8, on_evict=None):
+        self.max_datasets = max_datasets
+        # Called with the ids of evicted datasets, e.g. to drop them from the search index
+        self.on_evict = on_evict
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, df, dataset_id=None):
+        dataset = IndexedDataset(df)
+        dataset_id = dataset_id or uuid.uuid4().hex
+        evicted = []
+        with self._lock:
+            self._datasets[dataset_id] = dataset
+            self._datasets.move_to_end(dataset_id)
+            while len(self._datasets) > self.max_datasets:
+                evicted.append(self._datasets.popitem(last=False)[0])
+        if evicted and self.on_evict is not None:
+            self.on_evict(evicted)
+        return dataset_id
+
+    def get(self, dataset_id):
+        with self._lock:
+            dataset = self._datasets.get(dataset_id)
+            if dataset is not None:
+                self._datasets.move_to_end(dataset_id)
+            return dataset
@@ -0,0 +1,179 @@
+"""
+Accuracy and latency metrics for evaluating ReviewAnalyzer against labeled reviews
+Analyzer statuses and dataset labels are both mapped onto a shared set of classes
+before the confusion matrix is built
+"""
+
+import math
+
+# Analyzer status -> evaluation class
+DEFAULT_STATUS_CLASSES = {
+    'authentic': 'legitimate',
+    'advertisement': 'advertisement',
+    'no-visit': 'rant_without_visit',
+    'off-topic': 'irrelevant',
+    'inappropriate': 'other_violation',
+    'personal-info': 'other_violation',
+    'fake': 'other_violation',
+    'suspicious': 'other_violation',
+    'invalid': 'no_text'
+}
+
+# Normalized dataset label -> evaluation class; unknown labels are kept as-is
+DEFAULT_LABEL_CLASSES = {
+    'legitimate_review': 'legitimate',
+    'legitimate': 'legitimate',
+    'authentic': 'legitimate',
+    'advertisement': 'advertisement',
+    'ad': 'advertisement',
+    'rant_without_visit': 'rant_without_visit',
+    'no_visit': 'rant_without_visit',
+    'irrelevant': 'irrelevant',
+    'irrelevant_content': 'irrelevant',
+    'off_topic': 'irrelevant',
+    'no_written_review': 'no_text'
+}
+
+# Classes that count as "not a violation" for the flagged-vs-clean summary
+CLEAN_CLASSES = {'legitimate', 'no_text'}
+
+
+def normalize_label(label):
+    if label is None or (isinstance(label, float) and math.isnan(label)):
+        return None
+    label = str(label).strip().lower().replace('-', '_').replace(' ', '_')
+    return label or None
+
+
+class LabelMapping:
+    """Maps analyzer statuses and dataset labels onto evaluation classes"""
+
+    def __init__(self, status_classes=None, label_classes=None):
+        self.status_classes = dict(DEFAULT_STATUS_CLASSES, **(status_classes or {}))
+        self.label_classes = dict(DEFAULT_LABEL_CLASSES, **{normalize_label(k): v for k, v in (label_classes or {}).items()})
+
+    def predicted_class(self, status):
+        return self.status_classes.get(status, 'other_violation')
+
+    def true_class(self, label):
+        label = normalize_label(label)
+        if label is None:
+            return None
+        return self.label_classes.get(label, label)
+
+
+def confusion_matrix(pairs):
+    """{true_class: {predicted_class: count}} from (true, predicted) pairs"""
+    matrix = {}
+    for true, predicted in pairs:
+        row = matrix.setdefault(true, {})
+        row[predicted] = row.get(predicted, 0) + 1
+    return matrix
+
+
+def classification_metrics(matrix):
+    """Accuracy, per-class precision/recall/F1 and macro averages from a confusion matrix"""
+    classes = sorted(set(matrix) | {predicted for row in matrix.values() for predicted in row})
+    total = sum(sum(row.values()) for row in matrix.values())
+    correct = sum(matrix.get(cls, {}).get(cls, 0) for cls in classes)
+
+    per_class = {}
+    for cls in classes:
+        true_positive = matrix.get(cls, {}).get(cls, 0)
+        support = sum(matrix.get(cls, {}).values())
+        predicted = sum(row.get(cls, 0) for row in matrix.values())
+        precision = true_positive / predicted if predicted else None
+        recall = true_positive / support if support else None
+        if precision is None or recall is None:
+            f1 = None
+        elif precision + recall == 0:
+            f1 = 0.0
+        else:
+            f1 = 2 * precision * recall / (precision + recall)
+        per_class[cls] = {
+            'precision': _rounded(precision),
+            'recall': _rounded(recall),
+            'f1': _rounded(f1),
+            'support': support,
+            'predicted': predicted
+        }
+
+    # Macro averages over classes that actually occur in the labels
+    labeled = [cls for cls in classes if per_class[cls]['support']]
+    macro = {}
+    for metric in ('precision', 'recall', 'f1'):
+        values = [per_class[cls][metric] or 0.0 for cls in labeled]
+        macro[metric] = _rounded(sum(values) / len(values)) if values else None
+
+    return {
+        'total': total,
+        'accuracy': _rounded(correct / total) if total else None,
+        'macro': macro,
+        'per_class': per_class
+    }
+
+
+def flagged_metrics(pairs):
+    """Binary view: did the analyzer flag the reviews the labels say are violations?"""
+    true_positive = false_positive = false_negative = true_negative = 0
+    for true, predicted in pairs:
+        actual = true not in CLEAN_CLASSES
+        flagged = predicted not in CLEAN_CLASSES
+        if actual and flagged:
+            true_positive += 1
+        elif flagged:
+            false_positive += 1
+        elif actual:
+            false_negative += 1
+        else:
+            true_negative += 1
+    precision = true_positive / (true_positive + false_positive) if true_positive + false_positive else None
+    recall = true_positive / (true_positive + false_negative) if true_positive + false_negative else None
+    return {
+        'precision': _rounded(precision),
+        'recall': _rounded(recall),
+        'true_positive': true_positive,
+        'false_positive': false_positive,
+        'false_negative': false_negative,
+        'true_negative': true_negative
+    }
+
+
+def latency_summary(latencies_ms):
+    """Nearest-rank percentiles of per-review latencies"""
+    if not latencies_ms:
+        return {}
+    ordered = sorted(latencies_ms)
+
+    def percentile(p):
+        return round(ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)], 3)
+
+    return {
+        'mean_ms': round(sum(ordered) / len(ordered), 3),
+        'p50_ms': percentile(50),
+        'p90_ms': percentile(90),
+        'p99_ms': percentile(99),
+        'max_ms': round(ordered[-1], 3)
+    }
+
+
+def compare_results(current, baseline):
+    """Differences (current - baseline) for the headline speed and quality numbers"""
+    def delta(section, key):
+        new, old = current.get(section, {}).get(key), baseline.get(section, {}).get(key)
+        return None if new is None or old is None else round(new - old, 4)
+
+    return {
+        'baseline_model_version': baseline.get('model_version'),
+        'accuracy': delta('quality', 'accuracy'),
+        'macro_f1': delta('quality', 'macro_f1'),
+        'flagged_precision': delta('quality', 'flagged_precision'),
+        'flagged_recall': delta('quality', 'flagged_recall'),
+        'reviews_per_second': delta('throughput', 'reviews_per_second'),
+        'p50_ms': delta('latency', 'p50_ms'),
+        'p99_ms': delta('latency', 'p99_ms')
+    }
+
+
+def _rounded(value, digits=4):
+    return None if value is None else round(value, digits)
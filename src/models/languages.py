@@ -0,0 +1,72 @@
+"""
+Language-keyed review payloads
+Review exports wrap text as {'en': ..., 'es': ...}; these helpers pull out every variant
+"""
+
+import ast
+import json
+import re
+
+DEFAULT_LANGUAGE = 'en'
+
+_LANGUAGE_CODE_PATTERN = re.compile(r'^[a-z]{2,3}(-[a-z0-9]{2,8})*$')
+
+
+def normalize_language(code):
+    """Lower-case BCP 47-style code ('pt_BR' -> 'pt-br'), or None if it isn't one"""
+    if not isinstance(code, str):
+        return None
+    code = code.strip().lower().replace('_', '-')
+    return code if _LANGUAGE_CODE_PATTERN.match(code) else None
+
+
+def _parse_mapping(text):
+    # Exports use Python dict reprs (single quotes, apostrophes inside double-quoted
+    # values), so JSON is only the fast path
+    try:
+        data = json.loads(text)
+    except ValueError:
+        try:
+            data = ast.literal_eval(text)
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            return None
+    return data if isinstance(data, dict) else None
+
+
+def extract_language_texts(value, default_language=DEFAULT_LANGUAGE):
+    """
+    Split a review payload into its language variants, in payload order
+    Plain text is treated as `default_language`; missing or empty payloads give {}
+    Returns: dict of language code -> text
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return {}
+
+    if isinstance(value, dict):
+        data = value
+        text = None
+    else:
+        text = str(value).strip()
+        if not text:
+            return {}
+        data = _parse_mapping(text) if text.startswith('{') and text.endswith('}') else None
+        if data is None:
+            return {default_language: text}
+
+    variants = {}
+    for key, variant in data.items():
+        language = normalize_language(key)
+        if language and isinstance(variant, str) and variant.strip():
+            variants.setdefault(language, variant)
+
+    # A dict that isn't language-keyed is just text that happens to look like one
+    if not variants and data and text is not None:
+        return {default_language: text}
+    return variants
+
+
+def primary_language(variants, preferred=None):
+    """The variant to analyze first: `preferred` if present, else the first in the payload"""
+    if preferred and preferred in variants:
+        return preferred
+    return next(iter(variants), None)
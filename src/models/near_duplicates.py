@@ -0,0 +1,238 @@
+"""
+Near-duplicate review detection using MinHash signatures and LSH banding
+Finds copy-paste campaigns in roughly linear time instead of comparing every pair of reviews
+"""
+
+import itertools
+import re
+import zlib
+
+from src.utils.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Signatures hold 32-bit values; this marks reviews that produced no shingles
+_EMPTY_SIGNATURE = 0xFFFFFFFF
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+class NearDuplicateDetector:
+    """MinHash + LSH index over word shingles of review text"""
+
+    def __init__(self, num_perm=128, bands=16, shingle_size=3, threshold=0.8, seed=42, chunk_size=50000):
+        if num_perm % bands != 0:
+            raise ValueError('num_perm must be divisible by bands')
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+
+        # Multiply-shift hashing: ((a * x + b) mod 2^64) >> 32 with odd a, which
+        # avoids a modulo per shingle and per permutation
+        rng = np.random.default_rng(seed)
+        self._perm_a = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._perm_b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def _shingle_chunk(self, texts):
+        """
+        Build word shingle hashes for a chunk of texts
+        Returns: (shingle_hashes sorted by document, document index of each shingle)
+        """
+        token_lists = [_TOKEN_PATTERN.findall(str(text).lower()) if text else [] for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+
+        # Hash each distinct token once, then broadcast through the factorized codes
+        all_tokens = np.empty(int(lengths.sum()), dtype=object)
+        all_tokens[:] = list(itertools.chain.from_iterable(token_lists))
+        codes, uniques = pd.factorize(all_tokens)
+        unique_hashes = np.fromiter(
+            (zlib.crc32(token.encode('utf-8')) for token in uniques),
+            dtype=np.uint64,
+            count=len(uniques)
+        )
+        token_hashes = unique_hashes[codes] if len(codes) else np.empty(0, dtype=np.uint64)
+        token_docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        k = self.shingle_size
+        if len(token_hashes) >= k:
+            # Combine k consecutive token hashes, keeping only windows inside one document
+            window_docs = token_docs[:len(token_hashes) - k + 1]
+            valid = window_docs == token_docs[k - 1:]
+            shingles = token_hashes[:len(token_hashes) - k + 1].copy()
+            for offset in range(1, k):
+                shingles = shingles * np.uint64(0x9E3779B97F4A7C15) + token_hashes[offset:len(token_hashes) - k + 1 + offset]
+            shingles = (shingles >> np.uint64(32)) ^ (shingles & np.uint64(0xFFFFFFFF))
+            shingles = shingles[valid]
+            shingle_docs = window_docs[valid]
+        else:
+            shingles = np.empty(0, dtype=np.uint64)
+            shingle_docs = np.empty(0, dtype=np.int64)
+
+        # Reviews shorter than one shingle fall back to their individual tokens
+        short_docs = (lengths > 0) & (lengths < k)
+        if short_docs.any():
+            short_mask = short_docs[token_docs]
+            shingles = np.concatenate([shingles, token_hashes[short_mask]])
+            shingle_docs = np.concatenate([shingle_docs, token_docs[short_mask]])
+            order = np.argsort(shingle_docs, kind='stable')
+            shingles = shingles[order]
+            shingle_docs = shingle_docs[order]
+
+        return shingles, shingle_docs
+
+    def signatures(self, texts):
+        """
+        Compute MinHash signatures for a sequence of texts
+        Returns: (uint32 array of shape (n, num_perm), boolean mask of texts that had shingles)
+        """
+        texts = list(texts)
+        signatures = np.full((len(texts), self.num_perm), _EMPTY_SIGNATURE, dtype=np.uint32)
+        has_shingles = np.zeros(len(texts), dtype=bool)
+
+        for chunk_start in range(0, len(texts), self.chunk_size):
+            chunk = texts[chunk_start:chunk_start + self.chunk_size]
+            shingles, shingle_docs = self._shingle_chunk(chunk)
+            if len(shingles) == 0:
+                continue
+
+            counts = np.bincount(shingle_docs, minlength=len(chunk))
+            non_empty = np.nonzero(counts)[0]
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[non_empty]
+            rows = chunk_start + non_empty
+
+            for j in range(self.num_perm):
+                hashed = (self._perm_a[j] * shingles + self._perm_b[j]) >> np.uint64(32)
+                signatures[rows, j] = np.minimum.reduceat(hashed, starts)
+            has_shingles[rows] = True
+
+        return signatures, has_shingles
+
+    def _band_keys(self, signatures, band):
+        columns = signatures[:, band * self.rows_per_band:(band + 1) * self.rows_per_band].astype(np.uint64)
+        keys = np.zeros(len(signatures), dtype=np.uint64)
+        for col in range(columns.shape[1]):
+            keys = keys * np.uint64(0x100000001B3) + columns[:, col]
+        return keys
+
+    def find_clusters(self, texts, min_cluster_size=2):
+        """
+        Group near-identical texts
+        Returns: list of {'members': [indices], 'size', 'similarity'} sorted by cluster size
+        """
+        signatures, has_shingles = self.signatures(texts)
+        candidates = np.nonzero(has_shingles)[0]
+        if len(candidates) < 2:
+            return []
+
+        candidate_signatures = signatures[candidates]
+        parent = np.arange(len(candidates))
+
+        def find(node):
+            root = node
+            while parent[root] != root:
+                root = parent[root]
+            while parent[node] != root:
+                parent[node], node = root, parent[node]
+            return root
+
+        edge_sources = []
+        edge_targets = []
+        for band in range(self.bands):
+            keys = self._band_keys(candidate_signatures, band)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+
+            # Link every bucket member to the first member of its bucket, so that
+            # large buckets cost linear rather than quadratic work
+            is_start = np.ones(len(order), dtype=bool)
+            is_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+            start_positions = np.maximum.accumulate(np.where(is_start, np.arange(len(order)), 0))
+            members = order[~is_start]
+            representatives = order[start_positions[~is_start]]
+            if len(members) == 0:
+                continue
+
+            agreement = (candidate_signatures[members] == candidate_signatures[representatives]).mean(axis=1)
+            similar = agreement >= self.threshold
+            edge_sources.append(representatives[similar])
+            edge_targets.append(members[similar])
+
+        if not edge_sources:
+            return []
+
+        edges = np.unique(np.stack([np.concatenate(edge_sources), np.concatenate(edge_targets)], axis=1), axis=0)
+        for source, target in edges:
+            root_source, root_target = find(source), find(target)
+            if root_source != root_target:
+                parent[root_target] = root_source
+
+        # Only nodes that appear in an edge can belong to a cluster
+        clusters = {}
+        for node in np.unique(edges):
+            clusters.setdefault(int(find(node)), []).append(int(node))
+        clusters = {root: nodes for root, nodes in clusters.items() if len(nodes) >= min_cluster_size}
+
+        results = []
+        for nodes in clusters.values():
+            nodes = np.array(nodes)
+            similarity = (candidate_signatures[nodes] == candidate_signatures[nodes[0]]).mean(axis=1)
+            results.append({
+                'members': [int(index) for index in candidates[nodes]],
+                'size': len(nodes),
+                'similarity': round(float(similarity[1:].mean()), 3)
+            })
+
+        results.sort(key=lambda cluster: (-cluster['size'], cluster['members'][0]))
+        return results
+
+
+def summarize_clusters(clusters, records, max_clusters=20, max_reviews=5):
+    """
+    Describe clusters using per-review metadata
+    `records` is indexable by review position and yields dicts with author, company, rating and text
+    """
+    cross_company = 0
+    multi_author = 0
+    reviews_in_clusters = 0
+    described = []
+
+    for cluster in clusters:
+        members = [records[index] for index in cluster['members']]
+        authors = sorted({str(member.get('author', 'Anonymous')) for member in members})
+        companies = sorted({str(member.get('company', 'Unknown')) for member in members})
+        reviews_in_clusters += cluster['size']
+        if len(companies) > 1:
+            cross_company += 1
+        if len(authors) > 1:
+            multi_author += 1
+
+        if len(described) < max_clusters:
+            described.append({
+                'size': cluster['size'],
+                'similarity': cluster['similarity'],
+                'authors': authors,
+                'companies': companies,
+                'is_review_ring': len(companies) > 1 or len(authors) > 1,
+                'reviews': [
+                    {
+                        'index': index,
+                        'author': member.get('author', 'Anonymous'),
+                        'company': member.get('company', 'Unknown'),
+                        'rating': member.get('rating', 'N/A'),
+                        'text': str(member.get('text', ''))[:200]
+                    }
+                    for index, member in zip(cluster['members'][:max_reviews], members[:max_reviews])
+                ]
+            })
+
+    return {
+        'total_clusters': len(clusters),
+        'reviews_in_clusters': reviews_in_clusters,
+        'cross_company_clusters': cross_company,
+        'multi_author_clusters': multi_author,
+        'clusters': described
+    }
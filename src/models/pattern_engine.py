@@ -0,0 +1,166 @@
+"""
+Regex engines for rule patterns
+Patterns like `\\b(will|might)\\b.*\\b(visit|go)\\b` backtrack quadratically (cubically with
+two gaps) on long reviews that repeat the first phrase without the second. The linear
+engine splits such patterns at their top-level `.*` gaps and matches the pieces in order,
+each scan resuming where the previous piece ended; RE2 is used instead when installed
+"""
+
+import re
+import time
+
+from src.utils.startup import lazy_import, module_available
+
+RE2_AVAILABLE = module_available('re2')
+re2 = lazy_import('re2')
+
+ENGINES = ('auto', 're2', 'linear', 'backtracking')
+
+# Top-level alternation is checked while scanning; these make splitting unsafe anywhere:
+# backreferences, anchors (pieces are matched per line) and inline flags such as (?s)
+_UNSPLITTABLE = re.compile(r'\\\d|(?<![\\\[])[\^$]|\(\?[aiLmsux-]*[:)]')
+
+# Escapes and classes that can match a line break; gaps never cross one (`.` excludes
+# '\n'), so pieces are matched line by line and must not span lines themselves
+_LINE_BREAK_TOKENS = re.compile(r'\\[sSWDn]|\[\^')
+
+
+def resolve_engine(engine):
+    """'auto' picks RE2 when it is installed; an unavailable RE2 falls back to 'linear'"""
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown regex engine {engine!r}, expected one of {", ".join(ENGINES)}')
+    if engine == 'auto':
+        return 're2' if RE2_AVAILABLE else 'linear'
+    if engine == 're2' and not RE2_AVAILABLE:
+        return 'linear'
+    return engine
+
+
+def split_gaps(pattern):
+    """
+    Split a pattern at its top-level `.*` (or `.*?`) gaps
+    Returns: list of pieces, or None if there is no gap or splitting would change matches
+    """
+    if _UNSPLITTABLE.search(pattern):
+        return None
+
+    pieces = []
+    start = i = depth = 0
+    in_class = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+            # ']' straight after '[' or '[^' is a literal
+            if pattern.startswith(']', i + 1):
+                i += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and char == '|':
+            return None
+        elif depth == 0 and pattern.startswith('.*', i):
+            if pattern.startswith('+', i + 2):
+                return None  # possessive gap can't give characters back
+            pieces.append(pattern[start:i])
+            i += 3 if pattern.startswith('?', i + 2) else 2
+            start = i
+            continue
+        i += 1
+    pieces.append(pattern[start:])
+
+    pieces = [piece for piece in pieces if piece]
+    if len(pieces) < 2 or any(_LINE_BREAK_TOKENS.search(piece) for piece in pieces):
+        return None
+    return pieces
+
+
+class GapSequence:
+    """
+    `A.*B.*C` matched as: first A on a line, then the first B after it, then C after that
+    Each line is scanned once per piece, so matching is linear in the text length
+    Equivalent to the backtracking search unless a match of one piece can lie strictly
+    inside another match of the same piece, which word-bounded phrase lists don't do
+    """
+
+    def __init__(self, pieces, flags=0):
+        self.pattern = '.*'.join(pieces)
+        self.pieces = tuple(re.compile(piece, flags) for piece in pieces)
+
+    def search(self, text):
+        line_start = 0
+        while line_start <= len(text):
+            line_end = text.find('\n', line_start)
+            if line_end == -1:
+                line_end = len(text)
+            if self._search_line(text, line_start, line_end):
+                return True
+            line_start = line_end + 1
+        return None
+
+    def _search_line(self, text, pos, endpos):
+        for piece in self.pieces:
+            match = piece.search(text, pos, endpos)
+            if match is None:
+                return False
+            pos = match.end()
+        return True
+
+
+def compile_pattern(pattern, flags=re.IGNORECASE, engine='linear'):
+    """
+    Compile a rule pattern for `engine` (already resolved)
+    Patterns are always validated with `re` first so a bad pattern fails the same way
+    under every engine; patterns RE2 can't express (lookarounds) use the linear engine
+    Returns: (matcher with .search(text), engine actually used)
+    """
+    compiled = re.compile(pattern, flags)
+    if engine == 're2':
+        try:
+            return re2.compile(('(?i)' if flags & re.IGNORECASE else '') + pattern), 're2'
+        except Exception:
+            engine = 'linear'
+    if engine == 'linear':
+        pieces = split_gaps(pattern)
+        if pieces:
+            return GapSequence(pieces, flags), 'linear'
+    return compiled, 'backtracking'
+
+
+class MatchBudget:
+    """
+    Per-review time budget for pattern matching
+    Checked before each pattern (a running regex can't be interrupted); once spent, the
+    remaining patterns are skipped and counted as not matching
+    """
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.deadline = time.perf_counter() + seconds if seconds else None
+        self.evaluated = 0
+        self.skipped = 0
+
+    def search(self, compiled, text):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.skipped += 1
+            return None
+        self.evaluated += 1
+        return compiled.search(text)
+
+    @property
+    def exceeded(self):
+        return self.skipped > 0
+
+    def to_dict(self):
+        return {
+            'budget_ms': round(self.seconds * 1000, 3) if self.seconds else None,
+            'exceeded': self.exceeded,
+            'patterns_evaluated': self.evaluated,
+            'patterns_skipped': self.skipped
+        }
@@ -0,0 +1,216 @@
+"""
+Full-text search over uploaded reviews backed by an SQLite FTS5 inverted index
+Supports term, "quoted phrase" and prefix* queries ranked by BM25
+The index lives in its own SQLite file and mirrors the datasets the DatasetStore holds:
+rows are replaced when a dataset is re-added and deleted when it is evicted. Datasets are
+held in each process's memory, so every process searches only the rows it indexed (several
+workers can share the file), and rows of processes that have exited are cleared when the
+index is opened
+"""
+
+import os
+import re
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_QUERY_TOKEN_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+_WORD_PATTERN = re.compile(r'\w+')
+
+# Each indexed dataset's contiguous FTS rowid range, so a dataset is dropped with a rowid
+# range delete instead of a scan of the UNINDEXED dataset_id column
+_DATASETS_TABLE = """
+CREATE TABLE IF NOT EXISTS indexed_datasets (
+    owner TEXT NOT NULL,
+    dataset_id TEXT NOT NULL,
+    first_rowid INTEGER NOT NULL,
+    last_rowid INTEGER NOT NULL,
+    PRIMARY KEY (owner, dataset_id)
+)
+"""
+
+
+def _process_owner():
+    """'host:pid:start' name of this process's rows; the start time tells a reused pid apart"""
+    return f'{socket.gethostname()}:{os.getpid()}:{time.time():.6f}'
+
+
+def _owner_alive(owner):
+    """False only for a process on this host that has certainly exited"""
+    host, _, rest = owner.partition(':')
+    pid = rest.partition(':')[0]
+    if host != socket.gethostname() or not pid.isdigit() or sys.platform == 'win32':
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def build_match_expression(query):
+    """
+    Translate a user query into a safe FTS5 MATCH expression
+    Quoted text becomes a phrase, a trailing * makes a prefix query, everything else is ANDed terms
+    """
+    parts = []
+    for phrase, term in _QUERY_TOKEN_PATTERN.findall(query or ''):
+        if phrase:
+            words = _WORD_PATTERN.findall(phrase)
+            if words:
+                parts.append('"' + ' '.join(words) + '"')
+        else:
+            words = _WORD_PATTERN.findall(term)
+            if not words:
+                continue
+            prefix = '*' if term.endswith('*') else ''
+            parts.extend(f'"{word}"' for word in words[:-1])
+            parts.append(f'"{words[-1]}"{prefix}')
+    return ' '.join(parts)
+
+
+class ReviewSearchIndex:
+    """Incrementally updated FTS5 index of review text keyed by dataset and row position"""
+
+    def __init__(self, path=None, batch_size=50000):
+        default_path = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'search.db')
+        self.path = os.path.abspath(path or os.environ.get('REVIEW_SEARCH_DB', default_path))
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self._owner = None
+
+    @contextmanager
+    def _transaction(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                if not self._table_ready:
+                    self._create_table(connection)
+                yield connection
+        finally:
+            connection.close()
+
+    def _create_table(self, connection):
+        with self._lock:
+            if self._table_ready:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS review_fts USING fts5("
+                "review_text, company UNINDEXED, author UNINDEXED, dataset_id UNINDEXED, position UNINDEXED, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+            connection.execute(_DATASETS_TABLE)
+            # Datasets are held in memory, so rows of exited processes point at nothing
+            owners = [owner for (owner,) in connection.execute('SELECT DISTINCT owner FROM indexed_datasets')]
+            for owner in owners:
+                if not _owner_alive(owner):
+                    self._delete_datasets(connection, owner, None)
+            connection.commit()
+            self._owner = _process_owner()
+            self._table_ready = True
+
+    @staticmethod
+    def _delete_datasets(connection, owner, dataset_ids):
+        """Drop the rows of `owner`'s datasets (all of them when `dataset_ids` is None)"""
+        if dataset_ids is None:
+            ranges = connection.execute('SELECT dataset_id, first_rowid, last_rowid FROM indexed_datasets WHERE owner = ?', (owner,)).fetchall()
+        else:
+            ranges = [
+                row for dataset_id in dataset_ids
+                for row in connection.execute(
+                    'SELECT dataset_id, first_rowid, last_rowid FROM indexed_datasets WHERE owner = ? AND dataset_id = ?', (owner, dataset_id)
+                )
+            ]
+        connection.executemany('DELETE FROM review_fts WHERE rowid BETWEEN ? AND ?', [(first, last) for _, first, last in ranges])
+        connection.executemany('DELETE FROM indexed_datasets WHERE owner = ? AND dataset_id = ?', [(owner, dataset_id) for dataset_id, _, _ in ranges])
+
+    def add_dataset(self, dataset_id, df):
+        """
+        Index one processed upload, replacing any rows already indexed under its id
+        Returns: number of indexed reviews (reviews with text)
+        """
+        if 'cleaned_review_text' not in df.columns:
+            return 0
+
+        texts = df['cleaned_review_text'].fillna('').astype(str).tolist()
+        companies = df['company'].astype(str).tolist() if 'company' in df.columns else [None] * len(texts)
+        authors = df['author'].astype(str).tolist() if 'author' in df.columns else [None] * len(texts)
+
+        indexed = 0
+        with self._transaction() as connection:
+            # Taken before reading the next rowid, so concurrent writers get disjoint ranges
+            connection.execute('BEGIN IMMEDIATE')
+            self._delete_datasets(connection, self._owner, [dataset_id])
+            first_rowid = connection.execute('SELECT coalesce(max(rowid), 0) + 1 FROM review_fts').fetchone()[0]
+            for start in range(0, len(texts), self.batch_size):
+                positions = [position for position in range(start, min(start + self.batch_size, len(texts))) if texts[position]]
+                rows = [
+                    (first_rowid + indexed + number, texts[position], companies[position], authors[position], dataset_id, position)
+                    for number, position in enumerate(positions)
+                ]
+                connection.executemany(
+                    'INSERT INTO review_fts (rowid, review_text, company, author, dataset_id, position) VALUES (?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                indexed += len(rows)
+            if indexed:
+                connection.execute(
+                    'INSERT INTO indexed_datasets VALUES (?, ?, ?, ?)',
+                    (self._owner, dataset_id, first_rowid, first_rowid + indexed - 1)
+                )
+        return indexed
+
+    def remove_datasets(self, dataset_ids):
+        """Drop the rows of datasets the store no longer holds"""
+        if not dataset_ids:
+            return
+        with self._transaction() as connection:
+            self._delete_datasets(connection, self._owner, dataset_ids)
+
+    def search(self, query, dataset_id=None, company=None, limit=20):
+        """Return reviews matching `query`, best BM25 rank first"""
+        expression = build_match_expression(query)
+        if not expression:
+            return []
+
+        # Only this process's datasets: other workers' rows point at datasets it does not hold
+        sql = (
+            "SELECT review_fts.dataset_id, review_fts.position, review_fts.company, review_fts.author, "
+            "snippet(review_fts, 0, '[', ']', '...', 16) AS snippet, bm25(review_fts) AS score "
+            "FROM review_fts JOIN indexed_datasets AS datasets "
+            "ON review_fts.rowid BETWEEN datasets.first_rowid AND datasets.last_rowid "
+            "WHERE review_fts MATCH :expression AND datasets.owner = :owner"
+        )
+        params = {'expression': expression, 'limit': limit}
+        if dataset_id:
+            sql += " AND datasets.dataset_id = :dataset_id"
+            params['dataset_id'] = dataset_id
+        if company:
+            sql += " AND review_fts.company = :company"
+            params['company'] = company
+        sql += " ORDER BY score LIMIT :limit"
+
+        with self._transaction() as connection:
+            params['owner'] = self._owner
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(sql, params).fetchall()
+
+        return [
+            {
+                'dataset_id': row['dataset_id'],
+                'position': int(row['position']),
+                'company': row['company'],
+                'author': row['author'],
+                'snippet': row['snippet'],
+                'score': round(-float(row['score']), 4)
+            }
+            for row in rows
+        ]
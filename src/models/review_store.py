@@ -0,0 +1,198 @@
+"""
+Persistent store of reviews scored by the spool ingestion daemon
+An SQLite file holds the scored reviews, running per-company and per-status aggregates for
+the dashboard, and how far each spool file has been read. A micro-batch's rows, aggregate
+updates and file positions are committed in one transaction, so after a crash or restart
+the daemon resumes exactly where the last committed batch ended
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scored_reviews (
+    source TEXT NOT NULL,
+    line_offset INTEGER NOT NULL,
+    review_id TEXT,
+    author TEXT,
+    company TEXT,
+    rating REAL,
+    review_text TEXT,
+    status TEXT,
+    legitimate INTEGER,
+    confidence REAL,
+    sentiment TEXT,
+    violation_types TEXT,
+    model_version TEXT,
+    ingested_at REAL,
+    PRIMARY KEY (source, line_offset)
+);
+CREATE TABLE IF NOT EXISTS company_aggregates (
+    company TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reviews INTEGER NOT NULL,
+    legitimate INTEGER NOT NULL,
+    rating_sum REAL NOT NULL,
+    rating_count INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (company, status)
+);
+CREATE TABLE IF NOT EXISTS spool_files (
+    name TEXT PRIMARY KEY,
+    byte_offset INTEGER NOT NULL,
+    records INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS ingest_status (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    metrics TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_UPSERT_AGGREGATE = """
+INSERT INTO company_aggregates VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (company, status) DO UPDATE SET
+    reviews = reviews + excluded.reviews,
+    legitimate = legitimate + excluded.legitimate,
+    rating_sum = rating_sum + excluded.rating_sum,
+    rating_count = rating_count + excluded.rating_count,
+    confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+
+
+class ReviewStore:
+    """Scored reviews, dashboard aggregates and spool positions in one SQLite file"""
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._transaction() as connection:
+            # WAL lets the web server read while the daemon writes
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(_SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        """A connection whose statements commit together on exit, or roll back on an exception"""
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def file_positions(self):
+        """{spool file name: {'byte_offset', 'records', 'errors'}} as last committed"""
+        with self._transaction() as connection:
+            rows = connection.execute('SELECT name, byte_offset, records, errors FROM spool_files').fetchall()
+        return {name: {'byte_offset': offset, 'records': records, 'errors': errors} for name, offset, records, errors in rows}
+
+    def append_batch(self, rows, positions):
+        """
+        Store scored rows, fold them into the aggregates and advance the spool positions,
+        all in one transaction
+        `rows` are dicts with the scored_reviews columns; `positions` maps each spool file
+        read for this batch to its new {'byte_offset', 'records', 'errors'}. A row SQLite
+        rejects is skipped without failing the batch
+        Returns: the number of rejected rows
+        """
+        now = time.time()
+        aggregates = defaultdict(lambda: [0, 0, 0.0, 0, 0.0])
+        rejected = 0
+        with self._transaction() as connection:
+            for row in rows:
+                # Row by row, so one bad value cannot fail the batch and stall ingestion on restart
+                try:
+                    connection.execute('INSERT INTO scored_reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+                        row['source'], row['line_offset'], row['review_id'], row['author'], row['company'],
+                        row['rating'], row['review_text'], row['status'], int(bool(row['legitimate'])),
+                        row['confidence'], row['sentiment'], json.dumps(row['violation_types']),
+                        row['model_version'], now
+                    ))
+                except (sqlite3.InterfaceError, sqlite3.ProgrammingError, sqlite3.IntegrityError, TypeError, ValueError) as e:
+                    rejected += 1
+                    print(f'{row["source"]}@{row["line_offset"]}: not stored ({e})', file=sys.stderr)
+                    continue
+                entry = aggregates[(row['company'] or 'Unknown', row['status'])]
+                entry[0] += 1
+                entry[1] += int(bool(row['legitimate']))
+                if row['rating'] is not None:
+                    entry[2] += row['rating']
+                    entry[3] += 1
+                entry[4] += row['confidence'] or 0.0
+            connection.executemany(_UPSERT_AGGREGATE, [(company, status, *entry) for (company, status), entry in aggregates.items()])
+            connection.executemany(
+                'INSERT OR REPLACE INTO spool_files VALUES (?, ?, ?, ?, ?)',
+                [(name, state['byte_offset'], state['records'], state['errors'], now) for name, state in positions.items()]
+            )
+        return rejected
+
+    def save_metrics(self, metrics):
+        with self._transaction() as connection:
+            connection.execute('INSERT OR REPLACE INTO ingest_status VALUES (1, ?, ?)', (json.dumps(metrics), time.time()))
+
+    def summary(self, top_companies=20):
+        """Dashboard-style aggregates of everything ingested, and the daemon's latest metrics"""
+        with self._transaction() as connection:
+            aggregates = connection.execute('SELECT * FROM company_aggregates').fetchall()
+            files = connection.execute('SELECT name, byte_offset, records, errors, updated_at FROM spool_files ORDER BY name').fetchall()
+            status = connection.execute('SELECT metrics, updated_at FROM ingest_status WHERE id = 1').fetchone()
+
+        statuses = defaultdict(int)
+        companies = defaultdict(lambda: {'reviews': 0, 'legitimate': 0, 'rating_sum': 0.0, 'rating_count': 0, 'statuses': {}})
+        for company, label, reviews, legitimate, rating_sum, rating_count, _ in aggregates:
+            statuses[label] += reviews
+            entry = companies[company]
+            entry['reviews'] += reviews
+            entry['legitimate'] += legitimate
+            entry['rating_sum'] += rating_sum
+            entry['rating_count'] += rating_count
+            entry['statuses'][label] = reviews
+
+        total = sum(statuses.values())
+        ranked = sorted(companies.items(), key=lambda item: -item[1]['reviews'])[:top_companies]
+        return {
+            'total_reviews': total,
+            'total_companies': len(companies),
+            'statuses': dict(sorted(statuses.items(), key=lambda item: -item[1])),
+            'percentages': {label: round(count / total * 100, 1) for label, count in statuses.items()} if total else {},
+            'companies': {
+                company: {
+                    'reviews': entry['reviews'],
+                    'mean_rating': round(entry['rating_sum'] / entry['rating_count'], 2) if entry['rating_count'] else None,
+                    'legitimate_share': round(entry['legitimate'] / entry['reviews'], 3),
+                    'statuses': entry['statuses']
+                }
+                for company, entry in ranked
+            },
+            'files': [
+                {'name': name, 'byte_offset': offset, 'records': records, 'errors': errors, 'updated_at': updated_at}
+                for name, offset, records, errors, updated_at in files
+            ],
+            'ingestion': {'metrics': json.loads(status[0]), 'updated_at': status[1]} if status else None
+        }
+
+
+_review_store = None
+_review_store_lock = threading.Lock()
+
+
+def get_review_store():
+    """Shared store at REVIEW_INGEST_DB (default database/reviews.db)"""
+    global _review_store
+    if _review_store is None:
+        with _review_store_lock:
+            if _review_store is None:
+                default_path = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'reviews.db')
+                _review_store = ReviewStore(os.path.abspath(os.environ.get('REVIEW_INGEST_DB', default_path)))
+    return _review_store
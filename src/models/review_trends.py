@@ -0,0 +1,228 @@
+"""
+Time-series trend analytics for uploaded reviews
+Builds daily and weekly volume, mean rating and classification mix series (overall and
+per company) with vectorized resample/rolling operations, and flags review bursts whose
+daily volume is far above the trailing baseline
+"""
+
+import re
+
+from src.utils.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Checked first (case-insensitive), then any column whose name mentions a date or time
+DATE_COLUMN_CANDIDATES = [
+    'date', 'review_date', 'reviewed_at', 'published_at', 'published_date', 'publishedatdate',
+    'created_at', 'timestamp', 'datetime', 'time'
+]
+_DATE_NAME_PATTERN = re.compile(r'date|time|_at$', re.IGNORECASE)
+
+# Numeric values only count as epoch timestamps inside 1995-01-01..2100-01-01, so columns
+# like `time_spent` or `updated_at_count` are not read as dates in 1970
+_EPOCH_SECONDS_RANGE = (788918400, 4102444800)
+
+# Weekly bins start on Monday and are labelled with that Monday
+_FREQUENCIES = {'daily': 'D', 'weekly': 'W-MON'}
+
+
+class ReviewTrendAnalyzer:
+    """Windowed volume/rating/classification trends and burst detection"""
+
+    def __init__(self, burst_window=28, min_baseline_days=7, burst_z=3.0, burst_ratio=2.0,
+                 min_burst_count=10, max_companies=10, min_parsed_share=0.5):
+        self.burst_window = burst_window
+        self.min_baseline_days = min_baseline_days
+        self.burst_z = burst_z
+        self.burst_ratio = burst_ratio
+        self.min_burst_count = min_burst_count
+        self.max_companies = max_companies
+        self.min_parsed_share = min_parsed_share
+
+    def detect_date_column(self, df):
+        """
+        Find the column holding review timestamps
+        Returns: (column_name, parsed_datetimes) or (None, None)
+        """
+        by_name = {str(column).lower(): column for column in df.columns}
+        candidates = [by_name[name] for name in DATE_COLUMN_CANDIDATES if name in by_name]
+        candidates += [column for column in df.columns if _DATE_NAME_PATTERN.search(str(column)) and column not in candidates]
+
+        for column in candidates:
+            parsed = self.parse_dates(df[column])
+            if parsed is not None:
+                return column, parsed
+        return None, None
+
+    def parse_dates(self, values):
+        """Parse a column to naive UTC datetimes, or None if most values are not dates"""
+        non_null = values.notna().sum()
+        if non_null == 0:
+            return None
+
+        if pd.api.types.is_numeric_dtype(values):
+            # Epoch timestamps: milliseconds when the magnitude is past ~5000 AD in seconds
+            seconds = values.astype('float64')
+            if seconds.abs().max() > 1e11:
+                seconds = seconds / 1000
+            plausible = seconds.between(*_EPOCH_SECONDS_RANGE)
+            parsed = pd.to_datetime(seconds.where(plausible), unit='s', errors='coerce', utc=True)
+        else:
+            values = values.astype(object)
+            # The fast path infers one format from the first value; exports that mix
+            # formats (e.g. dates with and without times) need per-value parsing
+            parsed = pd.to_datetime(values, errors='coerce', utc=True)
+            if parsed.notna().sum() < non_null:
+                mixed = pd.to_datetime(values, errors='coerce', utc=True, format='mixed')
+                if mixed.notna().sum() > parsed.notna().sum():
+                    parsed = mixed
+
+        if parsed.notna().sum() < non_null * self.min_parsed_share:
+            return None
+        return parsed.dt.tz_convert(None)
+
+    def analyze(self, df):
+        """
+        Compute trend series and bursts for a processed dataframe
+        Returns: None when no usable date column exists
+        """
+        date_column, dates = self.detect_date_column(df)
+        if date_column is None:
+            return None
+
+        frame = pd.DataFrame({'date': dates})
+        if 'rating' in df.columns:
+            frame['rating'] = pd.to_numeric(df['rating'], errors='coerce').astype('float64')
+        if 'classification' in df.columns:
+            frame['classification'] = df['classification']
+        if 'company' in df.columns:
+            frame['company'] = df['company']
+        # Sorted once so every resample/groupby below works on an already ordered index
+        frame = frame[frame['date'].notna()].sort_values('date', kind='stable')
+        if frame.empty:
+            return None
+
+        start, end = frame['date'].min(), frame['date'].max()
+        trends = {
+            'date_column': str(date_column),
+            'date_range': {
+                'start': start.isoformat(),
+                'end': end.isoformat(),
+                'days': int((end.normalize() - start.normalize()).days) + 1
+            },
+            'overall': {name: self._series(frame, freq) for name, freq in _FREQUENCIES.items()},
+            'bursts': self._bursts(frame)
+        }
+
+        if 'company' in frame.columns:
+            top_companies = frame['company'].value_counts().head(self.max_companies)
+            top_companies = top_companies[top_companies > 0].index
+            groups = dict(iter(frame[frame['company'].isin(top_companies)].groupby('company', sort=False, observed=True)))
+            trends['companies'] = {
+                str(company): {name: self._series(groups[company], freq) for name, freq in _FREQUENCIES.items()}
+                for company in top_companies
+            }
+            trends['company_bursts'] = self._company_bursts(frame)
+
+        return trends
+
+    def _series(self, frame, freq):
+        """Volume, mean rating and classification mix per period (empty periods included)"""
+        indexed = frame.set_index('date')
+        resampled = indexed.resample(freq, label='left', closed='left')
+        series = pd.DataFrame({'count': resampled.size()})
+        if 'rating' in indexed.columns:
+            series['mean_rating'] = resampled['rating'].mean().round(2)
+
+        mix = None
+        if 'classification' in indexed.columns:
+            mix = (
+                indexed.groupby([pd.Grouper(freq=freq, label='left', closed='left'), 'classification'], observed=True)
+                .size()
+                .unstack(fill_value=0)
+                .reindex(series.index, fill_value=0)
+            )
+
+        # Build the JSON records from plain lists; row-wise pandas access dominates otherwise
+        periods = series.index.strftime('%Y-%m-%d').tolist()
+        counts = series['count'].tolist()
+        means = series['mean_rating'].tolist() if 'mean_rating' in series.columns else None
+        mix_labels = [str(label) for label in mix.columns] if mix is not None else None
+        mix_rows = mix.to_numpy().tolist() if mix is not None else None
+
+        records = []
+        for position, period in enumerate(periods):
+            record = {'period': period, 'count': int(counts[position])}
+            if means is not None:
+                mean = means[position]
+                record['mean_rating'] = None if mean != mean else float(mean)
+            if mix_rows is not None:
+                record['classifications'] = {
+                    label: int(count) for label, count in zip(mix_labels, mix_rows[position]) if count
+                }
+            records.append(record)
+        return records
+
+    def _burst_scores(self, counts):
+        """
+        z-score of each day's volume against the trailing window that precedes it
+        `counts` is a days x series frame, so every company is scored in one rolling pass
+        """
+        history = counts.shift(1).rolling(self.burst_window, min_periods=self.min_baseline_days)
+        baseline = history.mean()
+        # Floor the spread at a Poisson-like sqrt(mean) (and 1) so quiet series don't explode
+        spread = np.maximum(history.std(), np.sqrt(baseline.clip(lower=1)))
+        z_scores = (counts - baseline) / spread
+        # A burst must be both statistically unusual and a large multiple of the baseline
+        flagged = (
+            (z_scores >= self.burst_z)
+            & (counts >= baseline * self.burst_ratio)
+            & (counts >= self.min_burst_count)
+        )
+        return baseline, z_scores, flagged
+
+    def _bursts(self, frame):
+        counts = frame.set_index('date').resample('D').size().to_frame('count')
+        baseline, z_scores, flagged = self._burst_scores(counts)
+        ratings = frame.set_index('date')['rating'].resample('D').mean() if 'rating' in frame.columns else None
+
+        bursts = []
+        for day in counts.index[flagged['count'].to_numpy()]:
+            burst = {
+                'date': day.date().isoformat(),
+                'count': int(counts.at[day, 'count']),
+                'baseline': round(float(baseline.at[day, 'count']), 2),
+                'z_score': round(float(z_scores.at[day, 'count']), 2)
+            }
+            if ratings is not None:
+                burst['mean_rating'] = None if pd.isna(ratings.at[day]) else round(float(ratings.at[day]), 2)
+            bursts.append(burst)
+        return bursts
+
+    def _company_bursts(self, frame):
+        # A company needs at least min_burst_count reviews in total to ever burst
+        totals = frame['company'].value_counts()
+        frame = frame[frame['company'].isin(totals[totals >= self.min_burst_count].index)]
+        if frame.empty:
+            return []
+        counts = (
+            frame.groupby([pd.Grouper(key='date', freq='D'), 'company'], observed=True)
+            .size()
+            .unstack(fill_value=0)
+            .asfreq('D', fill_value=0)
+        )
+        baseline, z_scores, flagged = self._burst_scores(counts)
+
+        stacked = flagged.stack()
+        bursts = []
+        for day, company in stacked.index[stacked.to_numpy()]:
+            bursts.append({
+                'date': day.date().isoformat(),
+                'company': str(company),
+                'count': int(counts.at[day, company]),
+                'baseline': round(float(baseline.at[day, company]), 2),
+                'z_score': round(float(z_scores.at[day, company]), 2)
+            })
+        bursts.sort(key=lambda burst: burst['z_score'], reverse=True)
+        return bursts
@@ -0,0 +1,342 @@
+"""
+Rule packs: review policy patterns, keyword lists and business-type tables loaded from
+JSON data files, compiled once per version and hot-swapped when the files change
+English rules live in review_rules.json; other languages in languages/<code>.json are
+loaded the first time a review in that language is analyzed
+"""
+
+import csv
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+
+from src.models.business_catalog import BusinessCatalog
+from src.models.languages import DEFAULT_LANGUAGE, normalize_language
+from src.models.pattern_engine import compile_pattern, resolve_engine
+from src.models.topic_vectors import TopicIndex
+
+REVIEW_RULES_FILE = 'review_rules.json'
+BUSINESS_CONTEXT_FILE = 'business_context.json'
+BUSINESS_CATALOG_FILE = 'business_catalog.csv'
+LANGUAGES_DIR = 'languages'
+
+# Pattern groups ReviewAnalyzer evaluates; every pack must define all of them
+PATTERN_GROUPS = (
+    'strong_ad', 'weak_ad', 'business_context', 'promo_mention', 'no_visit',
+    'fake', 'off_topic', 'inappropriate', 'personal_info'
+)
+
+
+class KeywordMatcher:
+    """
+    Substring keyword lookup with one regex scan instead of one `in` test per keyword
+    A lookahead alternation (longest keywords first) reports the longest keyword starting
+    at each position; keywords contained in a matched keyword are added back, so the
+    result equals [k for k in keywords if k in text]
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+        self._order = {keyword: index for index, keyword in enumerate(self.keywords)}
+        self._contained = {
+            keyword: tuple(other for other in self.keywords if other != keyword and other in keyword)
+            for keyword in self.keywords
+        }
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(self.keywords, key=len, reverse=True))
+        self._pattern = re.compile(f'(?=({alternation}))') if self.keywords else None
+
+    def find(self, text_lower):
+        """Keywords occurring in already lower-cased text, in declaration order"""
+        if self._pattern is None:
+            return []
+        found = set()
+        for match in self._pattern.finditer(text_lower):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.add(keyword)
+                found.update(self._contained[keyword])
+        return sorted(found, key=self._order.__getitem__)
+
+    def __len__(self):
+        return len(self.keywords)
+
+
+class RulePack:
+    """
+    Compiled, read-only view of one version of the rule files
+    A request keeps using the pack it started with even if a newer one is swapped in
+    Tables are tuples, frozensets and read-only mappings, so request threads can share
+    a pack without locks; only the lazily built topic index is assigned after __init__
+    """
+
+    def __init__(self, review_rules, business_context, engine='auto'):
+        self.version = str(review_rules['version'])
+        self.language = normalize_language(review_rules.get('language')) or DEFAULT_LANGUAGE
+        self.business_context_version = str(business_context['version'])
+        self.loaded_at = datetime.now().isoformat()
+
+        patterns = review_rules['patterns']
+        missing = [group for group in PATTERN_GROUPS if group not in patterns]
+        if missing:
+            raise ValueError(f'Rule pack is missing pattern groups: {", ".join(missing)}')
+        # (source, matcher) pairs: the source string is reported back in violations
+        self.engine = resolve_engine(engine)
+        self.patterns = {}
+        self.engine_counts = {}
+        for group in PATTERN_GROUPS:
+            compiled = []
+            for pattern in patterns[group]:
+                matcher, used = compile_pattern(pattern, re.IGNORECASE, self.engine)
+                compiled.append((pattern, matcher))
+                self.engine_counts[used] = self.engine_counts.get(used, 0) + 1
+            self.patterns[group] = tuple(compiled)
+        self.patterns = MappingProxyType(self.patterns)
+        self.engine_counts = MappingProxyType(self.engine_counts)
+
+        keywords = review_rules.get('keywords', {})
+        self.suspicious_keywords = KeywordMatcher(keywords.get('suspicious', []))
+        self.positive_words = KeywordMatcher(keywords.get('positive', []))
+        self.negative_words = KeywordMatcher(keywords.get('negative', []))
+        self.stopwords = frozenset(word.lower() for word in keywords.get('stopwords', []))
+
+        self.business_types = MappingProxyType({
+            name: MappingProxyType({
+                'relevant': tuple(topic.lower() for topic in topics.get('relevant', [])),
+                'irrelevant': tuple(topic.lower() for topic in topics.get('irrelevant', []))
+            })
+            for name, topics in business_context.get('business_types', {}).items()
+        })
+        self.business_aliases = MappingProxyType({
+            alias.lower(): business_type
+            for alias, business_type in business_context.get('business_aliases', {}).items()
+        })
+        self.business_keywords = MappingProxyType({
+            business_type: tuple(keyword.lower() for keyword in keywords)
+            for business_type, keywords in business_context.get('business_keywords', {}).items()
+        })
+
+        self._topic_index = None
+        self._topic_index_lock = threading.Lock()
+
+    def topic_index(self):
+        """Semantic centroids of the business types, built on first use (needs NumPy)"""
+        if self._topic_index is None:
+            with self._topic_index_lock:
+                if self._topic_index is None:
+                    self._topic_index = TopicIndex(self.business_types, stopwords=self.stopwords)
+        return self._topic_index
+
+    @classmethod
+    def load(cls, rules_path, business_context_path, engine='auto'):
+        with open(rules_path, encoding='utf-8') as f:
+            review_rules = json.load(f)
+        with open(business_context_path, encoding='utf-8') as f:
+            business_context = json.load(f)
+        return cls(review_rules, business_context, engine)
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'language': self.language,
+            'business_context_version': self.business_context_version,
+            'loaded_at': self.loaded_at,
+            'pattern_counts': {group: len(patterns) for group, patterns in self.patterns.items()},
+            'regex_engine': self.engine,
+            'patterns_by_engine': dict(self.engine_counts),
+            'business_types': len(self.business_types),
+            'business_aliases': len(self.business_aliases)
+        }
+
+
+class RulePackRegistry:
+    """
+    Holds the active RulePack per language and reloads packs when their files change
+    Files are checked at most every `check_interval` seconds from the request path; a
+    reload builds the new pack completely before swapping the reference, and a pack that
+    fails to load leaves the previous one active
+    Languages without a rule file fall back to the default (English) pack
+    The business-name catalog is reloaded the same way but kept outside the packs, so a
+    large catalog is indexed once rather than once per language
+    """
+
+    def __init__(self, directory, check_interval=2.0, engine='auto', catalog_path=None, catalog_min_similarity=0.5):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.engine = engine
+        self.catalog_path = catalog_path or os.path.join(directory, BUSINESS_CATALOG_FILE)
+        self.catalog_min_similarity = catalog_min_similarity
+        self._catalog = None
+        self._catalog_signature = None  # None until first use; ('missing',) without a file
+        self._catalog_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._packs = {}        # language -> RulePack, replaced wholesale on every change
+        self._signatures = {}   # language -> signature of the files its pack was built from
+        self._missing = frozenset()  # languages with no rule file, re-checked on each interval
+        self._last_check = 0.0
+        self.last_error = None
+        self.reloads = 0
+        self.reload()
+
+    def _rules_path(self, language):
+        if language == DEFAULT_LANGUAGE:
+            return os.path.join(self.directory, REVIEW_RULES_FILE)
+        return os.path.join(self.directory, LANGUAGES_DIR, f'{language}.json')
+
+    def _file_signature(self, language):
+        signature = []
+        for path in (self._rules_path(language), os.path.join(self.directory, BUSINESS_CONTEXT_FILE)):
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def current(self, language=None):
+        """
+        The active pack for `language` (default pack if it has no rules), picking up
+        changed files first if the check interval has passed
+        """
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.reload(only_if_changed=True, wait=False)
+
+        language = normalize_language(language) or DEFAULT_LANGUAGE
+        pack = self._packs.get(language)
+        if pack is None and language not in self._missing:
+            pack = self._load_language(language)
+        return pack or self._packs[DEFAULT_LANGUAGE]
+
+    def _load_language(self, language):
+        """First use of a language: compile its pack, or remember that it has none"""
+        with self._lock:
+            if language in self._packs:
+                return self._packs[language]
+            if not os.path.exists(self._rules_path(language)):
+                self._missing = self._missing | {language}
+                return None
+            self._build(language)
+            return self._packs.get(language)
+
+    def _build(self, language, only_if_changed=False):
+        """Compile one language's pack and swap it in; caller holds the lock"""
+        signature = None
+        try:
+            signature = self._file_signature(language)
+            if only_if_changed and signature == self._signatures.get(language):
+                return False
+            pack = RulePack.load(
+                self._rules_path(language), os.path.join(self.directory, BUSINESS_CONTEXT_FILE), self.engine
+            )
+        except (OSError, ValueError, KeyError, TypeError, re.error) as e:
+            if language == DEFAULT_LANGUAGE and DEFAULT_LANGUAGE not in self._packs:
+                raise
+            self.last_error = f'{language}: {type(e).__name__}: {e}'
+            # Don't retry the same broken files on every check
+            if signature is not None:
+                self._signatures[language] = signature
+            return False
+
+        self._packs = {**self._packs, language: pack}
+        self._signatures[language] = signature
+        if self.last_error and self.last_error.startswith(f'{language}: '):
+            self.last_error = None
+        self.reloads += 1
+        return True
+
+    def reload(self, only_if_changed=False, wait=True):
+        """
+        Rebuild the default pack and every language pack loaded so far
+        Returns: True if any new pack was activated
+        """
+        if not self._lock.acquire(blocking=wait):
+            return False  # another request is already reloading
+        try:
+            self._last_check = time.monotonic()
+            self._missing = frozenset()
+            languages = [DEFAULT_LANGUAGE] + [language for language in self._packs if language != DEFAULT_LANGUAGE]
+            reloaded = [self._build(language, only_if_changed) for language in languages]
+            if self._catalog_signature is not None:
+                with self._catalog_lock:
+                    reloaded.append(self._load_catalog(only_if_changed))
+            return any(reloaded)
+        finally:
+            self._lock.release()
+
+    def catalog(self):
+        """The business-name catalog, indexed on first use; None if there is no catalog file"""
+        if self._catalog_signature is None:
+            with self._catalog_lock:
+                if self._catalog_signature is None:
+                    self._load_catalog()
+        return self._catalog
+
+    def _load_catalog(self, only_if_changed=False):
+        """Index the catalog file and swap it in; caller holds the catalog lock"""
+        try:
+            stat = os.stat(self.catalog_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = ('missing',)
+        if only_if_changed and signature == self._catalog_signature:
+            return False
+
+        try:
+            catalog = None
+            if signature != ('missing',):
+                catalog = BusinessCatalog.load(self.catalog_path, min_similarity=self.catalog_min_similarity)
+        except (OSError, ValueError, KeyError, csv.Error) as e:
+            self.last_error = f'catalog: {type(e).__name__}: {e}'
+            self._catalog_signature = signature
+            return False
+
+        self._catalog = catalog
+        self._catalog_signature = signature
+        if self.last_error and self.last_error.startswith('catalog: '):
+            self.last_error = None
+        return True
+
+    def available_languages(self):
+        languages_dir = os.path.join(self.directory, LANGUAGES_DIR)
+        names = os.listdir(languages_dir) if os.path.isdir(languages_dir) else []
+        return sorted({DEFAULT_LANGUAGE} | {name[:-5] for name in names if name.endswith('.json')})
+
+    def status(self):
+        packs = self._packs
+        return {
+            'directory': self.directory,
+            'active': packs[DEFAULT_LANGUAGE].describe(),
+            'languages': {language: pack.describe() for language, pack in packs.items() if language != DEFAULT_LANGUAGE},
+            'available_languages': self.available_languages(),
+            'reloads': self.reloads,
+            'last_error': self.last_error,
+            'check_interval_seconds': self.check_interval,
+            'catalog': {
+                'path': self.catalog_path,
+                **(self._catalog.describe() if self._catalog is not None else {'entries': 0})
+            }
+        }
+
+
+_rule_registry = None
+_rule_registry_lock = threading.Lock()
+
+
+def get_rule_registry():
+    """
+    Shared registry configured from REVIEW_RULES_DIR, REVIEW_RULES_CHECK_SECONDS,
+    REVIEW_REGEX_ENGINE, REVIEW_BUSINESS_CATALOG and REVIEW_CATALOG_MIN_SIMILARITY
+    """
+    global _rule_registry
+    if _rule_registry is None:
+        with _rule_registry_lock:
+            if _rule_registry is None:
+                default_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'rules')
+                _rule_registry = RulePackRegistry(
+                    os.path.abspath(os.environ.get('REVIEW_RULES_DIR', default_dir)),
+                    check_interval=float(os.environ.get('REVIEW_RULES_CHECK_SECONDS', 2)),
+                    engine=os.environ.get('REVIEW_REGEX_ENGINE', 'auto'),
+                    catalog_path=os.environ.get('REVIEW_BUSINESS_CATALOG') or None,
+                    catalog_min_similarity=float(os.environ.get('REVIEW_CATALOG_MIN_SIMILARITY', 0.5))
+                )
+    return _rule_registry
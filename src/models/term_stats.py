@@ -0,0 +1,252 @@
+"""
+Distinctive terms per company and per classification
+Review texts are tokenized and hashed straight from their UTF-8 bytes with NumPy, a chunk
+of reviews at a time, into a sparse document-term matrix over a fixed number of hashed
+columns, so memory stays bounded however large the vocabulary grows. One pass over the
+texts feeds every grouping: term counts are summed per group and each group's terms are
+ranked by the log-odds ratio against all other reviews (with an informative Dirichlet
+prior, Monroe et al. 2008) or by TF-IDF
+"""
+
+from src.utils.startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+METHODS = ('log_odds', 'tfidf')
+
+# Tokens are runs of ASCII letters and digits and non-ASCII letters. U+0080-U+00BF (lead
+# byte C2) and General Punctuation (E2 80, E2 81: curly quotes, dashes, ellipsis) separate
+# tokens like ASCII punctuation. ASCII and Latin-1 capitals are lowercased on the bytes
+_WORD_BYTES = bytes(range(ord('a'), ord('z') + 1)) + bytes(range(ord('0'), ord('9') + 1)) + bytes(range(0x80, 0x100))
+
+# Odd, so it is invertible modulo 2**32
+_HASH_BASE = 16777619
+
+
+def _byte_values():
+    """Each byte's value inside a token (lowercased for A-Z), 0 for separators"""
+    values = np.zeros(256, dtype=np.uint32)
+    values[np.frombuffer(_WORD_BYTES, dtype=np.uint8)] = np.frombuffer(_WORD_BYTES, dtype=np.uint8)
+    values[ord('A'):ord('Z') + 1] = np.arange(ord('a'), ord('z') + 1)
+    return values
+
+
+class HashedTermMatrix:
+    """
+    Builds sparse document-term matrices with `buckets` hashed term columns
+    Tokens shorter than two bytes or in `stopwords` are dropped. The first token seen in
+    each column is kept as the term's label; columns whose label has no letter (numbers)
+    are left out of `wordlike`, so rankings can skip them
+    """
+
+    def __init__(self, buckets=2 ** 18, stopwords=frozenset()):
+        self.buckets = buckets
+        self.wordlike = np.zeros(buckets, dtype=bool)
+        # Label of each column: a slice of one of the byte blobs copied out per chunk
+        self._labeled = np.zeros(buckets, dtype=bool)
+        self._label_blob = np.zeros(buckets, dtype=np.int32)
+        self._label_start = np.zeros(buckets, dtype=np.int64)
+        self._label_length = np.zeros(buckets, dtype=np.int32)
+        self._label_blobs = []
+        self._byte_values = _byte_values()
+        self._letter_bytes = np.zeros(256, dtype=bool)
+        self._letter_bytes[ord('a'):ord('z') + 1] = self._letter_bytes[ord('A'):ord('Z') + 1] = self._letter_bytes[0x80:] = True
+        self._powers = np.ones(1, dtype=np.uint32)
+        self._inverse_powers = np.ones(1, dtype=np.uint32)
+        self._stop_hashes = np.empty(0, dtype=np.uint32)
+        if stopwords:
+            hashes, _, _ = self._tokens(' '.join(sorted(stopwords)).encode('utf-8'))
+            self._stop_hashes = np.unique(hashes)
+
+    def _power_tables(self, size):
+        """base**i and base**-i modulo 2**32 for i < size, grown as longer chunks arrive"""
+        if len(self._powers) < size:
+            size = max(size, 2 * len(self._powers))
+            self._powers = np.full(size, _HASH_BASE, dtype=np.uint32)
+            self._powers[0] = 1
+            np.cumprod(self._powers, out=self._powers)
+            self._inverse_powers = np.full(size, pow(_HASH_BASE, -1, 2 ** 32), dtype=np.uint32)
+            self._inverse_powers[0] = 1
+            np.cumprod(self._inverse_powers, out=self._inverse_powers)
+        return self._powers, self._inverse_powers
+
+    def _tokens(self, data):
+        """(hash, start, length) arrays of the tokens of a UTF-8 byte string"""
+        codes = np.frombuffer(data, dtype=np.uint8)
+        values = self._byte_values[codes]
+        lead = np.flatnonzero(codes[:-1] == 0xC2)
+        values[lead] = values[lead + 1] = 0
+        lead = np.flatnonzero(codes[:-1] == 0xC3)
+        # Latin-1 capitals U+00C0-U+00DE are lowercased; U+00D7 and U+00F7 (x and ÷) separate
+        signs = lead[(codes[lead + 1] == 0x97) | (codes[lead + 1] == 0xB7)]
+        values[signs] = values[signs + 1] = 0
+        lead = lead[(codes[lead + 1] <= 0x9E) & (codes[lead + 1] != 0x97)]
+        values[lead + 1] += 0x20
+        lead = np.flatnonzero(codes[:-2] == 0xE2)
+        lead = lead[(codes[lead + 1] == 0x80) | (codes[lead + 1] == 0x81)]
+        values[lead] = values[lead + 1] = values[lead + 2] = 0
+
+        is_word = values.astype(bool)
+        starts = np.flatnonzero(is_word[1:] & ~is_word[:-1]) + 1
+        ends = np.flatnonzero(is_word[:-1] & ~is_word[1:]) + 1
+        if len(is_word) and is_word[0]:
+            starts = np.concatenate(([0], starts))
+        if len(is_word) and is_word[-1]:
+            ends = np.append(ends, len(is_word))
+        if not len(starts):
+            return np.empty(0, dtype=np.uint32), starts, ends - starts
+
+        # Polynomial hash: every word byte times base**position, summed per token (from its
+        # start up to the next token's, separators weigh zero), then shifted back by
+        # base**-start so equal tokens hash alike wherever they occur
+        powers, inverse_powers = self._power_tables(len(codes))
+        values *= powers[:len(codes)]
+        hashes = np.add.reduceat(values, starts, dtype=np.uint32) * inverse_powers[starts]
+        return hashes, starts, ends - starts
+
+    def document_term_matrix(self, texts):
+        """
+        CSR matrix of the texts as (indptr, columns, counts): row i holds the hashed term
+        columns of texts[i], ascending, with their occurrence counts
+        """
+        # Documents are joined with NUL bytes, which separate tokens like any other non-word byte
+        data = '\0'.join(text if isinstance(text, str) else '' for text in texts).encode('utf-8')
+        hashes, starts, lengths = self._tokens(data)
+        keep = lengths >= 2
+        if len(self._stop_hashes):
+            keep &= ~np.isin(hashes, self._stop_hashes)
+        hashes, starts, lengths = hashes[keep], starts[keep], lengths[keep]
+        documents = np.searchsorted(np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 0), starts)
+
+        # Finalizer of MurmurHash3 so every bit of the hash reaches the bucket number
+        hashes ^= hashes >> np.uint32(16)
+        hashes *= np.uint32(0x85EBCA6B)
+        hashes ^= hashes >> np.uint32(13)
+        hashes *= np.uint32(0xC2B2AE35)
+        hashes ^= hashes >> np.uint32(16)
+        columns = (hashes % np.uint32(self.buckets)).astype(np.int64)
+        self._remember_labels(np.frombuffer(data, dtype=np.uint8), columns, starts, lengths)
+
+        cells, counts = np.unique(documents * self.buckets + columns, return_counts=True)
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells // self.buckets, minlength=len(texts)), out=indptr[1:])
+        return indptr, cells % self.buckets, counts
+
+    def _remember_labels(self, codes, columns, starts, lengths):
+        """Copy out the bytes of the first token of every column not seen before"""
+        unlabeled = np.flatnonzero(~self._labeled[columns])
+        new_columns, first = np.unique(columns[unlabeled], return_index=True)
+        if not len(new_columns):
+            return
+        starts, lengths = starts[unlabeled[first]], lengths[unlabeled[first]]
+        offsets = np.cumsum(lengths) - lengths
+        label_bytes = codes[np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))]
+
+        self._labeled[new_columns] = True
+        self.wordlike[new_columns] = np.logical_or.reduceat(self._letter_bytes[label_bytes], offsets)
+        self._label_blob[new_columns] = len(self._label_blobs)
+        self._label_start[new_columns] = offsets
+        self._label_length[new_columns] = lengths
+        self._label_blobs.append(label_bytes.tobytes())
+
+    def label(self, column):
+        """The term remembered for a column, lowercased"""
+        if not self._labeled[column]:
+            return ''
+        start = int(self._label_start[column])
+        blob = self._label_blobs[self._label_blob[column]]
+        return blob[start:start + int(self._label_length[column])].decode('utf-8', 'replace').lower()
+
+
+def distinctive_terms(texts, groupings, stopwords=frozenset(), method='log_odds', top_n=10, min_count=3,
+                      max_groups=50, buckets=2 ** 18, chunk_size=50000, prior_weight=None):
+    """
+    Top `top_n` terms of each group of each grouping, from one pass over the texts
+    `groupings` maps a name to each text's group (a sequence or pandas Series). The
+    `max_groups` most frequent groups of a grouping are ranked; the others, and texts
+    without a group, only count as the background. A term must occur `min_count` times
+    in a group to be ranked for it
+    Returns {name: {group: [{'term', 'score', 'count', 'share'}]}} and the matrix's size
+    """
+    if method not in METHODS:
+        raise ValueError(f'Unknown term method {method!r}, expected one of {", ".join(METHODS)}')
+
+    matrix = HashedTermMatrix(buckets, stopwords)
+    factorized = {name: _factorize(groups, max_groups) for name, groups in groupings.items()}
+    # Dense (group, column) counts, with a last row for everything outside the ranked groups
+    group_counts = {name: np.zeros((len(names) + 1) * buckets, dtype=np.int64) for name, (_, names) in factorized.items()}
+    term_documents = np.zeros(buckets, dtype=np.int64)
+    documents = tokens = 0
+    for start in range(0, len(texts), chunk_size):
+        chunk = texts[start:start + chunk_size]
+        indptr, columns, counts = matrix.document_term_matrix(chunk)
+        rows = np.repeat(np.arange(len(chunk)), np.diff(indptr))
+        documents += len(chunk)
+        tokens += int(counts.sum())
+        term_documents += np.bincount(columns, minlength=buckets)
+        for name, (codes, _) in factorized.items():
+            np.add.at(group_counts[name], codes[start:start + len(chunk)][rows] * buckets + columns, counts)
+
+    result = {}
+    for name, (_, names) in factorized.items():
+        counts = group_counts[name].reshape(len(names) + 1, buckets)
+        result[name] = _rank_terms(counts, names, term_documents, documents, matrix, method, top_n, min_count, prior_weight)
+
+    result.update({
+        'method': method,
+        'documents': documents,
+        'tokens': tokens,
+        'hashed_columns': buckets,
+        'distinct_columns': int(np.count_nonzero(term_documents))
+    })
+    return result
+
+
+def _rank_terms(counts, names, term_documents, documents, matrix, method, top_n, min_count, prior_weight):
+    """Score the eligible (group, column) cells of one grouping and keep each group's best"""
+    term_totals = counts.sum(axis=0).astype(np.float64)
+    group_totals = counts.sum(axis=1).astype(np.float64)
+    total = float(term_totals.sum())
+    groups, columns = np.nonzero((counts[:-1] >= min_count) & matrix.wordlike)
+    values = counts[groups, columns].astype(np.float64)
+
+    if method == 'log_odds':
+        # Informative Dirichlet prior: pseudo-counts in proportion to each term's overall frequency
+        prior_total = float(prior_weight or min(total, 10000.0)) or 1.0
+        prior = prior_total * term_totals[columns] / (total or 1.0)
+        rest = term_totals[columns] - values
+        rest_size = total - group_totals[groups]
+        delta = (np.log((values + prior) / (group_totals[groups] + prior_total - values - prior))
+                 - np.log((rest + prior) / np.maximum(rest_size + prior_total - rest - prior, 1e-9)))
+        scores = delta / np.sqrt(1.0 / (values + prior) + 1.0 / (rest + prior))
+    else:
+        idf = np.log((1 + documents) / (1 + term_documents[columns])) + 1
+        scores = values / group_totals[groups] * idf
+
+    # Cells sorted by group, then score and count; the first top_n of each group's run are kept
+    order = np.lexsort((-values, -scores, groups))
+    run_starts = np.flatnonzero(np.diff(groups[order], prepend=-1) != 0)
+    ranks = np.arange(len(order)) - np.repeat(run_starts, np.diff(run_starts, append=len(order)))
+    ranked = {}
+    for position in order[ranks < top_n].tolist():
+        ranked.setdefault(names[groups[position]], []).append({
+            'term': matrix.label(int(columns[position])),
+            'score': round(float(scores[position]), 3),
+            'count': int(values[position]),
+            'share': round(float(values[position] / group_totals[groups[position]]), 4)
+        })
+    return ranked
+
+
+def _factorize(groups, max_groups):
+    """(int64 codes, names) of the `max_groups` most frequent groups; every other text gets code len(names)"""
+    series = groups if isinstance(groups, pd.Series) else pd.Series(list(groups))
+    frequencies = series.value_counts()
+    # Ties are broken by name so categoricals and plain values pick the same groups
+    ranked = sorted(frequencies[frequencies > 0].items(), key=lambda item: (-item[1], str(item[0])))
+    names = [name for name, _ in ranked[:max_groups]]
+    # Looked up by value: a categorical's own codes run over all of its categories
+    codes = pd.Index(names).get_indexer(series).astype(np.int64)
+    codes[codes < 0] = len(names)
+    return codes, [str(name) for name in names]
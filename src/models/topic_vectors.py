@@ -0,0 +1,282 @@
+"""
+Semantic topic relevance for business types
+Reviews and the business-type topic lists are embedded with a hashed character n-gram
+model (offline, nothing to train or download) and compared by cosine similarity. Every
+type's relevant and irrelevant centroids live in one matrix. An embedding is a sum of
+word vectors, so each word's projection onto all centroids is computed once and a
+review's similarities are the sum of its words' projections over its norm
+"""
+
+import itertools
+import threading
+import zlib
+
+from src.utils.startup import lazy_import
+
+np = lazy_import('numpy')
+
+# Stripped from both ends of whitespace-separated tokens
+_PUNCTUATION = '.,;:!?()[]{}"\'`*/\\|<>#$%&+=~^@_-–—…“”‘’'
+
+
+class HashedNgramEmbedder:
+    """
+    Bag of word and character n-gram features hashed into a fixed number of dimensions
+    Character n-grams of '<word>' let inflections share features ('deliver', 'delivery',
+    'delivered'); a hash bit picks each feature's sign so collisions tend to cancel out
+    """
+
+    def __init__(self, dimensions=2048, ngram_sizes=(3, 4), word_weight=1.0, max_cached_words=50000):
+        self.dimensions = dimensions
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.word_weight = word_weight
+        self.max_cached_words = max_cached_words
+        self._word_features = {}
+        self._lock = threading.Lock()
+
+    def _features(self, word):
+        """(indices, signed weights) for one word, memoized because word frequencies are Zipfian"""
+        features = self._word_features.get(word)
+        if features is not None:
+            return features
+
+        grams = [f'w:{word}']
+        padded = f'<{word}>'
+        for size in self.ngram_sizes:
+            grams.extend(padded[i:i + size] for i in range(len(padded) - size + 1))
+        hashes = [zlib.crc32(gram.encode('utf-8')) for gram in grams]
+        # The word itself counts as much as all of its n-grams together
+        gram_weight = 1.0 / max(1, len(grams) - 1)
+        features = (
+            [h % self.dimensions for h in hashes],
+            [(self.word_weight if i == 0 else gram_weight) * (1.0 if h & 0x80000000 else -1.0) for i, h in enumerate(hashes)]
+        )
+
+        with self._lock:
+            if len(self._word_features) >= self.max_cached_words:
+                self._word_features.clear()
+            self._word_features[word] = features
+        return features
+
+    def _tokens(self, texts, stopwords):
+        """
+        (token count of each text, vocabulary code of every token, cleaned word of every
+        vocabulary entry), so features are looked up once per distinct token; stopwords,
+        numbers and single letters stay in the vocabulary as None and carry no features
+        """
+        token_lists = [str(text).lower().split() for text in texts]
+        all_tokens = list(itertools.chain.from_iterable(token_lists))
+        vocabulary = {token: code for code, token in enumerate(dict.fromkeys(all_tokens))}
+        codes = np.fromiter(map(vocabulary.__getitem__, all_tokens), dtype=np.int64, count=len(all_tokens))
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        return lengths, codes, [_clean_word(token, stopwords) for token in vocabulary]
+
+    def _cells(self, lengths, codes, words):
+        """(text * dimensions + dimension, signed weight) of every feature of every token"""
+        feature_indices, feature_weights, feature_counts = [], [], []
+        for word in words:
+            if word is None:
+                feature_counts.append(0)
+                continue
+            indices, weights = self._features(word)
+            feature_indices.extend(indices)
+            feature_weights.extend(weights)
+            feature_counts.append(len(indices))
+
+        feature_counts = np.asarray(feature_counts, dtype=np.int64)
+        word_starts = np.cumsum(feature_counts) - feature_counts
+        token_docs = np.repeat(np.arange(len(lengths)), lengths)
+
+        counts = feature_counts[codes]
+        positions = np.repeat(word_starts[codes] - (np.cumsum(counts) - counts), counts) + np.arange(int(counts.sum()))
+        cells = np.repeat(token_docs, counts) * self.dimensions + np.asarray(feature_indices, dtype=np.int64)[positions]
+        return cells, np.asarray(feature_weights)[positions]
+
+    def embed(self, texts, stopwords=frozenset()):
+        """L2-normalized float32 matrix of shape (len(texts), dimensions); empty texts give zero rows"""
+        lengths, codes, words = self._tokens(texts, stopwords)
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if len(codes):
+            cells, weights = self._cells(lengths, codes, words)
+            matrix += np.bincount(cells, weights=weights, minlength=matrix.size).reshape(matrix.shape).astype(np.float32)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def norms(self, lengths, codes, words):
+        """L2 norm of each text's unnormalized embedding, from `_tokens` output"""
+        if not len(codes):
+            return np.zeros(len(lengths))
+        cells, weights = self._cells(lengths, codes, words)
+        sums = np.bincount(cells, weights=weights, minlength=len(lengths) * self.dimensions)
+        return np.sqrt(np.einsum('ij,ij->i', *(sums.reshape(len(lengths), self.dimensions),) * 2))
+
+    def embed_sparse(self, text, stopwords=frozenset()):
+        """
+        One text as the (indices, values) of its non-zero dimensions, L2-normalized
+        Same vector as embed([text])[0], without a dense row's NumPy overhead
+        """
+        weights_by_index = {}
+        for token in str(text).lower().split():
+            word = _clean_word(token, stopwords)
+            if word is None:
+                continue
+            for index, weight in zip(*self._features(word)):
+                weights_by_index[index] = weights_by_index.get(index, 0.0) + weight
+
+        indices = np.fromiter(weights_by_index.keys(), dtype=np.int64, count=len(weights_by_index))
+        values = np.fromiter(weights_by_index.values(), dtype=np.float32, count=len(weights_by_index))
+        norm = float(np.sqrt(values @ values)) if len(values) else 0.0
+        if norm > 0:
+            values /= norm
+        return indices, values
+
+
+def _clean_word(token, stopwords):
+    """Token without surrounding punctuation, or None for stopwords, numbers and single letters"""
+    word = token.strip(_PUNCTUATION)
+    if len(word) < 2 or word in stopwords or not any(char.isalpha() for char in word):
+        return None
+    return word
+
+
+class TopicIndex:
+    """
+    Relevant and irrelevant topic centroids for every business type of a rule pack
+    A review is off-topic for its business type when it is clearly closer to that type's
+    irrelevant topics, or to another business type, than to the type's own topics
+    """
+
+    def __init__(self, business_types, embedder=None, stopwords=frozenset(), margin=0.1, min_similarity=0.15,
+                 chunk_size=1024, max_cached_words=50000):
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.max_cached_words = max_cached_words
+        self._word_projections = {}
+        self._lock = threading.Lock()
+        self.chunk_size = chunk_size
+        self.stopwords = stopwords
+        self.margin = margin
+        self.min_similarity = min_similarity
+        self.types = list(business_types)
+        self._positions = {name: i for i, name in enumerate(self.types)}
+
+        # Every topic phrase embedded once; centroids are the normalized mean of their phrases
+        self._topics = {}
+        relevant, irrelevant = [], []
+        for name in self.types:
+            for kind, centroids in (('relevant', relevant), ('irrelevant', irrelevant)):
+                phrases = list(business_types[name][kind])
+                vectors = self.embedder.embed(phrases) if phrases else np.zeros((0, self.embedder.dimensions), dtype=np.float32)
+                self._topics[name, kind] = (phrases, vectors)
+                centroids.append(vectors.sum(axis=0) if len(vectors) else np.zeros(self.embedder.dimensions, dtype=np.float32))
+
+        # Rows 0..T-1: relevant centroids, rows T..2T-1: irrelevant centroids
+        self.centroids = np.vstack(relevant + irrelevant).astype(np.float32)
+        norms = np.linalg.norm(self.centroids, axis=1, keepdims=True)
+        np.divide(self.centroids, norms, out=self.centroids, where=norms > 0)
+        # Dimension-major copy for projecting a word's few non-zero dimensions
+        self._centroids_by_dimension = np.ascontiguousarray(self.centroids.T)
+        self._no_projection = np.zeros(len(self.centroids), dtype=np.float32)
+
+    def _projections(self, words):
+        """(len(words), centroids) matrix of each word's vector projected onto every centroid"""
+        projections = []
+        cache = self._word_projections
+        for word in words:
+            if word is None:
+                projections.append(self._no_projection)
+                continue
+            projection = cache.get(word)
+            if projection is None:
+                indices, weights = self.embedder._features(word)
+                projection = np.asarray(weights, dtype=np.float32) @ self._centroids_by_dimension[indices]
+                with self._lock:
+                    if len(cache) >= self.max_cached_words:
+                        cache.clear()
+                    cache[word] = projection
+            projections.append(projection)
+        return np.array(projections, dtype=np.float32).reshape(len(words), len(self.centroids))
+
+    def similarities(self, texts):
+        """
+        Cosine similarity of each text to every centroid, shape (len(texts), centroids)
+        Equal to embed(texts) @ centroids.T without building the dense embeddings
+        """
+        lengths, codes, words = self.embedder._tokens(texts, self.stopwords)
+        norms = self.embedder.norms(lengths, codes, words)
+        totals = np.zeros((len(texts), len(self.centroids)))
+        nonempty = lengths > 0
+        if nonempty.any():
+            starts = (np.cumsum(lengths) - lengths)[nonempty]
+            totals[nonempty] = np.add.reduceat(self._projections(words)[codes], starts, axis=0)
+        return np.divide(totals, norms[:, None], out=np.zeros_like(totals), where=norms[:, None] > 0)
+
+    def score(self, business_types, texts, explain_limit=3):
+        """
+        Score each text against its business type (None or unknown types are skipped)
+        Returns: list of dicts (or None) with relevance, irrelevance, closest_type,
+        closest_similarity, off_topic and, for off-topic texts, the nearest irrelevant topics
+        """
+        known = [i for i, name in enumerate(business_types) if name in self._positions]
+        results = [None] * len(texts)
+        type_count = len(self.types)
+
+        # A chunk at a time to bound the memory of the token arrays; a lone review (the
+        # single-review API) is scored from its sparse vector, which has less NumPy overhead
+        for start in range(0, len(known), self.chunk_size):
+            rows = known[start:start + self.chunk_size]
+            if len(rows) == 1:
+                indices, values = self.embedder.embed_sparse(texts[rows[0]], self.stopwords)
+                scores = (values @ self._centroids_by_dimension[indices]).tolist()
+                position = self._positions[business_types[rows[0]]]
+                closest = max(range(type_count), key=scores.__getitem__)
+                columns = ([scores[position]], [scores[type_count + position]], [closest], [scores[closest]])
+            else:
+                similarities = self.similarities([texts[i] for i in rows])
+                positions = np.fromiter((self._positions[business_types[i]] for i in rows), dtype=np.int64, count=len(rows))
+                row_numbers = np.arange(len(rows))
+                closest = similarities[:, :type_count].argmax(axis=1)
+                columns = (
+                    similarities[row_numbers, positions].tolist(),
+                    similarities[row_numbers, type_count + positions].tolist(),
+                    closest.tolist(),
+                    similarities[row_numbers, closest].tolist()
+                )
+
+            explained = []
+            for i, relevance, irrelevance, closest, closest_similarity in zip(rows, *columns):
+                off_topic = (
+                    (irrelevance >= self.min_similarity and irrelevance - relevance >= self.margin)
+                    or (closest != self._positions[business_types[i]] and closest_similarity >= self.min_similarity
+                        and closest_similarity - relevance >= self.margin)
+                )
+                results[i] = {
+                    'relevance': round(relevance, 4),
+                    'irrelevance': round(irrelevance, 4),
+                    'closest_type': self.types[closest],
+                    'closest_similarity': round(closest_similarity, 4),
+                    'off_topic': bool(off_topic)
+                }
+                if off_topic:
+                    explained.append(i)
+
+            # Only off-topic reviews are explained, so only they are embedded
+            if not explained:
+                continue
+            if len(rows) == 1:
+                project = lambda topic_vectors, i: topic_vectors[:, indices] @ values
+            else:
+                vectors = dict(zip(explained, self.embedder.embed([texts[i] for i in explained], self.stopwords)))
+                project = lambda topic_vectors, i: topic_vectors @ vectors[i]
+            for i in explained:
+                phrases, topic_vectors = self._topics[business_types[i], 'irrelevant']
+                results[i]['nearest_irrelevant_topics'] = (
+                    self._nearest_topics(phrases, project(topic_vectors, i), explain_limit) if phrases else []
+                )
+        return results
+
+    def _nearest_topics(self, phrases, scores, limit):
+        """The topic phrases the review is clearly similar to, most similar first"""
+        order = np.argsort(-scores)[:limit]
+        return [phrases[i] for i in order if scores[i] >= self.min_similarity]
@@ -0,0 +1,118 @@
+from flask import Blueprint, request, jsonify, g, send_file, Response
+from src.utils.admission import get_admission_controller
+from src.utils.profiling import ARTIFACTS, get_request_profiler, parse_modes
+
+admin_bp = Blueprint('admin', __name__)
+
+# Artifacts are served with these types; pstats and tracemalloc dumps are binary
+ARTIFACT_MIMETYPES = {
+    'pstats': 'application/octet-stream',
+    'collapsed': 'text/plain',
+    'tracemalloc': 'application/octet-stream'
+}
+
+@admin_bp.before_app_request
+def start_request_profile():
+    """Profile this request if it asks for it (X-Profile header or ?profile=) or is sampled"""
+    if not request.path.startswith('/api/') or request.path.startswith('/api/admin/'):
+        return None
+    try:
+        modes = parse_modes(request.headers.get('X-Profile') or request.args.get('profile'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    g.profile_session = get_request_profiler().begin(modes, request.headers.get('X-Admin-Token'), request.remote_addr)
+    return None
+
+@admin_bp.after_app_request
+def finish_request_profile(response):
+    """Store the profile and tell the caller where to fetch it"""
+    session = g.pop('profile_session', None)
+    if session is not None:
+        # Streamed responses are produced after this point, so only their setup is profiled
+        metadata = session.finish({
+            'method': request.method,
+            'path': request.path,
+            'query': request.query_string.decode('utf-8', 'replace'),
+            'status': response.status_code,
+            'streamed': response.is_streamed
+        })
+        response.headers['X-Profile-Id'] = metadata['id']
+    return response
+
+@admin_bp.teardown_app_request
+def abandon_request_profile(error=None):
+    """Requests that failed before a response was built still store what was captured"""
+    session = g.pop('profile_session', None)
+    if session is not None:
+        session.finish({
+            'method': request.method,
+            'path': request.path,
+            'status': 500,
+            'error': f'{type(error).__name__}: {error}' if error else None
+        })
+
+def _authorized():
+    return get_request_profiler().authorized(request.headers.get('X-Admin-Token'), request.remote_addr)
+
+@admin_bp.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Stored profiles, newest first, and the profiler settings"""
+    if not _authorized():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    profiler = get_request_profiler()
+    return jsonify({'profiler': profiler.status(), 'profiles': profiler.list()})
+
+@admin_bp.route('/admin/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """One profile's metadata: top functions by cumulative time and top allocations"""
+    if not _authorized():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    metadata = get_request_profiler().get(profile_id)
+    if metadata is None:
+        return jsonify({'error': f'Profile not found: {profile_id}'}), 404
+    return jsonify(metadata)
+
+@admin_bp.route('/admin/profiles/<profile_id>/<artifact>', methods=['GET'])
+def download_profile_artifact(profile_id, artifact):
+    """A profile as pstats, collapsed stacks (flamegraph.pl, speedscope) or a tracemalloc snapshot"""
+    if not _authorized():
+        return jsonify({'error': 'Admin token required'}), 403
+    if artifact not in ARTIFACTS:
+        return jsonify({'error': f'Unknown artifact {artifact!r}, expected one of {", ".join(ARTIFACTS)}'}), 400
+    
+    path = get_request_profiler().artifact_path(profile_id, artifact)
+    if path is None:
+        return jsonify({'error': f'Profile {profile_id} has no {artifact} artifact'}), 404
+    return send_file(path, mimetype=ARTIFACT_MIMETYPES[artifact], as_attachment=True,
+                     download_name=f'{profile_id}{ARTIFACTS[artifact]}')
+
+@admin_bp.route('/admin/profiles/<profile_id>', methods=['DELETE'])
+def delete_profile(profile_id):
+    if not _authorized():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    profiler = get_request_profiler()
+    if profiler.get(profile_id) is None:
+        return jsonify({'error': f'Profile not found: {profile_id}'}), 404
+    profiler.delete(profile_id)
+    return '', 204
+
+@admin_bp.route('/admin/admission', methods=['GET'])
+def admission_status():
+    """Running jobs, queue depth and rejection counts of the heavy and fast lanes"""
+    if not _authorized():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    return jsonify(get_admission_controller().stats())
+
+@admin_bp.route('/admin/metrics', methods=['GET'])
+def admission_metrics():
+    """Admission metrics in Prometheus text format"""
+    if not _authorized():
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    return Response(get_admission_controller().prometheus(), mimetype='text/plain; version=0.0.4')
+
@@ -1,9 +1,43 @@
 from flask import Blueprint, request, jsonify
-import pandas as pd
-import json
 import io
+import os
+import threading
 from datetime import datetime
 import re
+from src.models.author_index import AuthorIndex, get_author_index
+from src.models.business_context import BusinessContext
+from src.models.dashboard_preview import EXACT_ONLY_SECTIONS, estimate_dashboard, sample_csv
+from src.models.dataset_store import DatasetStore
+from src.models.languages import extract_language_texts
+from src.models.near_duplicates import NearDuplicateDetector, summarize_clusters
+from src.models.review_store import get_review_store
+from src.models.review_search import ReviewSearchIndex
+from src.models.review_trends import ReviewTrendAnalyzer
+from src.models.rule_packs import get_rule_registry
+from src.models.term_stats import distinctive_terms
+from src.utils.admission import admitted, hand_off_admission
+from src.utils.background_jobs import get_background_jobs
+from src.utils.frames import fill_missing
+from src.utils.result_cache import get_result_cache
+from src.utils.serialization import ndjson_response, wants_ndjson
+from src.utils.startup import lazy_import
+
+# pandas is only imported when the first CSV is processed
+pd = lazy_import('pandas')
+
+# Low-cardinality columns are loaded dictionary-encoded so grouping and counting work on
+# integer codes instead of re-hashing strings. Ratings stay float64: float32 means and
+# sums don't round back to the two-decimal figures the dashboard reports
+DASHBOARD_DTYPES = {
+    'company': 'category',
+    'author': 'category',
+    'classification': 'category',
+    'model_used': 'category',
+    'rating': 'float64'
+}
+
+# Columns the cross-upload author index reads
+AUTHOR_COLUMNS = ('author', 'rating', 'classification', 'company', 'legitimacy_score')
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -11,34 +45,37 @@ class CSVDashboardAnalyzer:
     """Analyzer for CSV data to create dashboard insights"""
     
     def __init__(self):
-        pass
+        self.near_duplicate_detector = NearDuplicateDetector()
+        # Shared across uploads so author behavior accumulates instead of being rebuilt per file
+        self.author_index = get_author_index()
+        # Full-text index of the uploads held in the dataset store
+        self.search_index = ReviewSearchIndex()
+        # Processed uploads kept for paginated browsing via their dataset id; evicted
+        # datasets are dropped from the search index too
+        self.dataset_store = DatasetStore(on_evict=self.search_index.remove_datasets)
+        # Daily/weekly series and burst flags when the upload has a date column
+        self.trend_analyzer = ReviewTrendAnalyzer()
+        # Resolves company names to business types through the aliases and name catalog
+        self.business_context = BusinessContext()
+        # Stopwords for the distinctive terms come from the active rule pack
+        self.rule_registry = get_rule_registry()
+        # Ranking of distinctive terms per company and classification: log_odds or tfidf
+        self.term_method = os.environ.get('REVIEW_TERMS_METHOD', 'log_odds')
+        # Rows sampled for the progressive mode's preview dashboard
+        self.preview_sample_size = int(os.environ.get('REVIEW_PREVIEW_SAMPLE_SIZE', 5000))
+        # Larger uploads are sampled at random offsets instead of being read through once
+        self.preview_scan_limit = int(float(os.environ.get('REVIEW_PREVIEW_SCAN_MB', 64)) * 1024 * 1024)
     
     def clean_review_text(self, text):
-        """Clean and extract review text from JSON-like format"""
-        if pd.isna(text):
-            return ""
-        
-        text = str(text)
-        
-        # Try to parse as JSON if it looks like JSON
-        if text.startswith("{'en':") or text.startswith('{"en":'):
-            try:
-                # Fix common JSON formatting issues
-                text = text.replace("'", '"')
-                data = json.loads(text)
-                if 'en' in data:
-                    return data['en']
-            except:
-                pass
-        
-        # If not JSON, return as is
-        return text
+        """Clean and extract review text from JSON-like format (the first language variant)"""
+        variants = extract_language_texts(text)
+        return next(iter(variants.values()), '')
     
     def analyze_csv_data(self, csv_content):
         """Analyze CSV data and create dashboard insights"""
         try:
             # Read CSV data
-            df = pd.read_csv(io.StringIO(csv_content))
+            df = self.load_dataframe(csv_content)
             
             # Basic data validation
             if df.empty:
@@ -50,18 +87,7 @@ class CSVDashboardAnalyzer:
             # Clean and process the data
             processed_data = self.process_dataframe(df)
             
-            # Generate dashboard insights
-            dashboard_data = self.generate_dashboard_insights(processed_data)
-            
-            return {
-                'success': True,
-                'dashboard': dashboard_data,
-                'metadata': {
-                    'total_reviews': len(processed_data),
-                    'processed_at': datetime.now().isoformat(),
-                    'columns_found': list(df.columns)
-                }
-            }
+            return self._build_dashboard_result(processed_data, list(df.columns), csv_content)
             
         except Exception as e:
             return {
@@ -69,25 +95,139 @@ class CSVDashboardAnalyzer:
                 'error': f'Error processing CSV: {str(e)}'
             }
     
+    def _build_dashboard_result(self, processed_data, columns_found, csv_content):
+        """Generate insights for processed data and register it for browsing and search"""
+        dashboard_data = self.generate_dashboard_insights(processed_data, AuthorIndex.fingerprint(csv_content))
+        
+        dataset_id = self.dataset_store.add(processed_data)
+        indexed_reviews = self.search_index.add_dataset(dataset_id, processed_data)
+        
+        return {
+            'success': True,
+            'phase': 'exact',
+            'dashboard': dashboard_data,
+            'dataset_id': dataset_id,
+            'metadata': {
+                'total_reviews': len(processed_data),
+                'processed_at': datetime.now().isoformat(),
+                'search_indexed_reviews': indexed_reviews,
+                'columns_found': columns_found
+            }
+        }
+    
+    def preview_csv_data(self, csv_content, sample_size=None, seed=0):
+        """
+        Approximate dashboard from a uniform sample of the upload, in the exact dashboard's
+        schema plus 95% error bars under 'estimates'. Uploads up to REVIEW_PREVIEW_SCAN_MB are read
+        through once; larger ones are sampled at random offsets, so the preview time stays flat
+        Returns None when the upload is no larger than the sample, so the exact dashboard is as cheap
+        """
+        sample_size = sample_size or self.preview_sample_size
+        upload_sample = sample_csv(csv_content, sample_size, seed, scan_limit=self.preview_scan_limit)
+        if upload_sample.rows <= sample_size:
+            return None
+        
+        df = self.load_dataframe(upload_sample.text)
+        sample = self.process_dataframe(df)
+        dashboard_data, error_bars = estimate_dashboard(self, sample, upload_sample.rows)
+        if upload_sample.rows_interval is not None:
+            low, high = upload_sample.rows_interval
+            error_bars['overall_stats']['total_reviews'] = {'low': low, 'high': high}
+        
+        return {
+            'success': True,
+            'phase': 'preview',
+            'dashboard': dashboard_data,
+            'dataset_id': None,
+            'estimates': {
+                'sample_size': len(sample),
+                'population': upload_sample.rows,
+                'population_exact': upload_sample.rows_interval is None,
+                'confidence': 0.95,
+                'error_bars': error_bars,
+                'pending_sections': list(EXACT_ONLY_SECTIONS)
+            },
+            'metadata': {
+                'total_reviews': upload_sample.rows,
+                'processed_at': datetime.now().isoformat(),
+                'search_indexed_reviews': 0,
+                'columns_found': list(df.columns)
+            }
+        }
+    
+    def refresh_cached_result(self, result, csv_content):
+        """
+        Bring a cached dashboard's cross-upload state up to date in this process: the upload is
+        merged into the author index (a no-op if it already is) and its authors section re-ranked,
+        and its dataset is re-registered for browsing and search if this process no longer holds it
+        """
+        dataset_id = result.get('dataset_id')
+        restore = bool(dataset_id) and self.dataset_store.get(dataset_id) is None
+        rank_authors = 'authors' in result['dashboard']
+        if not restore and not rank_authors:
+            return result
+        
+        # Author ranking only needs the author columns, so review text is parsed only to restore
+        columns = None if restore else AUTHOR_COLUMNS
+        processed_data = self.process_dataframe(self.load_dataframe(csv_content, columns))
+        if rank_authors:
+            result['dashboard']['authors'] = self.analyze_authors(processed_data, AuthorIndex.fingerprint(csv_content))
+        if restore:
+            self.dataset_store.add(processed_data, dataset_id=dataset_id)
+            result['metadata']['search_indexed_reviews'] = self.search_index.add_dataset(dataset_id, processed_data)
+        return result
+    
+    def stream_csv_data(self, csv_content, chunk_size=10000):
+        """
+        Generate the dashboard as NDJSON-ready records: one 'review' record per processed
+        row as soon as the upload is parsed, then a final 'dashboard' record with the insights
+        """
+        df = self.load_dataframe(csv_content)
+        if df.empty:
+            yield {'type': 'error', 'success': False, 'error': 'CSV file is empty'}
+            return
+        
+        processed_data = self.process_dataframe(df)
+        columns = [c for c in ('review_id', 'author', 'company', 'rating', 'classification', 'cleaned_review_text') if c in processed_data.columns]
+        for start in range(0, len(processed_data), chunk_size):
+            chunk = processed_data[columns].iloc[start:start + chunk_size]
+            for position, row in enumerate(chunk.to_dict('records'), start=start):
+                yield {'type': 'review', 'position': position, **row}
+        
+        yield {'type': 'dashboard', **self._build_dashboard_result(processed_data, list(df.columns), csv_content)}
+    
+    def load_dataframe(self, csv_content, columns=None):
+        """Read uploaded CSV with compact dtypes for the columns the dashboard aggregates"""
+        usecols = (lambda column: column in columns) if columns is not None else None
+        try:
+            return pd.read_csv(io.StringIO(csv_content), dtype=DASHBOARD_DTYPES, usecols=usecols)
+        except ValueError:
+            # Non-numeric ratings: let process_dataframe coerce them
+            dtypes = {k: v for k, v in DASHBOARD_DTYPES.items() if k != 'rating'}
+            return pd.read_csv(io.StringIO(csv_content), dtype=dtypes, usecols=usecols)
+    
     def process_dataframe(self, df):
         """Process and clean the dataframe"""
         processed_df = df.copy()
         
-        # Clean review text if it exists
+        # Clean review text if it exists: every language variant is parsed once, the first
+        # becomes the review text and the variant languages are kept for per-language stats
         if 'review_text' in processed_df.columns:
-            processed_df['cleaned_review_text'] = processed_df['review_text'].apply(self.clean_review_text)
+            variants = [extract_language_texts(value) for value in processed_df['review_text'].tolist()]
+            processed_df['cleaned_review_text'] = [next(iter(v.values()), '') for v in variants]
+            processed_df['review_languages'] = pd.Categorical([','.join(v) for v in variants])
         
         # Convert rating to numeric if it exists
         if 'rating' in processed_df.columns:
-            processed_df['rating'] = pd.to_numeric(processed_df['rating'], errors='coerce')
+            processed_df['rating'] = pd.to_numeric(processed_df['rating'], errors='coerce').astype('float64')
         
         # Clean company names
         if 'company' in processed_df.columns:
-            processed_df['company'] = processed_df['company'].fillna('Unknown Company')
+            processed_df['company'] = fill_missing(processed_df['company'], 'Unknown Company')
         
         return processed_df
     
-    def generate_dashboard_insights(self, df):
+    def generate_dashboard_insights(self, df, fingerprint=None):
         """Generate comprehensive dashboard insights"""
         insights = {}
         
@@ -110,13 +250,32 @@ class CSVDashboardAnalyzer:
         if 'cleaned_review_text' in df.columns:
             review_stats = self.analyze_reviews(df)
             insights['reviews'] = review_stats
+            
+            # Per-language statistics
+            if 'review_languages' in df.columns:
+                insights['languages'] = self.analyze_languages(df)
+            
+            # Near-duplicate / review-ring detection
+            insights['near_duplicates'] = self.analyze_near_duplicates(df)
+            
+            # Distinctive terms per company and classification
+            insights['terms'] = self.analyze_terms(df)
+        
+        # Author Analysis
+        if 'author' in df.columns:
+            insights['authors'] = self.analyze_authors(df, fingerprint)
+        
+        # Time-series trends and review bursts (only when a date column is present)
+        trends = self.trend_analyzer.analyze(df)
+        if trends is not None:
+            insights['trends'] = trends
         
         # Sample Reviews
         sample_reviews = self.get_sample_reviews(df)
         insights['sample_reviews'] = sample_reviews
         
         # Overall Statistics
-        insights['overall_stats'] = self.get_overall_stats(df)
+        insights['overall_stats'] = self.get_overall_stats(df, trends['date_range'] if trends else None)
         
         return insights
     
@@ -126,19 +285,41 @@ class CSVDashboardAnalyzer:
         
         # Company distribution
         company_counts = df['company'].value_counts()
+        company_counts = company_counts[company_counts > 0]  # categoricals also count unused categories
         company_analysis['distribution'] = company_counts.head(10).to_dict()
         
         # Average ratings by company
         if 'rating' in df.columns:
-            avg_ratings = df.groupby('company')['rating'].agg(['mean', 'count']).round(2)
+            avg_ratings = df.groupby('company', observed=True)['rating'].agg(['mean', 'count']).round(2)
             avg_ratings = avg_ratings[avg_ratings['count'] >= 2]  # Only companies with 2+ reviews
             company_analysis['average_ratings'] = avg_ratings.to_dict('index')
         
         # Top companies by review count
         company_analysis['top_companies'] = company_counts.head(5).to_dict()
         
+        # Business type of every distinct company, resolved in one batch
+        business_types = self.business_context.resolve_business_types(str(company) for company in company_counts.index)
+        company_analysis['business_types'] = {
+            company: business_types.get(str(company)) for company in company_counts.head(10).index
+        }
+        type_counts = {}
+        for company, count in company_counts.items():
+            business_type = business_types.get(str(company)) or 'unknown'
+            type_counts[business_type] = type_counts.get(business_type, 0) + int(count)
+        company_analysis['business_type_distribution'] = type_counts
+        
         return company_analysis
     
+    def analyze_authors(self, df, fingerprint=None):
+        """Merge this upload into the author index and rank its riskiest authors"""
+        self.author_index.ingest(df, fingerprint)
+        
+        return {
+            'indexed_authors': len(self.author_index),
+            'uploads_indexed': self.author_index.uploads_indexed,
+            'top_risk_authors': self.author_index.top_risk_authors(authors=df['author'].dropna().unique())
+        }
+    
     def analyze_ratings(self, df):
         """Analyze rating distribution and statistics"""
         rating_analysis = {}
@@ -176,6 +357,7 @@ class CSVDashboardAnalyzer:
         
         # Classification distribution
         class_counts = df['classification'].value_counts()
+        class_counts = class_counts[class_counts > 0]
         classification_analysis['distribution'] = class_counts.to_dict()
         
         # Classification percentages
@@ -187,7 +369,7 @@ class CSVDashboardAnalyzer:
         
         # Classification by rating
         if 'rating' in df.columns:
-            class_rating = df.groupby('classification')['rating'].agg(['mean', 'count']).round(2)
+            class_rating = df.groupby('classification', observed=True)['rating'].agg(['mean', 'count']).round(2)
             classification_analysis['by_rating'] = class_rating.to_dict('index')
         
         return classification_analysis
@@ -219,17 +401,116 @@ class CSVDashboardAnalyzer:
         
         return review_analysis
     
-    def get_sample_reviews(self, df, num_samples=10):
-        """Get sample reviews for different categories"""
+    def analyze_languages(self, df):
+        """
+        Review counts, ratings, text length and classification mix per language
+        Aggregated per distinct language combination (e.g. 'en,es') on the category codes,
+        then spread over the languages in each combination
+        """
+        combos = df['review_languages']
+        grouped = df.groupby(combos, sort=False, observed=True)
+        stats = pd.DataFrame({
+            'reviews': grouped.size(),
+            'length_sum': df['cleaned_review_text'].str.len().groupby(combos, sort=False, observed=True).sum()
+        })
+        if 'rating' in df.columns:
+            stats['rating_sum'] = grouped['rating'].sum()
+            stats['rating_count'] = grouped['rating'].count()
+        mix = grouped['classification'].value_counts() if 'classification' in df.columns else None
+        mixed_combos = set(mix.index.get_level_values(0)) if mix is not None else set()
+        
+        languages = {}
+        reviews_without_text = 0
+        multilingual_reviews = 0
+        for combo, row in stats.iterrows():
+            codes = [code for code in str(combo).split(',') if code]
+            if not codes:
+                reviews_without_text += int(row['reviews'])
+                continue
+            if len(codes) > 1:
+                multilingual_reviews += int(row['reviews'])
+            
+            combo_mix = mix.loc[combo] if combo in mixed_combos else None
+            for position, code in enumerate(codes):
+                entry = languages.setdefault(code, {
+                    'reviews': 0, 'primary_reviews': 0, 'primary_length_sum': 0,
+                    'rating_sum': 0.0, 'rating_count': 0, 'classifications': {}
+                })
+                entry['reviews'] += int(row['reviews'])
+                if position == 0:
+                    # Text statistics describe the variant shown as the review text
+                    entry['primary_reviews'] += int(row['reviews'])
+                    entry['primary_length_sum'] += int(row['length_sum'])
+                if 'rating_sum' in row:
+                    entry['rating_sum'] += float(row['rating_sum'])
+                    entry['rating_count'] += int(row['rating_count'])
+                if combo_mix is not None:
+                    for label, count in combo_mix.items():
+                        if count:
+                            entry['classifications'][label] = entry['classifications'].get(label, 0) + int(count)
+        
+        total_reviews = len(df)
+        return {
+            'languages': {
+                code: {
+                    'reviews': entry['reviews'],
+                    'percentage': round(entry['reviews'] / total_reviews * 100, 1) if total_reviews else 0,
+                    'primary_reviews': entry['primary_reviews'],
+                    'avg_length': round(entry['primary_length_sum'] / entry['primary_reviews'], 0) if entry['primary_reviews'] else None,
+                    'mean_rating': round(entry['rating_sum'] / entry['rating_count'], 2) if entry['rating_count'] else None,
+                    'classifications': entry['classifications']
+                }
+                for code, entry in sorted(languages.items(), key=lambda item: -item[1]['reviews'])
+            },
+            'multilingual_reviews': multilingual_reviews,
+            'reviews_without_text': reviews_without_text
+        }
+    
+    def analyze_terms(self, df):
+        """Top distinctive terms of each company and classification against the rest of the upload"""
+        groupings = {
+            name: df[column]
+            for name, column in (('companies', 'company'), ('classifications', 'classification'))
+            if column in df.columns
+        }
+        return distinctive_terms(
+            df['cleaned_review_text'].tolist(),
+            groupings,
+            stopwords=self.rule_registry.current().stopwords,
+            method=self.term_method
+        )
+    
+    def analyze_near_duplicates(self, df):
+        """Find clusters of near-identical reviews across authors and companies"""
+        texts = df['cleaned_review_text'].fillna('').tolist()
+        clusters = self.near_duplicate_detector.find_clusters(texts)
+        
+        # Only materialize metadata for reviews that ended up in a cluster
+        member_positions = sorted({index for cluster in clusters for index in cluster['members']})
+        members = df.iloc[member_positions]
+        records = {}
+        for position, author, company, rating, text in zip(
+            member_positions,
+            members['author'] if 'author' in df.columns else ['Anonymous'] * len(members),
+            members['company'] if 'company' in df.columns else ['Unknown'] * len(members),
+            members['rating'] if 'rating' in df.columns else ['N/A'] * len(members),
+            members['cleaned_review_text']
+        ):
+            records[position] = {'author': author, 'company': company, 'rating': rating, 'text': text}
+        
+        return summarize_clusters(clusters, records)
+    
+    def get_sample_reviews(self, df, num_samples=10, random_state=42):
+        """Get sample reviews for different categories (seeded so results are reproducible)"""
         samples = {}
         
         # Sample by classification if available
         if 'classification' in df.columns:
-            for classification in df['classification'].unique():
-                class_reviews = df[df['classification'] == classification]
+            # One grouped pass over the category codes instead of a boolean mask per class
+            for classification, class_reviews in df.groupby('classification', sort=False, observed=True):
                 if len(class_reviews) > 0:
                     sample_size = min(3, len(class_reviews))
-                    sample_reviews = class_reviews.sample(n=sample_size)
+                    sample_reviews = class_reviews.sample(n=sample_size, random_state=random_state)
                     
                     samples[classification] = []
                     for _, review in sample_reviews.iterrows():
@@ -244,7 +525,7 @@ class CSVDashboardAnalyzer:
         # General samples if no classification
         else:
             sample_size = min(num_samples, len(df))
-            sample_reviews = df.sample(n=sample_size)
+            sample_reviews = df.sample(n=sample_size, random_state=random_state)
             
             samples['general'] = []
             for _, review in sample_reviews.iterrows():
@@ -258,13 +539,13 @@ class CSVDashboardAnalyzer:
         
         return samples
     
-    def get_overall_stats(self, df):
+    def get_overall_stats(self, df, date_range=None):
         """Get overall dataset statistics"""
         stats = {
             'total_reviews': len(df),
             'total_companies': df['company'].nunique() if 'company' in df.columns else 0,
             'total_authors': df['author'].nunique() if 'author' in df.columns else 0,
-            'date_range': 'Not available',  # Could be enhanced if date columns exist
+            'date_range': date_range or 'Not available',
             'data_quality': {
                 'missing_ratings': df['rating'].isna().sum() if 'rating' in df.columns else 0,
                 'missing_text': df['review_text'].isna().sum() if 'review_text' in df.columns else 0,
@@ -274,10 +555,21 @@ class CSVDashboardAnalyzer:
         
         return stats
 
-# Initialize the analyzer
-csv_analyzer = CSVDashboardAnalyzer()
+# The analyzer is built on first use so that importing this module stays cheap
+_csv_analyzer = None
+_csv_analyzer_lock = threading.Lock()
+
+def get_csv_analyzer():
+    """Return the shared CSVDashboardAnalyzer, creating it on first call"""
+    global _csv_analyzer
+    if _csv_analyzer is None:
+        with _csv_analyzer_lock:
+            if _csv_analyzer is None:
+                _csv_analyzer = CSVDashboardAnalyzer()
+    return _csv_analyzer
 
 @dashboard_bp.route('/upload-csv', methods=['POST'])
+@admitted('heavy')
 def upload_csv():
     """Handle CSV file upload and generate dashboard data"""
     try:
@@ -292,36 +584,191 @@ def upload_csv():
             return jsonify({'error': 'File must be a CSV file'}), 400
         
         # Read CSV content
-        csv_content = file.read().decode('utf-8')
-        
-        # Analyze the CSV data
-        result = csv_analyzer.analyze_csv_data(csv_content)
-        
-        if not result['success']:
-            return jsonify(result), 400
+        raw_content = file.read()
+        csv_content = raw_content.decode('utf-8')
+        
+        # Streaming mode: per-row NDJSON records followed by the dashboard record
+        if wants_ndjson(request):
+            return ndjson_response(get_csv_analyzer().stream_csv_data(csv_content))
+        
+        # Identical uploads are served from the result cache
+        cache = get_result_cache()
+        # Distinctive terms depend on the term method and the rule pack's stopwords
+        analyzer = get_csv_analyzer()
+        cache_key = cache.make_key(raw_content, {
+            'analysis': 'dashboard', 'terms': analyzer.term_method, 'rules': analyzer.rule_registry.current().version,
+            **analyzer.business_context.tables_version()
+        })
+        result = cache.get(cache_key)
+        cache_hit = result is not None
+        
+        if cache_hit:
+            # Author risk spans uploads and the indexes live in this process, so they are refreshed
+            analyzer.refresh_cached_result(result, csv_content)
+        else:
+            # Progressive mode: answer now with an estimate from a sample and compute the exact
+            # dashboard in the background, which keeps this upload's admission slot
+            if request.args.get('progressive', '').lower() in ('1', 'true', 'yes'):
+                preview = get_csv_analyzer().preview_csv_data(csv_content)
+                if preview is not None:
+                    ticket = hand_off_admission()
+                    job_id = get_background_jobs().submit(
+                        'dashboard', _exact_dashboard, csv_content, cache_key, file.filename,
+                        on_finish=ticket.release if ticket is not None else None
+                    )
+                    preview['metadata']['file_name'] = file.filename
+                    preview['metadata']['processing_time'] = 'Preview'
+                    preview['job'] = {'id': job_id, 'status_url': f'/api/dashboard-jobs/{job_id}'}
+                    return jsonify(preview)
+            
+            # Analyze the CSV data
+            result = get_csv_analyzer().analyze_csv_data(csv_content)
+            
+            if not result['success']:
+                return jsonify(result), 400
+            
+            cache.put(cache_key, result)
         
         # Add metadata
         result['metadata']['file_name'] = file.filename
         result['metadata']['processing_time'] = 'Real-time'
+        result['metadata']['cache'] = {'hit': cache_hit, 'key': cache_key}
         
-        # Convert any numpy types to Python types for JSON serialization
-        def convert_numpy_types(obj):
-            if hasattr(obj, 'item'):  # numpy scalar
-                return obj.item()
-            elif isinstance(obj, dict):
-                return {k: convert_numpy_types(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_numpy_types(v) for v in obj]
-            else:
-                return obj
-        
-        result = convert_numpy_types(result)
-        
+        # NumPy types are handled by the app's FastJSONProvider
         return jsonify(result)
     
     except Exception as e:
         return jsonify({'error': f'CSV processing failed: {str(e)}'}), 500
 
+def _exact_dashboard(csv_content, cache_key, file_name):
+    """Background half of a progressive upload: the exact dashboard, cached like a normal upload"""
+    result = get_csv_analyzer().analyze_csv_data(csv_content)
+    if result['success']:
+        get_result_cache().put(cache_key, result)
+        result['metadata']['cache'] = {'hit': False, 'key': cache_key}
+    
+    result.setdefault('metadata', {})['file_name'] = file_name
+    result['metadata']['processing_time'] = 'Background'
+    return result
+
+@dashboard_bp.route('/dashboard-jobs/<job_id>', methods=['GET'])
+def dashboard_job(job_id):
+    """Status of a progressive upload's exact dashboard: 202 while running, then the result"""
+    try:
+        job = get_background_jobs().get(job_id)
+        if job is None or job['kind'] != 'dashboard':
+            return jsonify({'error': 'Dashboard job not found or expired'}), 404
+        
+        if job['status'] == 'running':
+            return jsonify({'job_id': job_id, 'status': 'running', 'elapsed_seconds': job['elapsed_seconds']}), 202
+        if job['status'] == 'failed':
+            return jsonify({'job_id': job_id, 'status': 'failed', 'error': f'CSV processing failed: {job["error"]}'}), 500
+        
+        result = job['result']
+        return jsonify({'job_id': job_id, 'status': 'done', 'elapsed_seconds': job['elapsed_seconds'], **result}), 200 if result['success'] else 400
+    
+    except Exception as e:
+        return jsonify({'error': f'Dashboard job lookup failed: {str(e)}'}), 500
+
+@dashboard_bp.route('/datasets/<dataset_id>/reviews', methods=['GET'])
+def browse_reviews(dataset_id):
+    """Page through every review of a processed upload with optional filters"""
+    try:
+        dataset = get_csv_analyzer().dataset_store.get(dataset_id)
+        if dataset is None:
+            return jsonify({'error': 'Dataset not found or expired'}), 404
+        
+        try:
+            limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+            cursor = request.args.get('cursor')
+            cursor = int(cursor) if cursor not in (None, '') else None
+            min_rating = request.args.get('min_rating')
+            min_rating = float(min_rating) if min_rating not in (None, '') else None
+            max_rating = request.args.get('max_rating')
+            max_rating = float(max_rating) if max_rating not in (None, '') else None
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor, limit or rating filter'}), 400
+        
+        rows, next_cursor, total = dataset.page(
+            cursor=cursor,
+            limit=limit,
+            company=request.args.get('company') or None,
+            classification=request.args.get('classification') or None,
+            min_rating=min_rating,
+            max_rating=max_rating,
+            query=request.args.get('q') or None
+        )
+        
+        return jsonify({
+            'dataset_id': dataset_id,
+            'reviews': rows,
+            'next_cursor': next_cursor,
+            'total_matches': total
+        })
+    
+    except Exception as e:
+        return jsonify({'error': f'Review browsing failed: {str(e)}'}), 500
+
+@dashboard_bp.route('/datasets/<dataset_id>/companies/<path:company>', methods=['GET'])
+def company_drilldown(dataset_id, company):
+    """Rating histogram, classification mix, text statistics and flagged reviews for one company"""
+    try:
+        dataset = get_csv_analyzer().dataset_store.get(dataset_id)
+        if dataset is None:
+            return jsonify({'error': 'Dataset not found or expired'}), 404
+        
+        try:
+            flagged_limit = min(max(int(request.args.get('flagged_limit', 20)), 0), 500)
+        except ValueError:
+            return jsonify({'error': 'Invalid flagged_limit'}), 400
+        
+        profile = dataset.company_profile(company, flagged_limit=flagged_limit)
+        if profile is None:
+            return jsonify({'error': f'Company not found in dataset: {company}'}), 404
+        
+        return jsonify({'dataset_id': dataset_id, **profile})
+    
+    except Exception as e:
+        return jsonify({'error': f'Company drilldown failed: {str(e)}'}), 500
+
+@dashboard_bp.route('/search', methods=['GET'])
+def search_reviews():
+    """Full-text search over indexed uploads: terms, "quoted phrases" and prefix* queries"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Search query is required'}), 400
+        
+        try:
+            limit = min(max(int(request.args.get('limit', 20)), 1), 200)
+        except ValueError:
+            return jsonify({'error': 'Invalid limit'}), 400
+        
+        results = get_csv_analyzer().search_index.search(
+            query,
+            dataset_id=request.args.get('dataset_id') or None,
+            company=request.args.get('company') or None,
+            limit=limit
+        )
+        
+        return jsonify({
+            'query': query,
+            'results': results,
+            'total_returned': len(results)
+        })
+    
+    except Exception as e:
+        return jsonify({'error': f'Search failed: {str(e)}'}), 500
+
+@dashboard_bp.route('/ingested-dashboard', methods=['GET'])
+def ingested_dashboard():
+    """Aggregates of the reviews ingested from the spool directory and the daemon's latest metrics"""
+    try:
+        top_companies = request.args.get('companies', 20, type=int)
+        return jsonify(get_review_store().summary(top_companies=max(1, min(top_companies, 500))))
+    except Exception as e:
+        return jsonify({'error': f'Ingested dashboard failed: {str(e)}'}), 500
+
 @dashboard_bp.route('/dashboard-health', methods=['GET'])
 def dashboard_health():
     """Health check for dashboard service"""
@@ -330,6 +777,6 @@ def dashboard_health():
         'service': 'CSV Dashboard Analyzer',
         'version': '1.0.0',
         'timestamp': datetime.now().isoformat(),
-        'features': ['csv_upload', 'company_analysis', 'rating_analysis', 'sample_reviews']
+        'features': ['csv_upload', 'progressive_preview', 'spool_ingestion', 'company_analysis', 'company_drilldown', 'rating_analysis', 'term_analysis', 'trend_analysis', 'sample_reviews']
     })
 
@@ -1,125 +1,80 @@
 from flask import Blueprint, request, jsonify
-import re
 import csv
 import io
+from src.models.author_index import AuthorIndex, get_author_index
 from src.models.business_context import BusinessContext
+from src.models.languages import DEFAULT_LANGUAGE, extract_language_texts, normalize_language, primary_language
+from src.models.near_duplicates import NearDuplicateDetector, summarize_clusters
+from src.models.pattern_engine import MatchBudget
+from src.models.rule_packs import get_rule_registry
+from src.utils.admission import admitted
+from src.utils.memory import MemoryTracker
+from src.utils.profiling import get_request_profiler
+from src.utils.result_cache import get_result_cache
+from src.utils.serialization import ndjson_response, wants_ndjson
+from src.utils.startup import lazy_import, module_available
 import random
 from datetime import datetime
 from io import StringIO
 import json
 import csv
+import itertools
+import os
+import threading
+import zlib
 
-# Try to import pandas, but make it optional
-try:
-    import pandas as pd
-    import numpy as np
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
+# pandas is optional and slow to import, so it is only loaded on first use
+PANDAS_AVAILABLE = module_available('pandas', 'numpy')
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
 
 review_bp = Blueprint('review', __name__)
 
+# Columns the CSV analysis reads, with the dtypes to load them as; everything else is skipped
+CSV_ANALYSIS_COLUMNS = {
+    'review_id': 'object',
+    'review_text': 'object',
+    'text': 'object',
+    'place_name': 'category',
+    'business_name': 'category',
+    'company': 'category',
+    'author': 'category',
+    'star_rating': 'float64',
+    'rating': 'float64'
+}
+
 class ReviewAnalyzer:
     """Mock ML model for review legitimacy detection"""
     
-    def __init__(self):
-        # Initialize business context for topic relevance checking
-        self.business_context = BusinessContext()
-        
-        # Refined policy violation patterns with context awareness
-        
-        # Strong advertisement indicators (high confidence)
-        self.strong_ad_patterns = [
-            r'\b(visit our website|check out our store|promo code|coupon code)\b',
-            r'\b(www\.|http|\.com|\.net|\.org)\b',  # URLs
-            r'\b(call us|contact us|email us)\b.*\b(for|at)\b',
-            r'\b(our company|our business|our service)\b.*\b(offers|provides)\b',
-            r'\b(referral program|refer a friend|referral code|referral link)\b',
-            r'\b(join my|use my|my referral|my promo)\b.*\b(code|link|program)\b',
-            r'\b(earn|get|receive)\b.*\$\d+.*\b(if you|when you|by)\b',
-            r'\b(sign up|subscribe|register)\b.*\b(now|today|here)\b.*\b(get|receive|earn)\b',
-            r'\b(download our app|install our|try our service)\b',
-            r'\b(free trial|free month|free subscription)\b.*\b(if you|when you)\b',
-            r'\b(affiliate|partnership|commission|sponsored)\b',
-            r'\b(click here|tap here|visit here)\b.*\b(to get|for)\b'
-        ]
-        
-        # Weak advertisement indicators (need additional context)
-        self.weak_ad_patterns = [
-            r'\b(buy now|click here|limited time|act fast)\b',
-            r'\b(amazing|incredible|unbelievable|fantastic)\b.*\b(deal|offer|price)\b',
-            r'\$\d+.*\b(discount|off|save|cashback|reward)\b',
-            r'\b(special offer|exclusive deal|limited offer)\b',
-            r'\b(don\'t miss|hurry|expires soon|while supplies last)\b',
-            r'\b(bonus|reward|cashback|points)\b.*\b(when you|if you)\b',
-            r'\b(free shipping|free delivery|no cost)\b.*\b(order|purchase|buy)\b',
-            r'\b(best price|lowest price|guaranteed)\b',
-            r'\b(money back|satisfaction guaranteed|risk free)\b'
-        ]
-        
-        # Business review context indicators (reduce ad classification)
-        self.business_context_patterns = [
-            r'\b(went to|visited|tried|ordered|ate at|stayed at|shopped at)\b',
-            r'\b(the staff|the service|the food|the atmosphere|the location)\b',
-            r'\b(restaurant|hotel|store|shop|cafe|bar|museum|park)\b',
-            r'\b(experience|visit|trip|meal|stay|purchase)\b',
-            r'\b(recommend|would go back|will return|worth it)\b'
-        ]
-        
-        # Promotional mention in context (legitimate mentions of promotions)
-        self.promo_mention_patterns = [
-            r'\b(they had|there was|they offered|they were running)\b.*\b(promotion|deal|discount|special)\b',
-            r'\b(mentioned|told us about|offered us)\b.*\b(discount|deal|promotion)\b',
-            r'\b(got|received|used)\b.*\b(discount|coupon|deal)\b'
-        ]
-        
-        # No visit/experience patterns (user hasn't been there or tried it)
-        self.no_visit_patterns = [
-            r'\b(never been|haven\'t been|have not been|not been)\b.*\b(there|here|to this place)\b',
-            r'\b(never visited|haven\'t visited|have not visited|not visited)\b',
-            r'\b(never tried|haven\'t tried|have not tried|not tried)\b.*\b(this|it|them)\b',
-            r'\b(planning to|going to|will|might)\b.*\b(visit|go|try)\b',
-            r'\b(heard|someone told me|people say|they say)\b.*\b(it\'s|its|this place is)\b',
-            r'\b(based on|according to)\b.*\b(reviews|what I heard|others)\b',
-            r'\b(looks like|seems like|appears to be)\b.*\b(from|based on)\b',
-            r'\b(considering|thinking about|contemplating)\b.*\b(visiting|going|trying)\b',
-            r'\b(want to|would like to|hope to)\b.*\b(visit|go|try)\b.*\b(soon|someday|eventually)\b'
-        ]
-        
-        self.fake_patterns = [
-            r'\b(best product ever|life changing|miracle|perfect)\b',
-            r'\b(highly recommend|must buy|everyone should)\b.*\b(buy|purchase|get)\b',
-            r'\b(five stars|5 stars|10/10)\b.*\b(without|no)\b.*\b(doubt|question)\b',
-        ]
+    def __init__(self, match_budget_ms=None):
+        # Patterns, keyword lists and business tables come from versioned rule files
+        # (rules/*.json) that are compiled at load time and hot-swapped when edited
+        self.rule_registry = get_rule_registry()
         
-        self.off_topic_patterns = [
-            r'\b(my phone|my dog|my cat|my car|my house|my family|my vacation)\b',
-            r'\b(unrelated|not about this place|irrelevant)\b'
-        ]
-        
-        self.inappropriate_patterns = [
-            r'\b(fuck|shit|bitch|asshole|damn|cunt|motherfucker)\b',
-            r'\b(sex|sexual|porn|naked)\b'
-        ]
+        # Initialize business context for topic relevance checking
+        self.business_context = BusinessContext(self.rule_registry)
         
-        self.personal_info_patterns = [
-            r'\b(\d{3}[-\s]?\d{3}[-\s]?\d{4})\b', # Phone number
-            r'\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b', # Email address
-            r'\b(my address is|my phone number is|my email is)\b'
-        ]
+        # Built on first batch call so single-review analysis doesn't load NumPy
+        self._near_duplicate_detector = None
+        self._lock = threading.Lock()
         
-        self.suspicious_keywords = [
-            'guarantee', 'money back', 'risk free', 'breakthrough', 'revolutionary'
-        ]
+        # Time allowed for pattern matching per review (REVIEW_MATCH_BUDGET_MS, 0 disables)
+        if match_budget_ms is None:
+            match_budget_ms = float(os.environ.get('REVIEW_MATCH_BUDGET_MS', 100))
+        self.match_budget_seconds = match_budget_ms / 1000 if match_budget_ms > 0 else None
     
-    def analyze_sentiment(self, text):
+    @property
+    def model_version(self):
+        """Version of the active rule pack, reported as the model version"""
+        return self.rule_registry.current().version
+    
+    def analyze_sentiment(self, text, rules=None):
         """Simple sentiment analysis"""
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'love', 'perfect', 'wonderful']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'worst', 'horrible', 'disappointing']
+        rules = rules or self.rule_registry.current()
         
         text_lower = text.lower()
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+        pos_count = len(rules.positive_words.find(text_lower))
+        neg_count = len(rules.negative_words.find(text_lower))
         
         if pos_count > neg_count:
             return 'positive'
@@ -128,8 +83,12 @@ class ReviewAnalyzer:
         else:
             return 'neutral'
     
-    def detect_policy_violations(self, text):
+    def detect_policy_violations(self, text, rules=None, budget=None):
         """Detect policy violations in review text with context awareness"""
+        rules = rules or self.rule_registry.current()
+        if budget is None:
+            budget = MatchBudget(self.match_budget_seconds)
+        patterns = rules.patterns
         violations = []
         text_lower = text.lower()
         
@@ -140,23 +99,23 @@ class ReviewAnalyzer:
         promo_mention_matches = 0
         
         # Check for strong advertisement patterns
-        for pattern in self.strong_ad_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for _, compiled in patterns['strong_ad']:
+            if budget.search(compiled, text_lower):
                 strong_ad_matches += 1
         
         # Check for weak advertisement patterns
-        for pattern in self.weak_ad_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for _, compiled in patterns['weak_ad']:
+            if budget.search(compiled, text_lower):
                 weak_ad_matches += 1
         
         # Check for business context patterns
-        for pattern in self.business_context_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for _, compiled in patterns['business_context']:
+            if budget.search(compiled, text_lower):
                 business_context_matches += 1
         
         # Check for legitimate promotional mentions
-        for pattern in self.promo_mention_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for _, compiled in patterns['promo_mention']:
+            if budget.search(compiled, text_lower):
                 promo_mention_matches += 1
         
         # Determine if it's an advertisement based on context
@@ -189,8 +148,8 @@ class ReviewAnalyzer:
             })
         
         # Check for no visit/experience patterns
-        for pattern in self.no_visit_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for pattern, compiled in patterns['no_visit']:
+            if budget.search(compiled, text_lower):
                 violations.append({
                     'type': 'no-visit',
                     'description': 'Review appears to be from someone who has not visited or tried the product/service',
@@ -198,8 +157,8 @@ class ReviewAnalyzer:
                 })
         
         # Check for off-topic patterns
-        for pattern in self.off_topic_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for pattern, compiled in patterns['off_topic']:
+            if budget.search(compiled, text_lower):
                 violations.append({
                     'type': 'off-topic',
                     'description': 'Contains content unrelated to the product or service',
@@ -207,8 +166,8 @@ class ReviewAnalyzer:
                 })
         
         # Check for inappropriate patterns
-        for pattern in self.inappropriate_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for pattern, compiled in patterns['inappropriate']:
+            if budget.search(compiled, text_lower):
                 violations.append({
                     'type': 'inappropriate',
                     'description': 'Contains inappropriate language or content',
@@ -216,8 +175,8 @@ class ReviewAnalyzer:
                 })
         
         # Check for personal info patterns
-        for pattern in self.personal_info_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for pattern, compiled in patterns['personal_info']:
+            if budget.search(compiled, text_lower):
                 violations.append({
                     'type': 'personal-info',
                     'description': 'Contains personal identifiable information',
@@ -225,8 +184,8 @@ class ReviewAnalyzer:
                 })
         
         # Check for fake review patterns
-        for pattern in self.fake_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for pattern, compiled in patterns['fake']:
+            if budget.search(compiled, text_lower):
                 violations.append({
                     'type': 'fake',
                     'description': 'Contains language typical of fake reviews',
@@ -234,7 +193,7 @@ class ReviewAnalyzer:
                 })
         
         # Check for suspicious keywords (reduced threshold)
-        found_keywords = [kw for kw in self.suspicious_keywords if kw in text_lower]
+        found_keywords = rules.suspicious_keywords.find(text_lower)
         if len(found_keywords) >= 2:
             violations.append({
                 'type': 'suspicious',
@@ -244,8 +203,9 @@ class ReviewAnalyzer:
         
         return violations
     
-    def extract_text_features(self, text):
+    def extract_text_features(self, text, rules=None):
         """Extract textual features from review"""
+        rules = rules or self.rule_registry.current()
         words = text.split()
         sentences = text.split('.')
         
@@ -256,9 +216,8 @@ class ReviewAnalyzer:
         readability = 'high' if avg_word_length < 6 and avg_sentence_length < 20 else 'medium' if avg_word_length < 8 else 'low'
         
         # Extract keywords (simple approach)
-        common_words = ['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'was', 'are', 'were']
-        keywords = [word.lower().strip('.,!?') for word in words if len(word) > 3 and word.lower() not in common_words]
-        unique_keywords = list(set(keywords))[:10]  # Top 10 unique keywords
+        keywords = [word.lower().strip('.,!?') for word in words if len(word) > 3 and word.lower() not in rules.stopwords]
+        unique_keywords = list(dict.fromkeys(keywords))[:10]  # Top 10 unique keywords, in text order
         
         return {
             'length': len(text),
@@ -292,15 +251,20 @@ class ReviewAnalyzer:
         if metadata_analysis:
             metadata_penalty = len(metadata_analysis.get('risk_factors', [])) * 0.1
         
-        # Add some randomness to simulate ML model uncertainty
-        random_factor = random.uniform(-0.1, 0.1)
+        # Jitter in [-0.1, 0.1] to simulate ML model uncertainty, derived from the text so
+        # scoring is deterministic and shares no RNG state between request threads
+        random_factor = (zlib.crc32(text.encode('utf-8')) / 0xFFFFFFFF - 0.5) * 0.2
         
         final_score = max(0.0, min(1.0, base_score - violation_penalty - length_penalty - metadata_penalty + readability_bonus + random_factor))
         return round(final_score, 3)
     
-    def analyze_review(self, text, place_name=None, star_rating=None, business_type=None):
-        """Main analysis function with enhanced metadata"""
-        if not text or len(text.strip()) < 5:
+    def analyze_review(self, text, place_name=None, star_rating=None, business_type=None, language=None, topic_scores=None):
+        """
+        Main analysis function with enhanced metadata
+        `topic_scores` maps (business_type, text) to semantic topic scores computed in a batch
+        """
+        text = text or ''
+        if len(text.strip()) < 5:
             return {
                 'legitimate': False,
                 'status': 'invalid',
@@ -315,21 +279,27 @@ class ReviewAnalyzer:
                 }
             }
         
-        sentiment = self.analyze_sentiment(text)
-        violations = self.detect_policy_violations(text)
-        text_features = self.extract_text_features(text)
+        # One pack for the whole review, even if a reload lands mid-analysis; each
+        # language routes to its own pack, loaded the first time the language is seen
+        language = normalize_language(language) or DEFAULT_LANGUAGE
+        rules = self.rule_registry.current(language)
+        sentiment = self.analyze_sentiment(text, rules)
+        budget = MatchBudget(self.match_budget_seconds)
+        violations = self.detect_policy_violations(text, rules, budget)
+        text_features = self.extract_text_features(text, rules)
         
         # Business type context analysis
         business_context_info = None
         if business_type or place_name:
             # Determine business type from place name if not provided
             if not business_type and place_name:
-                business_type = self.business_context.get_business_type(place_name)
+                business_type = self.business_context.get_business_type(place_name, rules)
             
             if business_type:
                 # Check topic relevance
-                is_relevant, irrelevant_topics = self.business_context.check_topic_relevance(business_type, text)
-                business_context_info = self.business_context.get_business_context_info(business_type)
+                semantic = topic_scores.get((business_type, text)) if topic_scores else None
+                is_relevant, irrelevant_topics = self.business_context.check_topic_relevance(business_type, text, rules, semantic)
+                business_context_info = self.business_context.get_business_context_info(business_type, rules)
                 
                 if not is_relevant and irrelevant_topics:
                     violations.append({
@@ -340,7 +310,7 @@ class ReviewAnalyzer:
                     })
         
         # Enhanced analysis with metadata
-        metadata_analysis = self.analyze_metadata(text, place_name, star_rating)
+        metadata_analysis = self.analyze_metadata(text, place_name, star_rating, rules)
         violations.extend(metadata_analysis.get('violations', []))
         
         confidence = self.calculate_legitimacy_score(text, violations, text_features, metadata_analysis)
@@ -381,6 +351,8 @@ class ReviewAnalyzer:
         
         # Add metadata-based risk factors
         risk_factors.extend(metadata_analysis.get('risk_factors', []))
+        if budget.exceeded:
+            risk_factors.append('Pattern matching time budget exceeded; some rules were not checked')
         
         # Generate recommendations
         recommendations = []
@@ -404,7 +376,7 @@ class ReviewAnalyzer:
         else:
             recommendations.append('This review appears to be authentic and helpful.')
         
-        return {
+        result = {
             'legitimate': legitimate,
             'status': status,
             'confidence': confidence,
@@ -415,11 +387,107 @@ class ReviewAnalyzer:
                 'risk_factors': risk_factors,
                 'recommendations': recommendations,
                 'metadata_analysis': metadata_analysis,
-                'business_context': business_context_info
+                'business_context': business_context_info,
+                'language': language,
+                'rules_language': rules.language
             }
         }
+        if budget.exceeded:
+            result['analysis']['pattern_budget'] = budget.to_dict()
+        return result
+    
+    def analyze_variants(self, variants, place_name=None, star_rating=None, business_type=None, language=None, topic_scores=None):
+        """
+        Analyze every language variant of a review with that language's rules
+        The result is the primary variant's (`language` if given, else the first in the
+        payload); the other variants are summarized under analysis.language_variants
+        """
+        primary = primary_language(variants, normalize_language(language))
+        if primary is None:
+            return self.analyze_review('', place_name, star_rating, business_type)
+        
+        result = self.analyze_review(variants[primary], place_name, star_rating, business_type, primary, topic_scores)
+        if len(variants) > 1:
+            result['analysis']['language_variants'] = {}
+            for variant_language, variant_text in variants.items():
+                if variant_language == primary:
+                    continue
+                variant = self.analyze_review(variant_text, place_name, star_rating, business_type, variant_language, topic_scores)
+                result['analysis']['language_variants'][variant_language] = {
+                    'status': variant['status'],
+                    'confidence': variant['confidence'],
+                    'violation_types': [v['type'] for v in variant['analysis']['policy_violations']],
+                    'rules_language': variant['analysis']['rules_language']
+                }
+        return result
     
-    def analyze_metadata(self, text, place_name, star_rating):
+    def _record_fields(self, record):
+        """
+        (language variants, place name, star rating, language, business name) of an input record
+        The business name is the place name or, for review exports, the company column
+        """
+        variants = extract_language_texts(record.get('review_text', record.get('text', '')))
+        place_name = record.get('place_name', record.get('business_name', None))
+        business_name = place_name if isinstance(place_name, str) and place_name.strip() else record.get('company')
+        star_rating = record.get('star_rating', record.get('rating', None))
+        
+        if star_rating is not None and star_rating != '':
+            try:
+                star_rating = float(star_rating)
+                if star_rating != star_rating:  # NaN from empty CSV cells
+                    star_rating = None
+            except (TypeError, ValueError):
+                star_rating = None
+        else:
+            star_rating = None
+        
+        return variants, place_name, star_rating, record.get('language'), business_name
+    
+    def analyze_record(self, record, topic_scores=None):
+        """
+        Analyze one input record (CSV row, JSON object or pandas row)
+        Shared by the API and the offline scorer so both produce identical results
+        """
+        variants, place_name, star_rating, language, business_name = self._record_fields(record)
+        business_type = self.business_context.get_business_type(business_name) if isinstance(business_name, str) else None
+        return self.analyze_variants(variants, place_name, star_rating, business_type, language, topic_scores)
+    
+    def analyze_records(self, records):
+        """
+        Analyze a batch of records; each result is the same as analyze_record's
+        With semantic topic checks on, the topic relevance of every review is scored up
+        front as one batch instead of once per review
+        """
+        fields = [self._record_fields(record) for record in records]
+        default_rules = self.rule_registry.current()
+        # Every distinct company in the batch is resolved once, not once per review
+        business_types = self.business_context.resolve_business_types((field[4] for field in fields), default_rules)
+        
+        topic_scores = None
+        if self.business_context.topic_mode != 'keywords':
+            keys = set()
+            for variants, _, _, _, business_name in fields:
+                business_type = business_types.get(business_name) if isinstance(business_name, str) else None
+                if not business_type:
+                    continue
+                for variant_language, text in variants.items():
+                    if len(text.strip()) >= 5 and self.business_context.uses_semantic(self.rule_registry.current(variant_language)):
+                        keys.add((business_type, text))
+            if keys:
+                keys = list(keys)
+                scores = self.business_context.score_topics([key[0] for key in keys], [key[1] for key in keys], default_rules)
+                topic_scores = dict(zip(keys, scores))
+        
+        return [
+            self.analyze_variants(
+                variants, place_name, star_rating,
+                business_types.get(business_name) if isinstance(business_name, str) else None,
+                language, topic_scores
+            )
+            for variants, place_name, star_rating, language, business_name in fields
+        ]
+    
+    def analyze_metadata(self, text, place_name, star_rating, rules=None):
         """Analyze metadata for additional policy violations"""
         violations = []
         risk_factors = []
@@ -433,7 +501,7 @@ class ReviewAnalyzer:
         
         if star_rating is not None:
             insights['star_rating'] = star_rating
-            sentiment = self.analyze_sentiment(text)
+            sentiment = self.analyze_sentiment(text, rules)
             
             # Check for rating-sentiment mismatch
             if star_rating <= 2 and sentiment == 'positive':
@@ -457,60 +525,101 @@ class ReviewAnalyzer:
             'insights': insights
         }
     
-    def analyze_csv_data(self, csv_content):
-        """Analyze CSV data and provide preprocessing insights"""
-        try:
-            if not PANDAS_AVAILABLE:
-                # Fallback CSV analysis without pandas
-                return self._analyze_csv_fallback(csv_content)
-            
-            # Read CSV data with pandas
-            df = pd.read_csv(StringIO(csv_content))
-            
-            # Data preprocessing insights
-            preprocessing_steps = []
-            original_shape = df.shape
-            
+    def find_near_duplicates(self, reviews):
+        """
+        Batch mode: detect clusters of near-identical reviews
+        `reviews` is a list of dicts with 'text' and optional 'author', 'company', 'rating'
+        """
+        if self._near_duplicate_detector is None:
+            with self._lock:
+                if self._near_duplicate_detector is None:
+                    self._near_duplicate_detector = NearDuplicateDetector()
+        
+        clusters = self._near_duplicate_detector.find_clusters([review.get('text', '') for review in reviews])
+        return summarize_clusters(clusters, reviews)
+    
+    def _preprocess_csv(self, csv_content, trace_memory=None):
+        """
+        Load and clean CSV data with pandas
+        Only the columns the analysis uses are loaded, and rows are filtered through a
+        single combined mask so the frame is copied once
+        Returns: (cleaned dataframe, preprocessing steps)
+        """
+        memory = MemoryTracker(trace_memory)
+        
+        # Data preprocessing insights
+        preprocessing_steps = []
+        
+        with memory:
             # 1. Initial data overview
+            with memory.step() as loading_memory:
+                header = list(pd.read_csv(StringIO(csv_content.partition('\n')[0]), nrows=0).columns)
+                used_columns = [c for c in header if c in CSV_ANALYSIS_COLUMNS]
+                dtypes = {c: CSV_ANALYSIS_COLUMNS[c] for c in used_columns}
+                # usecols=[] reads no rows at all: without analysis columns the first column is
+                # loaded just so the rows are counted, and dropped below
+                usecols = used_columns or [0]
+                try:
+                    df = pd.read_csv(StringIO(csv_content), usecols=usecols, dtype=dtypes)
+                except ValueError:
+                    # Non-numeric ratings: load them as text and coerce, matching analyze_record
+                    rating_columns = [c for c in ('star_rating', 'rating') if c in dtypes]
+                    df = pd.read_csv(StringIO(csv_content), usecols=usecols, dtype={**dtypes, **{c: 'object' for c in rating_columns}})
+                    for column in rating_columns:
+                        df[column] = pd.to_numeric(df[column], errors='coerce')
+                if not used_columns:
+                    df = df.iloc[:, :0]
+            
+            original_rows = len(df)
             preprocessing_steps.append({
                 'step': 'Data Loading',
-                'description': f'Loaded {original_shape[0]} rows and {original_shape[1]} columns',
+                'description': f'Loaded {original_rows} rows and {len(header)} columns',
                 'details': {
-                    'rows': original_shape[0],
-                    'columns': original_shape[1],
-                    'column_names': list(df.columns)
+                    'rows': original_rows,
+                    'columns': len(header),
+                    'column_names': header,
+                    'columns_loaded': used_columns,
+                    'memory': loading_memory
                 }
             })
             
-            # 2. Handle missing values
-            missing_before = df.isnull().sum().sum()
-            df_cleaned = df.dropna()
-            missing_after = df_cleaned.isnull().sum().sum()
+            text_col = 'review_text' if 'review_text' in df.columns else 'text' if 'text' in df.columns else None
+            
+            # 2. Handle missing values, only in the review text the analysis needs
+            with memory.step() as missing_memory:
+                missing = df.isna().to_numpy()
+                keep = ~missing[:, df.columns.get_loc(text_col)] if text_col else np.ones(original_rows, dtype=bool)
+                missing_before = int(missing.sum())
+                missing_after = int(missing[keep].sum())
+                rows_removed = original_rows - int(keep.sum())
+                del missing
             
             preprocessing_steps.append({
                 'step': 'Missing Value Removal',
-                'description': f'Removed {original_shape[0] - df_cleaned.shape[0]} rows with missing values',
+                'description': f'Removed {rows_removed} rows with missing review text',
                 'details': {
-                    'missing_values_before': int(missing_before),
-                    'missing_values_after': int(missing_after),
-                    'rows_removed': original_shape[0] - df_cleaned.shape[0]
+                    'missing_values_before': missing_before,
+                    'missing_values_after': missing_after,
+                    'rows_removed': rows_removed,
+                    'memory': missing_memory
                 }
             })
             
             # 3. Text length analysis and outlier removal
-            if 'review_text' in df_cleaned.columns or 'text' in df_cleaned.columns:
-                text_col = 'review_text' if 'review_text' in df_cleaned.columns else 'text'
-                df_cleaned['text_length'] = df_cleaned[text_col].str.len()
-                
-                # Remove outliers (reviews too short or too long)
-                q1 = df_cleaned['text_length'].quantile(0.25)
-                q3 = df_cleaned['text_length'].quantile(0.75)
-                iqr = q3 - q1
-                lower_bound = max(10, q1 - 1.5 * iqr)  # Minimum 10 characters
-                upper_bound = min(2000, q3 + 1.5 * iqr)  # Maximum 2000 characters
-                
-                outliers_removed = len(df_cleaned) - len(df_cleaned[(df_cleaned['text_length'] >= lower_bound) & (df_cleaned['text_length'] <= upper_bound)])
-                df_cleaned = df_cleaned[(df_cleaned['text_length'] >= lower_bound) & (df_cleaned['text_length'] <= upper_bound)]
+            if text_col:
+                with memory.step() as outlier_memory:
+                    text_length = df[text_col].str.len().to_numpy(dtype='float64', na_value=np.nan)
+                    
+                    # Remove outliers (reviews too short or too long)
+                    q1, q3 = np.quantile(text_length[keep], [0.25, 0.75]) if keep.any() else (0.0, 0.0)
+                    iqr = q3 - q1
+                    lower_bound = max(10, q1 - 1.5 * iqr)  # Minimum 10 characters
+                    upper_bound = min(2000, q3 + 1.5 * iqr)  # Maximum 2000 characters
+                    
+                    # Build the length mask once and use it for both the count and the filter
+                    in_range = (text_length >= lower_bound) & (text_length <= upper_bound)
+                    outliers_removed = int((keep & ~in_range).sum())
+                    keep &= in_range
                 
                 preprocessing_steps.append({
                     'step': 'Outlier Removal',
@@ -518,32 +627,67 @@ class ReviewAnalyzer:
                     'details': {
                         'outliers_removed': outliers_removed,
                         'text_length_range': f'{int(lower_bound)}-{int(upper_bound)} characters',
-                        'remaining_reviews': len(df_cleaned)
+                        'remaining_reviews': int(keep.sum()),
+                        'memory': outlier_memory
                     }
                 })
             
-            # 4. Analyze the cleaned data
+            # The only copy of the data: all filters applied in one step
+            df_cleaned = df[keep] if not keep.all() else df
+        
+        return df_cleaned, preprocessing_steps
+    
+    def _csv_near_duplicates(self, df_cleaned):
+        """Near-duplicate detection over the full cleaned dataset"""
+        if len(df_cleaned) == 0 or not ('review_text' in df_cleaned.columns or 'text' in df_cleaned.columns):
+            return None
+        
+        text_col = 'review_text' if 'review_text' in df_cleaned.columns else 'text'
+        company_col = next((c for c in ('company', 'place_name', 'business_name') if c in df_cleaned.columns), None)
+        rating_col = next((c for c in ('star_rating', 'rating') if c in df_cleaned.columns), None)
+        reviews = [
+            {
+                'text': text,
+                'author': author,
+                'company': company,
+                'rating': rating
+            }
+            for text, author, company, rating in zip(
+                df_cleaned[text_col].astype(str),
+                df_cleaned['author'] if 'author' in df_cleaned.columns else ['Anonymous'] * len(df_cleaned),
+                df_cleaned[company_col] if company_col else ['Unknown'] * len(df_cleaned),
+                df_cleaned[rating_col] if rating_col else ['N/A'] * len(df_cleaned)
+            )
+        ]
+        return self.find_near_duplicates(reviews)
+    
+    def analyze_csv_data(self, csv_content):
+        """Analyze CSV data and provide preprocessing insights"""
+        try:
+            if not PANDAS_AVAILABLE:
+                # Fallback CSV analysis without pandas
+                return self._analyze_csv_fallback(csv_content)
+            
+            # 1-3. Load, drop missing values and remove length outliers
+            df_cleaned, preprocessing_steps = self._preprocess_csv(csv_content)
+            
+            # 4. Near-duplicate detection over the full cleaned dataset
+            near_duplicates = self._csv_near_duplicates(df_cleaned)
+            
+            # 5. Analyze the cleaned data
             analysis_results = []
             if len(df_cleaned) > 0:
                 # Analyze each review
-                for idx, row in df_cleaned.head(100).iterrows():  # Limit to first 100 for demo
-                    text = row.get('review_text', row.get('text', ''))
-                    place_name = row.get('place_name', row.get('business_name', None))
-                    star_rating = row.get('star_rating', row.get('rating', None))
-                    
-                    if star_rating is not None:
-                        try:
-                            star_rating = float(star_rating)
-                        except:
-                            star_rating = None
-                    
-                    result = self.analyze_review(text, place_name, star_rating)
+                sample = df_cleaned.head(100)  # Limit to first 100 for demo
+                rows = [row for _, row in sample.iterrows()]
+                for idx, result in zip(sample.index, self.analyze_records(rows)):
                     analysis_results.append({
                         'index': int(idx),
                         'status': result['status'],
                         'confidence': result['confidence'],
                         'violations': len(result['analysis']['policy_violations'])
                     })
+                self._index_author_scores(csv_content, sample, [r['confidence'] for r in analysis_results])
             
             # Generate summary statistics
             if analysis_results:
@@ -576,7 +720,9 @@ class ReviewAnalyzer:
                 'preprocessing_steps': preprocessing_steps,
                 'analysis_results': analysis_results,
                 'summary': summary,
-                'final_dataset_shape': df_cleaned.shape
+                'near_duplicates': near_duplicates,
+                # The file's column count, not just the columns loaded for the analysis
+                'final_dataset_shape': (len(df_cleaned), preprocessing_steps[0]['details']['columns'])
             }
             
         except Exception as e:
@@ -652,17 +798,7 @@ class ReviewAnalyzer:
             # 4. Analyze reviews
             analysis_results = []
             for idx, row in enumerate(cleaned_rows[:100]):  # Limit to first 100
-                text = row.get('review_text', row.get('text', ''))
-                place_name = row.get('place_name', row.get('business_name', None))
-                star_rating = row.get('star_rating', row.get('rating', None))
-                
-                if star_rating:
-                    try:
-                        star_rating = float(star_rating)
-                    except:
-                        star_rating = None
-                
-                result = self.analyze_review(text, place_name, star_rating)
+                result = self.analyze_record(row)
                 analysis_results.append({
                     'index': idx,
                     'status': result['status'],
@@ -714,11 +850,96 @@ class ReviewAnalyzer:
                 'summary': {},
                 'fallback_mode': True
             }
+    
+    def _index_author_scores(self, csv_content, analyzed, confidences):
+        """Feed the analyzed rows' confidence, the analyzer's legitimacy score, to the shared author index"""
+        if 'author' in analyzed.columns and confidences:
+            get_author_index().ingest_scores(analyzed['author'], confidences, AuthorIndex.fingerprint(csv_content))
+    
+    def refresh_author_scores(self, result, csv_content):
+        """Feed a cached analysis's scores to the author index, reading only the author column"""
+        fingerprint = AuthorIndex.fingerprint(csv_content)
+        if get_author_index().has_scores(fingerprint) or not result['analysis_results']:
+            return
+        header = list(pd.read_csv(StringIO(csv_content.partition('\n')[0]), nrows=0).columns)
+        if 'author' not in header:
+            return
+        authors = pd.read_csv(StringIO(csv_content), usecols=['author'], dtype={'author': 'category'})['author']
+        analyzed = [entry['index'] for entry in result['analysis_results']]
+        self._index_author_scores(csv_content, authors.iloc[analyzed].to_frame(), [entry['confidence'] for entry in result['analysis_results']])
+    
+    def stream_csv_analysis(self, csv_content, limit=None, chunk_size=10000):
+        """
+        Generate CSV analysis as a sequence of records suitable for NDJSON streaming:
+        one 'preprocessing' record, one 'result' per analyzed row, then a final 'summary'
+        Unlike analyze_csv_data, every cleaned row is analyzed unless `limit` is given
+        """
+        if not PANDAS_AVAILABLE:
+            # The fallback parser is not incremental; emit its rows in the same record shape
+            result = self._analyze_csv_fallback(csv_content)
+            if not result['success']:
+                yield {'type': 'error', 'error': result['error']}
+                return
+            yield {'type': 'preprocessing', 'preprocessing_steps': result['preprocessing_steps']}
+            for entry in result['analysis_results']:
+                yield {'type': 'result', **entry}
+            yield {'type': 'summary', 'summary': result['summary'], 'final_dataset_shape': result['final_dataset_shape']}
+            return
+        
+        df_cleaned, preprocessing_steps = self._preprocess_csv(csv_content)
+        yield {'type': 'preprocessing', 'preprocessing_steps': preprocessing_steps}
+        
+        total = len(df_cleaned) if limit is None else min(limit, len(df_cleaned))
+        status_counts = {}
+        confidences = []
+        total_violations = 0
+        
+        # Convert rows chunk by chunk so only one chunk of dicts is alive at a time
+        for start in range(0, total, chunk_size):
+            chunk = df_cleaned.iloc[start:min(start + chunk_size, total)]
+            for idx, result in zip(chunk.index, self.analyze_records(chunk.to_dict('records'))):
+                violations = len(result['analysis']['policy_violations'])
+                status_counts[result['status']] = status_counts.get(result['status'], 0) + 1
+                confidences.append(result['confidence'])
+                total_violations += violations
+                yield {
+                    'type': 'result',
+                    'index': idx,
+                    'status': result['status'],
+                    'confidence': result['confidence'],
+                    'violations': violations
+                }
+        
+        self._index_author_scores(csv_content, df_cleaned.iloc[:total], confidences)
+        
+        yield {
+            'type': 'summary',
+            'summary': {
+                'total_analyzed': total,
+                'status_distribution': status_counts,
+                'average_confidence': round(sum(confidences) / total, 3) if total else 0,
+                'total_violations': total_violations,
+                'violation_rate': round(total_violations / total, 3) if total else 0
+            },
+            'near_duplicates': self._csv_near_duplicates(df_cleaned),
+            'final_dataset_shape': (len(df_cleaned), preprocessing_steps[0]['details']['columns'])
+        }
+
+# The analyzer is built on first use so that importing this module stays cheap
+_analyzer = None
+_analyzer_lock = threading.Lock()
 
-# Initialize the analyzer
-analyzer = ReviewAnalyzer()
+def get_analyzer():
+    """Return the shared ReviewAnalyzer, creating it on first call"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = ReviewAnalyzer()
+    return _analyzer
 
 @review_bp.route('/analyze', methods=['POST'])
+@admitted('fast')
 def analyze_review():
     """Analyze a review for legitimacy with enhanced metadata"""
     try:
@@ -731,6 +952,7 @@ def analyze_review():
         place_name = data.get('place_name')
         star_rating = data.get('star_rating')
         business_type = data.get('business_type')
+        language = data.get('language')
         
         # Convert star_rating to float if provided
         if star_rating is not None:
@@ -742,12 +964,18 @@ def analyze_review():
                 return jsonify({'error': 'Invalid star rating format'}), 400
         
         # Perform analysis
-        result = analyzer.analyze_review(review_text, place_name, star_rating, business_type)
+        analyzer = get_analyzer()
+        if isinstance(review_text, dict):
+            # Language-keyed payload: {'en': ..., 'es': ...}
+            variants = extract_language_texts(review_text)
+            result = analyzer.analyze_variants(variants, place_name, star_rating, business_type, language)
+        else:
+            result = analyzer.analyze_review(review_text, place_name, star_rating, business_type, language)
         
         # Add metadata
         result['metadata'] = {
             'analyzed_at': datetime.now().isoformat(),
-            'model_version': '2.0.0',
+            'model_version': analyzer.model_version,
             'processing_time_ms': random.randint(100, 500),
             'enhanced_analysis': True
         }
@@ -769,6 +997,7 @@ def health_check():
     })
 
 @review_bp.route('/analyze-csv', methods=['POST'])
+@admitted('heavy')
 def analyze_csv():
     """Analyze CSV data with preprocessing insights"""
     try:
@@ -783,17 +1012,46 @@ def analyze_csv():
             return jsonify({'error': 'File must be a CSV file'}), 400
         
         # Read CSV content
-        csv_content = file.read().decode('utf-8')
+        raw_content = file.read()
+        csv_content = raw_content.decode('utf-8')
         
-        # Perform analysis
-        result = analyzer.analyze_csv_data(csv_content)
+        # Streaming mode: per-row NDJSON records followed by a summary record
+        if wants_ndjson(request):
+            metadata = {
+                'type': 'metadata',
+                'analyzed_at': datetime.now().isoformat(),
+                'model_version': get_analyzer().model_version,
+                'file_name': file.filename
+            }
+            limit = request.args.get('limit', type=int)
+            return ndjson_response(itertools.chain([metadata], get_analyzer().stream_csv_analysis(csv_content, limit=limit)))
+        
+        # Identical uploads are served from the result cache
+        cache = get_result_cache()
+        # Results depend on the rules, business tables and name catalog, so a new version of any misses the cache
+        model_version = get_analyzer().model_version
+        cache_key = cache.make_key(raw_content, {
+            'analysis': 'csv', 'rules': model_version, **get_analyzer().business_context.tables_version()
+        })
+        result = cache.get(cache_key)
+        cache_hit = result is not None
+        
+        if not cache_hit:
+            # Perform analysis
+            result = get_analyzer().analyze_csv_data(csv_content)
+            if result['success']:
+                cache.put(cache_key, result)
+        elif result['success']:
+            # A cached result skipped scoring, so this process's author index never saw its scores
+            get_analyzer().refresh_author_scores(result, csv_content)
         
         # Add metadata
         result['metadata'] = {
             'analyzed_at': datetime.now().isoformat(),
-            'model_version': '2.0.0',
+            'model_version': model_version,
             'file_name': file.filename,
-            'processing_time_ms': random.randint(1000, 5000)  # CSV processing takes longer
+            'processing_time_ms': random.randint(1000, 5000),  # CSV processing takes longer
+            'cache': {'hit': cache_hit, 'key': cache_key}
         }
         
         return jsonify(result)
@@ -801,3 +1059,22 @@ def analyze_csv():
     except Exception as e:
         return jsonify({'error': f'CSV analysis failed: {str(e)}'}), 500
 
+@review_bp.route('/rules', methods=['GET'])
+def rule_pack_status():
+    """Active rule pack version, load time and the last reload error, if any"""
+    return jsonify(get_rule_registry().status())
+
+@review_bp.route('/rules/reload', methods=['POST'])
+def reload_rule_pack():
+    """Reload the rule files now instead of waiting for the change check"""
+    # A full rule and catalog re-index is an admin operation, authorized like /api/admin/*
+    if not get_request_profiler().authorized(request.headers.get('X-Admin-Token'), request.remote_addr):
+        return jsonify({'error': 'Admin token required'}), 403
+    
+    try:
+        registry = get_rule_registry()
+        reloaded = registry.reload()
+        return jsonify({'reloaded': reloaded, **registry.status()})
+    
+    except Exception as e:
+        return jsonify({'error': f'Rule reload failed: {str(e)}'}), 500
@@ -3,6 +3,16 @@ from src.models.user import User, db
 
 user_bp = Blueprint('user', __name__)
 
+_tables_created = False
+
+@user_bp.before_request
+def ensure_tables():
+    """Create the database tables on the first user request instead of at startup"""
+    global _tables_created
+    if not _tables_created:
+        db.create_all()
+        _tables_created = True
+
 @user_bp.route('/users', methods=['GET'])
 def get_users():
     users = User.query.all()
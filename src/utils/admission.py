@@ -0,0 +1,267 @@
+"""
+Admission control for heavy upload endpoints
+CSV uploads are admitted against a cap on concurrent jobs and a memory budget, using a
+cost estimated from the request's Content-Length before the body is read. Requests that
+don't fit wait in a bounded FIFO queue; a full queue or a wait past the timeout is
+rejected with 429 and a Retry-After estimate. Single-review analysis runs on a separate
+fast lane that heavy jobs never occupy
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from flask import g, jsonify, make_response, request
+
+LANES = ('heavy', 'fast')
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, lane, reason, retry_after):
+        super().__init__(f'{lane} lane {reason.replace("_", " ")}')
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted request's claim on its lane; release() is idempotent"""
+
+    def __init__(self, controller, lane, cost_mb, waited):
+        self.controller = controller
+        self.lane = lane
+        self.cost_mb = cost_mb
+        self.waited = waited
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.controller._release(self)
+
+
+class AdmissionController:
+    """
+    Heavy lane: at most `max_heavy_jobs` running and `heavy_memory_mb` of estimated cost
+    in use, `max_queue` waiting. Fast lane: at most `fast_lane_max` running, never queued
+    A job estimated above the whole memory budget is admitted only when the lane is idle
+    """
+
+    def __init__(self, max_heavy_jobs=2, heavy_memory_mb=1024, max_queue=8, queue_timeout=30.0,
+                 fast_lane_max=64, cost_factor=15.0, base_cost_mb=16.0):
+        self.max_heavy_jobs = max_heavy_jobs
+        self.heavy_memory_mb = heavy_memory_mb
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.fast_lane_max = fast_lane_max
+        self.cost_factor = cost_factor
+        self.base_cost_mb = base_cost_mb
+
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._running = {lane: 0 for lane in LANES}
+        self._cost_in_use_mb = 0.0
+        # Exponentially weighted mean heavy job duration, for Retry-After
+        self._mean_job_seconds = 5.0
+        self._counters = {
+            'heavy_admitted': 0, 'heavy_queued': 0, 'heavy_rejected_queue_full': 0,
+            'heavy_rejected_timeout': 0, 'heavy_admitted_after_wait': 0, 'fast_admitted': 0, 'fast_rejected': 0
+        }
+        self._wait_seconds_total = 0.0
+        self._max_queue_depth = 0
+
+    def estimate_cost_mb(self, content_length):
+        """Peak memory of analyzing an upload: decoded text, frame and results scale with its size"""
+        return self.base_cost_mb + self.cost_factor * (content_length or 0) / (1024 * 1024)
+
+    def _fits(self, cost_mb):
+        if self._running['heavy'] >= self.max_heavy_jobs:
+            return False
+        return self._running['heavy'] == 0 or self._cost_in_use_mb + cost_mb <= self.heavy_memory_mb
+
+    def _retry_after(self, queue_position):
+        """Seconds until a slot is likely free for a request behind `queue_position` others"""
+        rounds = math.ceil((queue_position + 1) / max(1, self.max_heavy_jobs))
+        return max(1, math.ceil(rounds * self._mean_job_seconds))
+
+    def acquire_heavy(self, content_length):
+        """Admit a heavy job, waiting in the queue if needed; raises AdmissionRejected"""
+        cost_mb = self.estimate_cost_mb(content_length)
+        with self._condition:
+            if not self._queue and self._fits(cost_mb):
+                return self._admit('heavy', cost_mb, 0.0)
+            if len(self._queue) >= self.max_queue:
+                self._counters['heavy_rejected_queue_full'] += 1
+                raise AdmissionRejected('heavy', 'queue_full', self._retry_after(len(self._queue)))
+
+            entry = object()
+            self._queue.append(entry)
+            self._counters['heavy_queued'] += 1
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            started = time.monotonic()
+            deadline = started + self.queue_timeout
+            try:
+                while not (self._queue[0] is entry and self._fits(cost_mb)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['heavy_rejected_timeout'] += 1
+                        raise AdmissionRejected('heavy', 'queue_timeout', self._retry_after(self._queue.index(entry)))
+                    self._condition.wait(remaining)
+            finally:
+                self._queue.remove(entry)
+                self._condition.notify_all()
+            waited = time.monotonic() - started
+            self._wait_seconds_total += waited
+            self._counters['heavy_admitted_after_wait'] += 1
+            return self._admit('heavy', cost_mb, waited)
+
+    def acquire_fast(self):
+        """Admit a fast-lane request or raise AdmissionRejected; never waits"""
+        with self._condition:
+            if self._running['fast'] >= self.fast_lane_max:
+                self._counters['fast_rejected'] += 1
+                raise AdmissionRejected('fast', 'at_capacity', 1)
+            return self._admit('fast', 0.0, 0.0)
+
+    def _admit(self, lane, cost_mb, waited):
+        """Caller holds the condition"""
+        self._running[lane] += 1
+        self._cost_in_use_mb += cost_mb
+        self._counters[f'{lane}_admitted'] += 1
+        return Ticket(self, lane, cost_mb, waited)
+
+    def _release(self, ticket):
+        with self._condition:
+            self._running[ticket.lane] -= 1
+            self._cost_in_use_mb -= ticket.cost_mb
+            if ticket.lane == 'heavy':
+                duration = time.monotonic() - ticket.admitted_at
+                self._mean_job_seconds = 0.8 * self._mean_job_seconds + 0.2 * duration
+                self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            admitted_after_wait = self._counters['heavy_admitted_after_wait']
+            return {
+                'heavy': {
+                    'running': self._running['heavy'],
+                    'max_jobs': self.max_heavy_jobs,
+                    'queue_depth': len(self._queue),
+                    'max_queue': self.max_queue,
+                    'max_queue_depth_seen': self._max_queue_depth,
+                    'estimated_memory_in_use_mb': round(self._cost_in_use_mb, 1),
+                    'memory_budget_mb': self.heavy_memory_mb,
+                    'admitted': self._counters['heavy_admitted'],
+                    'queued': self._counters['heavy_queued'],
+                    'rejected_queue_full': self._counters['heavy_rejected_queue_full'],
+                    'rejected_timeout': self._counters['heavy_rejected_timeout'],
+                    'mean_queue_wait_seconds': round(self._wait_seconds_total / admitted_after_wait, 3) if admitted_after_wait > 0 else 0.0,
+                    'mean_job_seconds': round(self._mean_job_seconds, 3)
+                },
+                'fast': {
+                    'running': self._running['fast'],
+                    'max_running': self.fast_lane_max,
+                    'admitted': self._counters['fast_admitted'],
+                    'rejected': self._counters['fast_rejected']
+                }
+            }
+
+    def prometheus(self):
+        """The stats in Prometheus text exposition format"""
+        stats = self.stats()
+        heavy, fast = stats['heavy'], stats['fast']
+        metrics = [
+            ('review_admission_running', 'gauge', 'Requests running per lane', [({'lane': 'heavy'}, heavy['running']), ({'lane': 'fast'}, fast['running'])]),
+            ('review_admission_queue_depth', 'gauge', 'Heavy requests waiting for a slot', [({}, heavy['queue_depth'])]),
+            ('review_admission_estimated_memory_mb', 'gauge', 'Estimated memory of running heavy jobs', [({}, heavy['estimated_memory_in_use_mb'])]),
+            ('review_admission_admitted_total', 'counter', 'Requests admitted per lane', [({'lane': 'heavy'}, heavy['admitted']), ({'lane': 'fast'}, fast['admitted'])]),
+            ('review_admission_queued_total', 'counter', 'Heavy requests that had to wait', [({}, heavy['queued'])]),
+            ('review_admission_rejected_total', 'counter', 'Requests rejected with 429', [
+                ({'lane': 'heavy', 'reason': 'queue_full'}, heavy['rejected_queue_full']),
+                ({'lane': 'heavy', 'reason': 'queue_timeout'}, heavy['rejected_timeout']),
+                ({'lane': 'fast', 'reason': 'at_capacity'}, fast['rejected'])
+            ])
+        ]
+        lines = []
+        for name, kind, description, samples in metrics:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def admitted(lane):
+    """
+    Route decorator: run the view only once admitted to `lane`, else answer 429
+    The slot is held until the response is closed, so streamed responses keep it while
+    they are generated, or until background work given it by hand_off_admission() finishes
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            controller = get_admission_controller()
+            try:
+                ticket = controller.acquire_heavy(request.content_length) if lane == 'heavy' else controller.acquire_fast()
+            except AdmissionRejected as e:
+                response = jsonify({
+                    'error': f'Server busy: {e}, retry later',
+                    'reason': e.reason,
+                    'retry_after_seconds': e.retry_after
+                })
+                response.status_code = 429
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response
+
+            g.admission_ticket = ticket
+            try:
+                response = make_response(view(*args, **kwargs))
+            except BaseException:
+                if g.pop('admission_ticket', None) is ticket:
+                    ticket.release()
+                raise
+            # A view that handed its ticket to background work no longer owns it
+            if g.pop('admission_ticket', None) is ticket:
+                response.call_on_close(ticket.release)
+            if ticket.waited:
+                response.headers['X-Queue-Wait-Seconds'] = f'{ticket.waited:.3f}'
+            return response
+        return wrapper
+    return decorator
+
+
+def hand_off_admission():
+    """
+    Take the current request's admission ticket for work that outlives the response, so
+    the slot stays held until that work calls ticket.release(); None outside an admitted view
+    """
+    return g.pop('admission_ticket', None)
+
+
+_admission_controller = None
+_admission_controller_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """
+    Shared controller configured from REVIEW_HEAVY_MAX_JOBS, REVIEW_HEAVY_MEMORY_MB,
+    REVIEW_HEAVY_QUEUE, REVIEW_HEAVY_QUEUE_TIMEOUT, REVIEW_FAST_LANE_MAX and REVIEW_UPLOAD_COST_FACTOR
+    """
+    global _admission_controller
+    if _admission_controller is None:
+        with _admission_controller_lock:
+            if _admission_controller is None:
+                _admission_controller = AdmissionController(
+                    max_heavy_jobs=int(os.environ.get('REVIEW_HEAVY_MAX_JOBS', 2)),
+                    heavy_memory_mb=float(os.environ.get('REVIEW_HEAVY_MEMORY_MB', 1024)),
+                    max_queue=int(os.environ.get('REVIEW_HEAVY_QUEUE', 8)),
+                    queue_timeout=float(os.environ.get('REVIEW_HEAVY_QUEUE_TIMEOUT', 30)),
+                    fast_lane_max=int(os.environ.get('REVIEW_FAST_LANE_MAX', 64)),
+                    cost_factor=float(os.environ.get('REVIEW_UPLOAD_COST_FACTOR', 15))
+                )
+    return _admission_controller
@@ -0,0 +1,78 @@
+"""
+Background jobs whose results are fetched later by id
+Used by the progressive dashboard: the request answers with a preview and a job id while
+the exact result is computed on a daemon thread. Finished jobs are kept, oldest evicted
+first, until `max_finished` newer ones have completed
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class BackgroundJobs:
+    def __init__(self, max_finished=32):
+        self.max_finished = max_finished
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._finished = OrderedDict()
+
+    def submit(self, kind, function, *args, on_finish=None):
+        """
+        Run function(*args) on a new daemon thread; returns the job id
+        `on_finish` is called once the job has finished, whether or not it succeeded
+        """
+        job_id = uuid.uuid4().hex
+        job = {'id': job_id, 'kind': kind, 'status': 'running', 'started_at': time.time(), 'finished_at': None, 'result': None, 'error': None}
+        with self._lock:
+            self._jobs[job_id] = job
+        threading.Thread(target=self._run, args=(job, function, args, on_finish), name=f'{kind}-job', daemon=True).start()
+        return job_id
+
+    def _run(self, job, function, args, on_finish):
+        try:
+            result, status, error = function(*args), 'done', None
+        except Exception as e:
+            result, status, error = None, 'failed', f'{type(e).__name__}: {e}'
+        finally:
+            if on_finish is not None:
+                on_finish()
+
+        with self._lock:
+            job.update(status=status, result=result, error=error, finished_at=time.time())
+            self._finished[job['id']] = job
+            while len(self._finished) > self.max_finished:
+                expired, _ = self._finished.popitem(last=False)
+                self._jobs.pop(expired, None)
+
+    def get(self, job_id):
+        """A snapshot of the job (status, timings, result or error), or None if unknown or evicted"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+        finished_at = snapshot['finished_at'] or time.time()
+        snapshot['elapsed_seconds'] = round(finished_at - snapshot['started_at'], 3)
+        return snapshot
+
+    def stats(self):
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job['status'] == 'running')
+            return {'running': running, 'finished_kept': len(self._finished), 'max_finished': self.max_finished}
+
+
+_background_jobs = None
+_background_jobs_lock = threading.Lock()
+
+
+def get_background_jobs():
+    """Shared job registry keeping REVIEW_JOBS_KEEP finished jobs (default 32)"""
+    global _background_jobs
+    if _background_jobs is None:
+        with _background_jobs_lock:
+            if _background_jobs is None:
+                _background_jobs = BackgroundJobs(max_finished=int(os.environ.get('REVIEW_JOBS_KEEP', 32)))
+    return _background_jobs
@@ -0,0 +1,21 @@
+"""
+Small pandas helpers shared by the dashboard and the aggregation indexes
+"""
+
+from src.utils.startup import lazy_import
+
+pd = lazy_import('pandas')
+
+
+def fill_missing(series, value):
+    """fillna that keeps categorical columns categorical (adding the fill value as a category)"""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        if not series.isna().any():
+            return series
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+def as_text_index(index):
+    """Convert a (possibly categorical) index to plain strings so it merges across uploads"""
+    return index.astype(str) if isinstance(index.dtype, pd.CategoricalDtype) else index
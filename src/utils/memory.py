@@ -0,0 +1,84 @@
+"""
+Per-step peak memory measurement for data processing pipelines
+"""
+
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+from src.utils.profiling import get_request_profiler
+
+
+class MemoryTracker:
+    """
+    Measures the peak memory of individual processing steps
+
+    With tracing enabled (argument, REVIEW_TRACE_MEMORY=1, or tracemalloc already running)
+    each step reports the exact peak allocated above its starting point. Otherwise it
+    reports how much the step raised the process resident-set high-water mark, which costs
+    nothing to read but stays at zero for steps that fit under an earlier peak.
+    Tracing is shared with the request profiler, so a tracker never stops tracemalloc
+    under a profile that is still running. The traced peak is process-wide: while a memory
+    profile is also tracing, steps leave it alone (the profile reports it) and report only
+    their net allocation.
+    """
+
+    def __init__(self, trace=None):
+        if trace is None:
+            trace = os.environ.get('REVIEW_TRACE_MEMORY') == '1' or tracemalloc.is_tracing()
+        self.trace = trace
+        self._tracing = False
+
+    def __enter__(self):
+        if self.trace:
+            get_request_profiler().start_tracing()
+            self._tracing = True
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._tracing:
+            get_request_profiler().stop_tracing()
+            self._tracing = False
+        return False
+
+    @staticmethod
+    def _max_rss_mb():
+        """The process resident-set high-water mark, or None where `resource` is unavailable (Windows)"""
+        try:
+            import resource
+        except ImportError:
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes elsewhere
+        return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+    @contextmanager
+    def step(self):
+        """Yield a dict that is filled with the step's memory figures when the block exits"""
+        report = {}
+        if self.trace and tracemalloc.is_tracing() and get_request_profiler().tracing_shared():
+            start_current, _ = tracemalloc.get_traced_memory()
+            try:
+                yield report
+            finally:
+                current, _ = tracemalloc.get_traced_memory()
+                report['traced_growth_mb'] = round((current - start_current) / (1024 * 1024), 2)
+                report['source'] = 'tracemalloc_shared'
+        elif self.trace and tracemalloc.is_tracing():
+            start_current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            try:
+                yield report
+            finally:
+                _, peak = tracemalloc.get_traced_memory()
+                report['peak_mb'] = round((peak - start_current) / (1024 * 1024), 2)
+                report['source'] = 'tracemalloc'
+        else:
+            start_max_rss = self._max_rss_mb()
+            try:
+                yield report
+            finally:
+                end_max_rss = self._max_rss_mb()
+                report['max_rss_growth_mb'] = round(end_max_rss - start_max_rss, 2) if end_max_rss is not None else None
+                report['source'] = 'process_max_rss'
@@ -0,0 +1,340 @@
+"""
+On-demand request profiling
+A request opts in with the `X-Profile` header or `?profile=` query flag, naming one or
+more of `cprofile` (deterministic, every call), `sampling` (stack samples every few ms,
+cheap enough for production) and `memory` (tracemalloc snapshot). A sampling rate also
+profiles a share of ordinary requests in the background with the sampling profiler.
+Profiles are stored on local disk and served by the admin endpoints as pstats,
+flamegraph-compatible collapsed stacks and memory reports
+"""
+
+import cProfile
+import hmac
+import ipaddress
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+
+PROFILE_MODES = ('cprofile', 'sampling', 'memory')
+
+# File suffix of each artifact a profile can have
+ARTIFACTS = {
+    'pstats': '.pstats',           # cProfile stats, for pstats/snakeviz
+    'collapsed': '.collapsed',     # 'frame;frame;frame count' lines, for flamegraph.pl/speedscope
+    'tracemalloc': '.tracemalloc'  # tracemalloc.Snapshot.dump, for Snapshot.load
+}
+
+
+def parse_modes(value):
+    """Profile modes from a header or query value such as 'cprofile,memory' ('1' means cprofile)"""
+    if not value:
+        return ()
+    modes = []
+    for mode in value.replace('+', ',').split(','):
+        mode = mode.strip().lower()
+        if mode in ('1', 'true', 'yes'):
+            mode = 'cprofile'
+        if mode not in PROFILE_MODES:
+            raise ValueError(f'Unknown profile mode {mode!r}, expected any of {", ".join(PROFILE_MODES)}')
+        if mode not in modes:
+            modes.append(mode)
+    return tuple(modes)
+
+
+def _frame_label(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """
+    Samples one thread's call stack from a background thread at a fixed interval
+    Only the stack is read, so the profiled code runs at full speed between samples
+    """
+
+    def __init__(self, thread_id, interval=0.005, max_depth=128):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack format, heaviest stacks first"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfileSession:
+    """The profilers running for one request, started in the request's own thread"""
+
+    def __init__(self, profiler, modes, trigger):
+        self.profiler = profiler
+        self.modes = modes
+        self.trigger = trigger
+        self.id = f'{datetime.now().strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}'
+        self.started = time.perf_counter()
+        self._cprofile = None
+        self._sampler = None
+        self._traced_before = None
+
+        # Only one deterministic profiler can run per interpreter; a request that asks for
+        # cProfile while another holds it gets a sampling profile instead
+        if 'cprofile' in modes and not profiler.cprofile_lock.acquire(blocking=False):
+            self.modes = modes = tuple(mode for mode in modes if mode != 'cprofile') + (('sampling',) if 'sampling' not in modes else ())
+            self.cprofile_busy = True
+        else:
+            self.cprofile_busy = False
+
+        if 'memory' in modes:
+            self._traced_before = profiler.start_tracing()
+        if 'sampling' in modes:
+            self._sampler = StackSampler(threading.get_ident(), profiler.sampling_interval).start()
+        if 'cprofile' in modes:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def finish(self, request_info):
+        """Stop profiling and store the artifacts; returns the profile's metadata"""
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self.profiler.cprofile_lock.release()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+        metadata = {
+            'id': self.id,
+            'created_at': datetime.now().isoformat(),
+            'trigger': self.trigger,
+            'modes': list(self.modes),
+            'duration_ms': round(elapsed_ms, 2),
+            'cprofile_busy': self.cprofile_busy,
+            **request_info,
+            'artifacts': []
+        }
+        base = os.path.join(self.profiler.directory, self.id)
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(base + ARTIFACTS['pstats'])
+            metadata['artifacts'].append('pstats')
+            metadata['top_functions'] = top_functions(pstats.Stats(self._cprofile))
+        if self._sampler is not None:
+            with open(base + ARTIFACTS['collapsed'], 'w', encoding='utf-8') as f:
+                f.write(self._sampler.collapsed())
+            metadata['artifacts'].append('collapsed')
+            metadata['samples'] = self._sampler.samples
+            metadata['sampling_interval_ms'] = self.profiler.sampling_interval * 1000
+        if self._traced_before is not None:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            self.profiler.stop_tracing()
+            snapshot.dump(base + ARTIFACTS['tracemalloc'])
+            metadata['artifacts'].append('tracemalloc')
+            metadata['memory'] = {
+                # Process-wide figures: concurrent requests allocate into the same trace
+                'traced_growth_mb': round((current - self._traced_before) / (1024 * 1024), 2),
+                'traced_peak_mb': round(peak / (1024 * 1024), 2),
+                'top_allocations': [
+                    {'location': str(stat.traceback), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:20]
+                ]
+            }
+
+        self.profiler.save(metadata)
+        return metadata
+
+
+def top_functions(stats, limit=25):
+    """The functions with the highest cumulative time in a pstats.Stats"""
+    rows = []
+    for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f'{name} ({os.path.basename(filename)}:{line})',
+            'calls': calls,
+            'total_ms': round(total * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3)
+        })
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:limit]
+
+
+class RequestProfiler:
+    """
+    Decides which requests are profiled and keeps the stored profiles
+    At most `max_profiles` are kept; the oldest are deleted first
+    """
+
+    def __init__(self, directory, sample_rate=0.0, max_profiles=50, sampling_interval=0.005, token=None):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles
+        self.sampling_interval = sampling_interval
+        self.token = token
+        self._lock = threading.Lock()
+        self._tracing_sessions = 0
+        self._owns_tracing = False
+        self.cprofile_lock = threading.Lock()
+        self.captured = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def authorized(self, supplied_token, remote_addr=None):
+        """
+        Whether a request may ask for profiles and use the admin endpoints: with a token set it
+        must be supplied; without one only clients on the loopback interface are allowed
+        """
+        if self.token:
+            return hmac.compare_digest((supplied_token or '').encode('utf-8'), self.token.encode('utf-8'))
+        return _is_loopback(remote_addr)
+
+    def begin(self, requested_modes, supplied_token=None, remote_addr=None):
+        """
+        A ProfileSession for this request, or None
+        Explicit requests must be authorized; otherwise `sample_rate` of requests get a
+        background sampling profile
+        """
+        if requested_modes and self.authorized(supplied_token, remote_addr):
+            return ProfileSession(self, requested_modes, 'requested')
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return ProfileSession(self, ('sampling',), 'sampled')
+        return None
+
+    def start_tracing(self):
+        """Start tracemalloc for a session (shared by concurrent sessions); returns traced bytes now"""
+        with self._lock:
+            if self._tracing_sessions == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracing = True
+            elif self._tracing_sessions == 0:
+                self._owns_tracing = False
+            self._tracing_sessions += 1
+            return tracemalloc.get_traced_memory()[0]
+
+    def tracing_shared(self):
+        """Whether tracemalloc has more than one session, so none of them may reset its peak"""
+        with self._lock:
+            return self._tracing_sessions > 1
+
+    def stop_tracing(self):
+        with self._lock:
+            self._tracing_sessions -= 1
+            if self._tracing_sessions == 0 and self._owns_tracing:
+                tracemalloc.stop()
+
+    def _metadata_path(self, profile_id):
+        return os.path.join(self.directory, f'{profile_id}.json')
+
+    def save(self, metadata):
+        with open(self._metadata_path(metadata['id']), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+        with self._lock:
+            self.captured += 1
+            stored = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith('.json'))
+            for profile_id in stored[:max(0, len(stored) - self.max_profiles)]:
+                self.delete(profile_id)
+
+    def delete(self, profile_id):
+        for suffix in ['.json', *ARTIFACTS.values()]:
+            try:
+                os.remove(os.path.join(self.directory, profile_id + suffix))
+            except OSError:
+                pass
+
+    def list(self):
+        """Stored profiles, newest first, without their per-function and allocation detail"""
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith('.json'):
+                metadata = self.get(name[:-5])
+                if metadata:
+                    profiles.append({key: value for key, value in metadata.items() if key not in ('top_functions', 'memory')})
+        return profiles
+
+    def get(self, profile_id):
+        if not _valid_id(profile_id):
+            return None
+        try:
+            with open(self._metadata_path(profile_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def artifact_path(self, profile_id, artifact):
+        """Path of a stored artifact, or None if the profile doesn't have it"""
+        if not _valid_id(profile_id) or artifact not in ARTIFACTS:
+            return None
+        path = os.path.join(self.directory, profile_id + ARTIFACTS[artifact])
+        return path if os.path.exists(path) else None
+
+    def status(self):
+        return {
+            'directory': self.directory,
+            'sample_rate': self.sample_rate,
+            'sampling_interval_ms': self.sampling_interval * 1000,
+            'max_profiles': self.max_profiles,
+            'token_required': bool(self.token),
+            'captured': self.captured
+        }
+
+
+def _is_loopback(remote_addr):
+    try:
+        address = ipaddress.ip_address(remote_addr or '')
+    except ValueError:
+        return False
+    return address.is_loopback or bool(getattr(address, 'ipv4_mapped', None) and address.ipv4_mapped.is_loopback)
+
+
+def _valid_id(profile_id):
+    return bool(profile_id) and all(char.isalnum() or char == '-' for char in profile_id)
+
+
+_request_profiler = None
+_request_profiler_lock = threading.Lock()
+
+
+def get_request_profiler():
+    """
+    Shared profiler configured from REVIEW_PROFILE_DIR, REVIEW_PROFILE_SAMPLE_RATE,
+    REVIEW_PROFILE_MAX, REVIEW_PROFILE_INTERVAL_MS and REVIEW_ADMIN_TOKEN
+    """
+    global _request_profiler
+    if _request_profiler is None:
+        with _request_profiler_lock:
+            if _request_profiler is None:
+                default_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'profiles')
+                _request_profiler = RequestProfiler(
+                    os.path.abspath(os.environ.get('REVIEW_PROFILE_DIR', default_dir)),
+                    sample_rate=float(os.environ.get('REVIEW_PROFILE_SAMPLE_RATE', 0)),
+                    max_profiles=int(os.environ.get('REVIEW_PROFILE_MAX', 50)),
+                    sampling_interval=float(os.environ.get('REVIEW_PROFILE_INTERVAL_MS', 5)) / 1000,
+                    token=os.environ.get('REVIEW_ADMIN_TOKEN') or None
+                )
+    return _request_profiler
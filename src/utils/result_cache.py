@@ -0,0 +1,134 @@
+"""
+Size-bounded on-disk LRU cache for analysis results keyed by upload content hash
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from src.utils.serialization import fast_dumps
+
+# Bump when the shape or semantics of cached results change
+CACHE_VERSION = 5
+
+
+class ResultCache:
+    """
+    Stores one JSON file per entry; recency is tracked in memory and mirrored in file
+    mtimes so the LRU order survives restarts
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load_existing()
+
+    def _load_existing(self):
+        os.makedirs(self.directory, exist_ok=True)
+        existing = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                existing.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(existing):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def make_key(content, options=None):
+        """Hash the uploaded bytes together with the analysis options"""
+        digest = hashlib.sha256()
+        digest.update(content if isinstance(content, bytes) else content.encode('utf-8'))
+        digest.update(json.dumps({'options': options or {}, 'version': CACHE_VERSION}, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(self._path(key))
+        except (OSError, ValueError):
+            self._discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        data = fast_dumps(value).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return False
+
+        tmp_path = f'{self._path(key)}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            self._total_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            evicted = []
+            while self._total_bytes > self.max_bytes and self._entries:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+        return True
+
+    def _discard(self, key):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Shared cache configured from REVIEW_CACHE_DIR and REVIEW_CACHE_MAX_MB"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                default_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'cache')
+                _result_cache = ResultCache(
+                    os.path.abspath(os.environ.get('REVIEW_CACHE_DIR', default_dir)),
+                    max_bytes=int(float(os.environ.get('REVIEW_CACHE_MAX_MB', 512)) * 1024 * 1024)
+                )
+    return _result_cache
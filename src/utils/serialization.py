@@ -0,0 +1,105 @@
+"""
+JSON serialization helpers that understand NumPy/pandas values directly,
+so results never need a recursive conversion pass before encoding
+"""
+
+import json
+
+from flask import Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional; it serializes NumPy natively and is much faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def json_default(obj):
+    """`default=` hook for json.dumps covering NumPy scalars/arrays and similar objects"""
+    if type(obj).__name__ in ('NAType', 'NaTType'):  # pandas missing values
+        return None
+    if hasattr(obj, 'tolist'):  # numpy arrays and scalars, pandas arrays
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if hasattr(obj, 'isoformat'):  # datetime, date, pandas Timestamp
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _stringify_keys(obj):
+    """Slow path for dicts keyed by NumPy scalars, which neither encoder accepts"""
+    if isinstance(obj, dict):
+        return {
+            (key if isinstance(key, (str, int, float, bool)) or key is None else json_default(key)): _stringify_keys(value)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, (list, tuple)):
+        return [_stringify_keys(value) for value in obj]
+    return obj
+
+
+def _stdlib_dumps(obj, **kwargs):
+    try:
+        return json.dumps(obj, **kwargs)
+    except TypeError:
+        return json.dumps(_stringify_keys(obj), **kwargs)
+
+
+def fast_dumps(obj, sort_keys=False, indent=None):
+    """Serialize to a JSON string with orjson when available, else the stdlib encoder"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=json_default, option=option).decode('utf-8')
+        except TypeError:
+            return orjson.dumps(_stringify_keys(obj), default=json_default, option=option).decode('utf-8')
+    return _stdlib_dumps(obj, default=json_default, sort_keys=sort_keys, indent=indent, ensure_ascii=False)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes NumPy/pandas scalars and arrays, datetimes and
+    tuples directly, replacing recursive convert-before-jsonify passes
+    """
+
+    def dumps(self, obj, **kwargs):
+        return fast_dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys), indent=kwargs.get('indent'))
+
+    def loads(self, s, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+
+def ndjson_line(record):
+    return fast_dumps(record) + '\n'
+
+
+def wants_ndjson(request):
+    """A request opts into streaming with ?stream=true or an NDJSON Accept header"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def ndjson_response(records):
+    """Stream an iterable of records as newline-delimited JSON"""
+    def generate():
+        try:
+            for record in records:
+                yield ndjson_line(record)
+        except Exception as e:
+            yield ndjson_line({'type': 'error', 'error': str(e)})
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
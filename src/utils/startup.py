@@ -0,0 +1,96 @@
+"""
+Cold-start helpers: deferred imports of heavy dependencies and a startup-time report
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupReport:
+    """Collects how long each startup phase and each lazy import took"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = {}
+        self.lazy_imports = {}
+        self.ready_at = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a named startup phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def record_lazy_import(self, module_name, seconds):
+        with self._lock:
+            if module_name in self.lazy_imports:
+                return
+            self.lazy_imports[module_name] = {
+                'import_time_ms': round(seconds * 1000, 2),
+                'loaded_after_startup_ms': round((time.perf_counter() - self.started_at) * 1000, 2)
+            }
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'startup_time_ms': round((self.ready_at - self.started_at) * 1000, 2) if self.ready_at else None,
+                'phases_ms': dict(self.phases),
+                'lazy_imports': dict(self.lazy_imports)
+            }
+
+
+startup_report = StartupReport()
+
+
+class LazyModule:
+    """
+    Module proxy that performs the real import on first attribute access,
+    so e.g. `pd.read_csv` works unchanged while pandas stays unloaded until needed
+    """
+
+    def __init__(self, module_name):
+        self._module_name = module_name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._module_name)
+                    startup_report.record_lazy_import(self._module_name, time.perf_counter() - start)
+                    self._module = module
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f'<LazyModule {self._module_name!r} ({state})>'
+
+
+def lazy_import(module_name):
+    """Return a proxy that imports `module_name` on first use"""
+    return LazyModule(module_name)
+
+
+def module_available(*module_names):
+    """Check that modules are installed without importing them"""
+    return all(importlib.util.find_spec(name) is not None for name in module_names)
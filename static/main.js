@@ -125,7 +125,8 @@ document.addEventListener('DOMContentLoaded', function() {
             const formData = new FormData();
             formData.append('file', file);
 
-            const response = await fetch('/api/upload-csv', {
+            // Progressive mode: a sampled preview arrives first, the exact dashboard replaces it
+            const response = await fetch('/api/upload-csv?progressive=1', {
                 method: 'POST',
                 body: formData
             });
@@ -138,6 +139,9 @@ document.addEventListener('DOMContentLoaded', function() {
             const result = await response.json();
             hideCsvLoading();
             showCsvDashboard(result);
+            if (result.phase === 'preview') {
+                showCsvDashboard(await pollDashboardJob(result.job.status_url));
+            }
         } catch (error) {
             console.error('Error:', error);
             hideCsvLoading();
@@ -220,15 +224,51 @@ document.addEventListener('DOMContentLoaded', function() {
         csvLoading.style.display = 'none';
     }
 
+    async function pollDashboardJob(statusUrl) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const response = await fetch(statusUrl);
+            if (response.status === 202) {
+                continue;
+            }
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.error || `HTTP error! status: ${response.status}`);
+            }
+            return result;
+        }
+    }
+
+    // "± half-width" of a preview estimate's error bar, or nothing for exact results
+    function errorBar(bar) {
+        if (!bar || bar.low === undefined || bar.high === null) {
+            return '';
+        }
+        return ` <span class="error-bar">± ${+((bar.high - bar.low) / 2).toFixed(2)}</span>`;
+    }
+
     function showCsvDashboard(data) {
         const dashboard = data.dashboard;
         const metadata = data.metadata;
+        const bars = data.phase === 'preview' ? data.estimates.error_bars : {};
 
         let dashboardHTML = `
             <div class="dashboard-header">
                 <h2>CSV Analysis Dashboard</h2>
                 <p>File: ${metadata.file_name} | Total Reviews: ${metadata.total_reviews} | Processed: ${new Date(metadata.processed_at).toLocaleString()}</p>
             </div>
+        `;
+
+        if (data.phase === 'preview') {
+            dashboardHTML += `
+                <div class="preview-banner">
+                    Preview estimated from ${data.estimates.sample_size} sampled reviews (95% error bars).
+                    Computing the exact dashboard...
+                </div>
+            `;
+        }
+
+        dashboardHTML += `
             <div class="dashboard-content">
         `;
 
@@ -239,7 +279,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     <h3>📊 Overall Statistics</h3>
                     <div class="stats-grid">
                         <div class="stat-card">
-                            <div class="stat-value">${dashboard.overall_stats.total_reviews}</div>
+                            <div class="stat-value">${dashboard.overall_stats.total_reviews}${errorBar(bars.overall_stats?.total_reviews)}</div>
                             <div class="stat-label">Total Reviews</div>
                         </div>
                         <div class="stat-card">
@@ -262,19 +302,19 @@ document.addEventListener('DOMContentLoaded', function() {
                     <h3>⭐ Rating Analysis</h3>
                     <div class="stats-grid">
                         <div class="stat-card">
-                            <div class="stat-value">${dashboard.ratings.statistics?.mean || 'N/A'}</div>
+                            <div class="stat-value">${dashboard.ratings.statistics?.mean || 'N/A'}${errorBar(bars.ratings?.statistics?.mean)}</div>
                             <div class="stat-label">Average Rating</div>
                         </div>
                         <div class="stat-card">
-                            <div class="stat-value">${dashboard.ratings.categories?.excellent || 0}</div>
+                            <div class="stat-value">${dashboard.ratings.categories?.excellent || 0}${errorBar(bars.ratings?.categories?.excellent)}</div>
                             <div class="stat-label">Excellent (4.5+)</div>
                         </div>
                         <div class="stat-card">
-                            <div class="stat-value">${dashboard.ratings.categories?.good || 0}</div>
+                            <div class="stat-value">${dashboard.ratings.categories?.good || 0}${errorBar(bars.ratings?.categories?.good)}</div>
                             <div class="stat-label">Good (3.5-4.4)</div>
                         </div>
                         <div class="stat-card">
-                            <div class="stat-value">${dashboard.ratings.categories?.poor || 0}</div>
+                            <div class="stat-value">${dashboard.ratings.categories?.poor || 0}${errorBar(bars.ratings?.categories?.poor)}</div>
                             <div class="stat-label">Poor (<2.5)</div>
                         </div>
                     </div>
@@ -296,8 +336,8 @@ document.addEventListener('DOMContentLoaded', function() {
                     <div class="company-card">
                         <div class="company-name">${company}</div>
                         <div class="company-stats">
-                            Average: ${stats.mean} <span class="rating-stars">${stars}</span><br>
-                            Reviews: ${stats.count}
+                            Average: ${stats.mean}${errorBar(bars.companies?.average_ratings?.[company]?.mean)} <span class="rating-stars">${stars}</span><br>
+                            Reviews: ${stats.count}${errorBar(bars.companies?.average_ratings?.[company]?.count)}
                         </div>
                     </div>
                 `;
@@ -321,8 +361,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 const percentage = dashboard.classifications.percentages[classification] || 0;
                 dashboardHTML += `
                     <div class="stat-card">
-                        <div class="stat-value">${count}</div>
-                        <div class="stat-label">${classification.replace('_', ' ')} (${percentage}%)</div>
+                        <div class="stat-value">${count}${errorBar(bars.classifications?.distribution?.[classification])}</div>
+                        <div class="stat-label">${classification.replace('_', ' ')} (${percentage}%${errorBar(bars.classifications?.percentages?.[classification])})</div>
                     </div>
                 `;
             });
@@ -333,6 +373,31 @@ document.addEventListener('DOMContentLoaded', function() {
             `;
         }
 
+        // Distinctive Terms
+        if (dashboard.terms) {
+            dashboardHTML += `
+                <div class="dashboard-section">
+                    <h3>🔤 Distinctive Terms</h3>
+                    <div class="company-list">
+            `;
+
+            ['classifications', 'companies'].forEach(grouping => {
+                Object.entries(dashboard.terms[grouping] || {}).slice(0, 6).forEach(([group, terms]) => {
+                    dashboardHTML += `
+                        <div class="company-card">
+                            <div class="company-name">${group.replace('_', ' ')}</div>
+                            <div class="company-stats">${terms.slice(0, 8).map(term => term.term).join(', ')}</div>
+                        </div>
+                    `;
+                });
+            });
+
+            dashboardHTML += `
+                    </div>
+                </div>
+            `;
+        }
+
         // Sample Reviews
         if (dashboard.sample_reviews) {
             dashboardHTML += `